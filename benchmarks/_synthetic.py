@@ -0,0 +1,128 @@
+"""
+Synthetic node graphs for the benchmarks (not shipped with the app). Importing it first also turns the app's debug
+logging off for the benchmark, unless GRAPHICALAI_LOG is set.
+
+Registers a few tiny node types into `node_class_ref` so the executors can instantiate them like any other node:
+- BnSRC, input node producing a single number
+- BnADD, adds its two inputs together
+- BnSNK, output node that only consumes its input
+- BnSCL, scales its input into a new array/tensor of the same size (a row-wise intermediate)
+- BnMML, a heavy node: a few matrix multiplications of a (MATMUL_SIZE x MATMUL_SIZE) matrix scaled by its input
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "graphical_ai"))
+os.environ.setdefault("GRAPHICALAI_LOG", "off")  # (the benchmarks measure the nodes, not the debug logging)
+
+import tensorflow as tf
+
+from node_graph.nodes import NodeExec, node_class_ref
+from node_graph.training_weights import NodeWeights
+from node_state import NodeState
+
+
+class BenchSource(NodeExec):
+    ndtg = "BnSRC"
+    name = "Bench Source"
+    state = NodeState.INPUT
+    weights = NodeWeights()
+
+    @staticmethod
+    def _field_data(): return {"input": {}, "output": {"x": None}, "constant": {}}
+
+    def execute(self, cycle):
+        self.out["x"] = 1.0
+
+
+class BenchAdd(NodeExec):
+    ndtg = "BnADD"
+    name = "Bench Add"
+    state = NodeState.MEDIUM
+    weights = NodeWeights()
+
+    @staticmethod
+    def _field_data(): return {"input": {"a": None, "b": None}, "output": {"s": None}, "constant": {}}
+
+    def execute(self, cycle):
+        self.out["s"] = self.inp["a"] + self.inp["b"]
+
+
+class BenchSink(NodeExec):
+    ndtg = "BnSNK"
+    name = "Bench Sink"
+    state = NodeState.OUTPUT
+    weights = NodeWeights()
+
+    @staticmethod
+    def _field_data(): return {"input": {"data": None}, "output": {}, "constant": {}}
+
+    def execute(self, cycle):
+        pass
+
+
+class BenchScale(NodeExec):
+    ndtg = "BnSCL"
+    name = "Bench Scale"
+    state = NodeState.MEDIUM
+    weights = NodeWeights()
+
+    @staticmethod
+    def _field_data(): return {"input": {"a": None}, "output": {"s": None}, "constant": {}}
+
+    def execute(self, cycle):
+        self.out["s"] = self.inp["a"] * 1.0001
+
+
+MATMUL_SIZE = 512
+MATMUL_REPEAT = 4
+
+
+class BenchMatmul(NodeExec):
+    ndtg = "BnMML"
+    name = "Bench Matmul"
+    state = NodeState.MEDIUM
+    weights = NodeWeights()
+
+    @staticmethod
+    def _field_data(): return {"input": {"a": None}, "output": {"s": None}, "constant": {}}
+
+    def execute(self, cycle):
+        m = tf.random.stateless_uniform((MATMUL_SIZE, MATMUL_SIZE), seed=(0, 0)) * self.inp["a"]
+        for _ in range(MATMUL_REPEAT):
+            m = tf.tanh(tf.linalg.matmul(m, m))
+        self.out["s"] = tf.reduce_sum(m)
+
+
+for _cls in (BenchSource, BenchAdd, BenchSink, BenchScale, BenchMatmul):
+    node_class_ref[_cls.ndtg] = _cls
+
+
+def wide_chain(n: int) -> list:
+    """
+    model exec data of <n> nodes: a source, a chain of adders and a sink. Every adder also reads the source directly,
+    so the source fans out to the whole graph (the worst case for the old breadth-first queue).
+    """
+    assert n >= 3
+    exec_dt = [{"ndtg": "BnSRC", "inp": [], "out": [[]], "const": {}}]
+    for i in range(1, n - 1):
+        exec_dt.append({"ndtg": "BnADD", "inp": [2 * i, 2 * i + 1], "out": [[]], "const": {}})
+    exec_dt.append({"ndtg": "BnSNK", "inp": [2 * (n - 1)], "out": [], "const": {}})
+
+    for i in range(1, n - 1):
+        exec_dt[i - 1]["out"][0].append(2 * i)  # a: previous node
+        exec_dt[0]["out"][0].append(2 * i + 1)  # b: the source
+    exec_dt[n - 2]["out"][0].append(2 * (n - 1))
+    return exec_dt
+
+
+def branches(k: int) -> list:
+    """
+    model exec data of a source feeding <k> independent heavy branches, each a matmul node into a sink of its own
+    """
+    exec_dt = [{"ndtg": "BnSRC", "inp": [], "out": [[2 * i + 1 for i in range(k)]], "const": {}}]
+    for i in range(k):
+        exec_dt.append({"ndtg": "BnMML", "inp": [2 * i + 1], "out": [[2 * i + 2]], "const": {}})
+        exec_dt.append({"ndtg": "BnSNK", "inp": [2 * i + 2], "out": [], "const": {}})
+    return exec_dt
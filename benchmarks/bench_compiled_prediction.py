@@ -0,0 +1,53 @@
+"""
+Compiled (traced graph function) against eager prediction: milliseconds per request of the Testing-XIII linear
+regression model, with requests of a fixed row count and with row counts varying from request to request (iris.csv
+rows). Also counts the traces the compiled predictor ended up with.
+
+    python benchmarks/bench_compiled_prediction.py [requests]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+
+import _synthetic
+from node_graph.execution import ModelPredictor
+
+from bench_train_step import IRIS, LINREG_EXEC_DT
+
+
+def ms_per_request(predictor: ModelPredictor, contents: list) -> float:
+    inst_state = lambda content: {"inp": {"a": ("file-content", content)}, "out": {"b": ("file-content", "")},
+                                  "predicting?": True}
+    predictor.execute(inst_state(contents[0]))
+    t = time.perf_counter()
+    for content in contents:
+        predictor.execute(inst_state(content))
+    return (time.perf_counter() - t) / len(contents) * 1e3
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+
+    x = pd.read_csv(IRIS).drop("species", axis=1)
+    rng = np.random.default_rng(0)
+    cases = (
+        ("fixed rows", [x.iloc[:32].to_csv(index=False)] * requests),
+        ("varying rows", [x.iloc[:int(rows)].to_csv(index=False) for rows in rng.integers(1, len(x), requests)]),
+    )
+    weights = [tf.Variable([0.3, -0.2, 0.5, 0.1]), tf.Variable(0.25)]
+
+    print(f"{requests} requests")
+    print(f"{'':>14} {'eager (ms)':>11} {'compiled (ms)':>14} {'traces':>7}")
+    for (name, contents) in cases:
+        eager = ms_per_request(ModelPredictor(LINREG_EXEC_DT, weights), contents)
+        predictor = ModelPredictor(LINREG_EXEC_DT, weights, compiled=True)
+        compiled = ms_per_request(predictor, contents)
+        print(f"{name:>14} {eager:>11.2f} {compiled:>14.2f} {len(predictor._traces):>7}")
+
+
+if __name__ == "__main__":
+    main()
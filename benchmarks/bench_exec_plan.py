@@ -0,0 +1,66 @@
+"""
+Per-cycle cost of the old breadth-first queue walk against replaying the precompiled ExecutionPlan, on synthetic
+graphs of 10, 100 and 1000 nodes.
+
+    python benchmarks/bench_exec_plan.py
+"""
+
+import time
+
+import _synthetic
+from node_graph.execution import ModelPredictor
+
+
+def legacy_cycle(predictor: ModelPredictor, cycle_state):
+    """
+    the node walk ModelPredictor.cycle_exec used to do on every cycle (minus the error handling)
+    """
+    queue = predictor.node_anchors.copy()
+    while len(queue) != 0:
+        first = queue[0]
+        del queue[0]
+        nd_dt = predictor.mdl_ref_dt[first]
+        fld_meta = nd_dt["%%class"].field_data
+
+        for nd_ref in predictor.node_adj_list[first]:
+            queue.append(nd_ref)
+
+        if any(ifld_nm not in nd_dt["%%class"].inp for ifld_nm in fld_meta["input"]):
+            continue
+
+        nd_dt["%%class"].const = nd_dt["const"]
+        nd_dt["%%class"].execute(cycle_state)
+
+        for (ind, ofld_nm) in enumerate(fld_meta["output"]):
+            for inp_ref in nd_dt["out"][ind]:
+                ext_node = predictor.mdl_ref_dt[predictor.inp_ref_nd[inp_ref][0]]
+                ext_node["%%class"].inp[predictor.inp_ref_nd[inp_ref][1]] = nd_dt["%%class"].out[ofld_nm]
+
+        queue = [n for n in queue if n != first]
+
+
+def per_cycle(fn, repeat: int) -> float:
+    t = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t) / repeat
+
+
+def main():
+    print(f"{'nodes':>6} {'build (ms)':>12} {'queue (ms/cycle)':>18} {'plan (ms/cycle)':>17} {'speedup':>8}")
+    for n in (10, 100, 1000):
+        t = time.perf_counter()
+        predictor = ModelPredictor(_synthetic.wide_chain(n), [])
+        build = time.perf_counter() - t
+
+        state = {"inp": {}, "out": {}}
+        repeat = max(3, 20000 // n)
+        predictor.cycle_exec(state)
+        queue = per_cycle(lambda: legacy_cycle(predictor, state), repeat)
+        plan = per_cycle(lambda: predictor.cycle_exec(state), repeat)
+
+        print(f"{n:>6} {build * 1e3:>12.2f} {queue * 1e3:>18.4f} {plan * 1e3:>17.4f} {queue / plan:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Separate weight variables against one flat weights buffer (FlatWeights): compiled optimizer updates over many
+weights, snapshotting all the weights to arrays (as saving the *.w.npz does), and training steps per second of the
+Testing-XIII linear regression model (iris.csv).
+
+    python benchmarks/bench_flat_weights.py [weights count] [steps]
+"""
+
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from bench_train_step import IRIS, LINREG_EXEC_DT
+from node_graph.execution import ModelTrainer
+from node_graph.optimizers import OPTIMIZERS
+from node_graph.training_weights import FlatWeights, trainable_variables
+
+SHAPES = ((64,), (16, 16), ())  # cycled through for the synthetic weights
+
+
+def weights_of(count: int, flat: bool) -> list:
+    arrays = [np.random.default_rng(ind).normal(size=SHAPES[ind % len(SHAPES)]).astype(np.float32)
+              for ind in range(count)]
+    if flat:
+        return FlatWeights.from_arrays(arrays)
+    return [tf.Variable(arr) for arr in arrays]
+
+
+def ms_per_update(weights: list, optimizer: str, steps: int) -> float:
+    variables = trainable_variables(weights)
+    opt = OPTIMIZERS[optimizer](0.01)
+    opt.build(variables)
+    grads = [tf.ones_like(var) for var in variables]
+    update = tf.function(lambda: opt.apply(grads, variables), autograph=False)
+    update()
+
+    t = time.perf_counter()
+    for _ in range(steps):
+        update()
+    return (time.perf_counter() - t) / steps * 1e3
+
+
+def ms_per_snapshot(weights: list, steps: int) -> float:
+    t = time.perf_counter()
+    for _ in range(steps):
+        if isinstance(weights, FlatWeights):
+            weights.arrays()
+        else:
+            [w.numpy() for w in weights]
+    return (time.perf_counter() - t) / steps * 1e3
+
+
+def train_steps_per_second(flat: bool, steps: int) -> float:
+    inst_state = {"inp": {"a": ("file", IRIS)}, "out": {"b": ("file-content", "")}, "predicting?": False}
+    trainer = ModelTrainer(LINREG_EXEC_DT)
+    trainer.global_weights_vec = FlatWeights() if flat else []
+    trainer.cycle_exec(inst_state, init_setup=True)
+    if flat:
+        trainer.global_weights_vec.pack()
+    trainer.hoist_static()
+    step_fn = trainer.train_step(inst_state, "MSE", 0.01, optimizer="Adam", compiled=True)
+    step_fn()
+
+    t = time.perf_counter()
+    for _ in range(steps):
+        step_fn()
+    return steps / (time.perf_counter() - t)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print(f"{count} weights ({sum(int(np.prod(SHAPES[ind % len(SHAPES)])) for ind in range(count))} values)")
+    print(f"{'':>24} {'separate':>10} {'flat':>10}")
+    for optimizer in ("SGD", "Adam"):
+        separate = ms_per_update(weights_of(count, False), optimizer, steps)
+        flat = ms_per_update(weights_of(count, True), optimizer, steps)
+        print(f"{f'{optimizer} update (ms)':>24} {separate:>10.3f} {flat:>10.3f}")
+    separate = ms_per_snapshot(weights_of(count, False), steps)
+    flat = ms_per_snapshot(weights_of(count, True), steps)
+    print(f"{'snapshot to arrays (ms)':>24} {separate:>10.3f} {flat:>10.3f}")
+    separate = train_steps_per_second(False, steps * 10)
+    flat = train_steps_per_second(True, steps * 10)
+    print(f"{'iris Adam steps/s':>24} {separate:>10.0f} {flat:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
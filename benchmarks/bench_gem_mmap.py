@@ -0,0 +1,69 @@
+"""
+Cost of loading the *.gem files of a project with many large models: every file read & decoded whole (sequential
+layout) against memory-mapped (indexed layout, gem_format.MappedExecData), where loading only reads the headers and
+the nodes are decoded once an executor copies the exec data. The files are written to a temporary directory first, so
+they're read from the page cache either way.
+
+    python benchmarks/bench_gem_mmap.py [models] [nodes per model] [constant size]
+"""
+
+import copy
+import os
+import sys
+import tempfile
+import time
+
+import _synthetic
+import gem_format
+
+from bench_gem_parser import synthetic_exec_dt
+
+
+def load_sequential(fpaths) -> list:
+    models = []
+    for fpath in fpaths:
+        with open(fpath, "rb") as fbo:
+            models.append(gem_format.loads(fbo.read()))
+    return models
+
+
+def load_mapped(fpaths) -> list:
+    return [gem_format.MappedExecData(fpath) for fpath in fpaths]
+
+
+def main():
+    models = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    nodes = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    const_size = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fpaths = {}
+        for indexed in (False, True):
+            fpaths[indexed] = []
+            for ind in range(models):
+                fpath = os.path.join(tmp, f"model{ind}{'.indexed' if indexed else ''}.gem")
+                with open(fpath, "wb") as fbo:
+                    fbo.write(gem_format.dumps(synthetic_exec_dt(nodes, const_size, seed=ind, max_id=10**6),
+                                               indexed=indexed))
+                fpaths[indexed].append(fpath)
+        size = sum(os.path.getsize(fpath) for fpath in fpaths[True]) / 2**20
+
+        print(f"{models} models of {nodes} nodes, {size:.1f} MB")
+        print(f"{'':>12} {'load (ms)':>10} {'+ one node (ms)':>16} {'+ every node (ms)':>18}")
+        for (name, indexed, load) in (("sequential", False, load_sequential), ("mapped", True, load_mapped)):
+            t = time.perf_counter()
+            loaded = load(fpaths[indexed])
+            t_load = time.perf_counter() - t
+            loaded[0][nodes // 2]
+            t_one = time.perf_counter() - t
+            for exec_dt in loaded:
+                copy.deepcopy(exec_dt)  # (as the executors take their copy)
+            t_every = time.perf_counter() - t
+            print(f"{name:>12} {t_load * 1e3:>10.1f} {t_one * 1e3:>16.1f} {t_every * 1e3:>18.1f}")
+            if indexed:
+                for exec_dt in loaded:
+                    exec_dt.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Loading *.gem files: the byte-at-a-time state machine load_model used to parse them with against gem_format.loads()
+(struct.unpack_from over a memoryview, jumping from record to record) on version 2 files, and on version 3 files
+(varints), on synthetic graphs of 100 to 10000 nodes with short and with long constant values.
+
+    python benchmarks/bench_gem_parser.py [constant size]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+import _synthetic
+import gem_format
+from errors import ProjectFileAppError
+from node_graph.nodes import node_class_ref
+
+NODES = (100, 1000, 10_000)
+TAGS = ("InpCV", "OutCV", "LRMDL", "ATTRS")
+
+
+def synthetic_exec_dt(nodes: int, const_size: int, seed: int = 0, max_id: int = 255, min_const_size: int = 1) -> list:
+    """
+    exec data of <nodes> real node types with random connector ids (up to max_id) and random constant values of
+    min_const_size to const_size bytes (the legacy parser drops empty values, shifting the ones after them)
+    """
+    rng = np.random.default_rng(seed)
+    exec_dt = []
+    for ind in range(nodes):
+        ndtg = TAGS[ind % len(TAGS)]
+        exec_dt.append({
+            "ndtg": ndtg,
+            "inp": [int(uid) for uid in rng.integers(0, max_id + 1, rng.integers(0, 4))],
+            "out": [[int(uid) for uid in rng.integers(0, max_id + 1, rng.integers(0, 4))]
+                    for _ in range(rng.integers(0, 3))],
+            "const": {name: rng.bytes(int(rng.integers(min_const_size, const_size + 1)))
+                      for name in gem_format.const_names(ndtg)},
+        })
+    return exec_dt
+
+
+def legacy_loads(fdt_raw: bytes) -> list:
+    """
+    ModelFileHandler.load_model's *.gem parsing before gem_format: a byte-at-a-time state machine
+    """
+    NDTG_LEN = 5
+    _COLLC_SIZE = 1
+    _CONST_COLLC_SIZE = 2
+    _NODE_SIZE = 3  # byte size for the length of a single binary-serialized executable node data
+
+    exec_dt = []
+    fdt = []
+    # meta-processing file data to a processed raw file data
+    fdt.append(fdt_raw[0:7])  # meta data: magic code, file type, file version
+    fdt.append(fdt_raw[7:9])  # meta data: id size (for the actual data)
+
+    mmode = "size"  # meta-mode
+    size = 0
+    sbuf = b""
+    fbuf = b""
+    for ci in range(9, len(fdt_raw)):
+        if len(sbuf) == _NODE_SIZE and mmode == "size":
+            size = int.from_bytes(sbuf, "big")
+            mmode = "node-data"
+            fbuf = fdt_raw[ci:ci + 1]
+        elif len(fbuf) == size and mmode == "node-data":
+            fdt.append(fbuf)
+            mmode = "size"
+            size = 0
+            sbuf = fdt_raw[ci:ci + 1]
+            fbuf = b""
+        elif ci == len(fdt_raw)-1 and mmode == "node-data":
+            fbuf += fdt_raw[ci:ci + 1]
+            fdt.append(fbuf)
+        elif mmode == "size":
+            sbuf += fdt_raw[ci:ci + 1]
+        else:
+            fbuf += fdt_raw[ci:ci + 1]
+
+    # dprint(fdt)
+    if fdt[0][0:4] != b"\xbaSHC":  # or len(fdt) <= 2
+        raise ProjectFileAppError(msg="", code=ProjectFileAppError.FILE_GEM_INVALID)
+    nddt = fdt[2:]
+    # TODO: implement file type and version check and version conversion
+    FTYPE = fdt[0][4]
+    VERSN = fdt[0][5]
+    ID_SZ = fdt[1][0]
+
+    for nd in nddt:
+        ndnm = nd[0:NDTG_LEN].decode("ASCII")
+        inp_size = None
+        out_size = None
+        const_size = None
+        # input fields stores all of its input field id
+        # output fields only stores an array of referenced inp field's id
+        fld_inp = []
+        fld_out = [-1]  # will be read as index -1 after first append; only here bc IndexError
+        tmp_out_refs = []
+        fld_const = [-1]  # will be read as index -1 after first append; only here bc IndexError
+
+        cbuf = b""
+        mode = "sizes"
+        for i in range(NDTG_LEN, NDTG_LEN+len(nd[NDTG_LEN:])):
+            if len(cbuf) == _COLLC_SIZE and mode == "sizes":
+                if inp_size is None:
+                    inp_size = int.from_bytes(cbuf, "big")
+                elif out_size is None:
+                    out_size = int.from_bytes(cbuf, "big")
+                elif const_size is None:
+                    const_size = int.from_bytes(cbuf, "big")
+                    # dprint("SIZES BEF", inp_size, out_size, const_size)
+                    if inp_size > 0:
+                        mode = "inp"
+                    elif out_size > 0:
+                        mode = "ref_sizes"
+                    elif const_size > 0:
+                        mode = "const_dt_sizes"
+                    else:
+                        mode = None
+
+                cbuf = nd[i:i + 1]
+            elif len(cbuf) == ID_SZ and mode == "inp":
+                if inp_size > 1:
+                    fld_inp.append(int.from_bytes(cbuf, "big"))
+                    inp_size -= 1
+                else:
+                    fld_inp.append(int.from_bytes(cbuf, "big"))
+
+                    if out_size > 0:
+                        mode = "ref_sizes"
+                    elif const_size > 0:
+                        mode = "const_dt_sizes"
+                    else:
+                        mode = None
+                cbuf = nd[i:i + 1]
+            elif len(
+                    cbuf) == _COLLC_SIZE and mode == "ref_sizes":  # getting the length of the ref inps
+                # there will always be an integer in the fld_out list to signify its size before
+                # it properly converts into a further subarray of connected referenced inputs within a
+                # single output connector
+                if out_size > 0:
+                    ref_size = int.from_bytes(cbuf, "big")
+                    out_size -= 1
+                    if ref_size > 0:
+                        fld_out.append(int.from_bytes(cbuf, "big"))
+                        mode = "out"
+                    else:
+                        fld_out.append([])
+                    cbuf = nd[i:i + 1]
+                else:
+                    mode = "const_dt_sizes"
+                    cbuf += nd[i:i + 1]
+            elif len(
+                    cbuf) == ID_SZ and mode == "out":  # reads each input id referenced from one out
+                if fld_out[-1] > 1:
+                    tmp_out_refs.append(int.from_bytes(cbuf, "big"))
+                    fld_out[-1] -= 1
+                elif fld_out[-1] == 1:
+                    tmp_out_refs.append(int.from_bytes(cbuf, "big"))
+                    fld_out[-1] = tmp_out_refs.copy()
+                    tmp_out_refs.clear()
+
+                if out_size != 0 and type(fld_out[-1]) == list:
+                    mode = "ref_sizes"
+                elif out_size == 0 and type(fld_out[-1]) == list:
+                    mode = "const_dt_sizes"
+                cbuf = nd[i:i + 1]
+            elif len(cbuf) == _CONST_COLLC_SIZE and mode == "const_dt_sizes":
+                # there will always be an integer in the fld_out list to signify its size before
+                # it properly converts into a further subarray of connected referenced inputs within a
+                # single output connector
+                fld_const.append(int.from_bytes(cbuf, "big"))
+                mode = "const"
+                cbuf = nd[i:i + 1]
+            elif len(cbuf) == fld_const[-1] and mode == "const":
+                fld_const[-1] = cbuf
+                if const_size > 0:
+                    mode = "const_dt_sizes"
+                else:
+                    mode = None  # end
+                cbuf = nd[i:i + 1]
+            elif fld_const[-1] == 0 and mode == "const":
+                del fld_const[-1]
+                if const_size > 0:
+                    mode = "const_dt_sizes"
+                else:
+                    mode = None  # end
+                cbuf += nd[i:i + 1]
+            else:
+                cbuf += nd[i:i + 1]
+        node_exec_dt = {}
+        node_exec_dt["ndtg"] = ndnm
+        node_exec_dt["inp"] = fld_inp
+        node_exec_dt["out"] = fld_out[1:]
+        # TODO: optimization: maybe directly set the object instead of trashing the field data
+
+        node_exec_dt["const"] = {name: val for (name, val) in
+                                 zip(list(node_class_ref[ndnm]._field_data()["constant"]), fld_const[1:])}
+        exec_dt.append(node_exec_dt)
+    return exec_dt
+
+
+def seconds(func, data: bytes, repeat: int) -> float:
+    t = time.perf_counter()
+    for _ in range(repeat):
+        func(data)
+    return (time.perf_counter() - t) / repeat
+
+
+def main():
+    const_size = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+
+    print(f"constants of up to {const_size} bytes")
+    print(f"{'':>7} {'version 2':>45} {'version 3':>24}")
+    print(f"{'nodes':>7} {'file (KB)':>10} {'legacy (ms)':>12} {'struct (ms)':>12} {'speedup':>8} "
+          f"{'file (KB)':>10} {'load (ms)':>12}")
+    for nodes in NODES:
+        exec_dt = synthetic_exec_dt(nodes, const_size)
+        data = gem_format.dumps(exec_dt, version=2)
+        data_v3 = gem_format.dumps(exec_dt)
+        repeat = max(1, 1000 // nodes)
+        # (also builds the constant names once)
+        assert legacy_loads(data) == gem_format.loads(data) == gem_format.loads(data_v3) == exec_dt
+        legacy = seconds(legacy_loads, data, repeat)
+        new = seconds(gem_format.loads, data, repeat)
+        new_v3 = seconds(gem_format.loads, data_v3, repeat)
+        print(f"{nodes:>7} {len(data) / 1024:>10.1f} {legacy * 1e3:>12.1f} {new * 1e3:>12.2f} {legacy / new:>7.0f}x "
+              f"{len(data_v3) / 1024:>10.1f} {new_v3 * 1e3:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
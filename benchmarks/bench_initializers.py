@@ -0,0 +1,87 @@
+"""
+Training steps each weight initializer needs to bring the loss within 1% of the least squares optimum, on the
+Testing-XIII linear regression model with iris.csv and with winequalityN.csv (4 of its numerical columns against the
+quality, since the Linear Regression node takes 4 features).
+
+    python benchmarks/bench_initializers.py [optimizer] [rate] [max steps] [seed]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from bench_train_step import IRIS, LINREG_EXEC_DT
+from node_graph.execution import ModelTrainer
+from node_graph.initializers import INITIALIZERS
+from node_graph.least_squares import solve_affine
+
+WINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "winequalityN.csv")
+WINE_COLUMNS = ["volatile acidity", "chlorides", "density", "alcohol", "quality"]
+
+
+def exec_dt(dependent_var: str) -> list:
+    dt = [dict(nd, const=dict(nd["const"])) for nd in LINREG_EXEC_DT]
+    for nd in dt:
+        if nd["ndtg"] == "InpCV":
+            nd["const"]["dependent var"] = dependent_var.encode()
+    return dt
+
+
+def optimum(csv: str, dependent_var: str) -> float:
+    """
+    the lowest MSE reachable (the labels mapped to codes like InpCV does)
+    """
+    df = pd.read_csv(csv)
+    y = df[dependent_var].map({k: v for (v, k) in enumerate(df[dependent_var].unique().tolist())}).to_numpy()
+    x = df.drop(dependent_var, axis=1).to_numpy()
+    (coef, bias) = solve_affine(x, y)
+    return float(np.mean((x @ coef + bias - y) ** 2))
+
+
+def steps_to_target(csv: str, dependent_var: str, initializer: str, target: float, optimizer: str, rate: float,
+                    max_steps: int, seed: int) -> (int, float, float):
+    inst_state = {"inp": {"a": ("file", csv)}, "out": {"b": ("file-content", "")}, "predicting?": False}
+    trainer = ModelTrainer(exec_dt(dependent_var))
+    trainer.cycle_exec(inst_state, init_setup=True)
+    trainer.hoist_static()
+    trainer.initialize(initializer, seed=seed)
+    step_fn = trainer.train_step(inst_state, "MSE", rate, optimizer=optimizer, compiled=True)
+
+    t = time.perf_counter()
+    steps = 0
+    loss = float("inf")
+    while loss > target and steps < max_steps:
+        loss = float(step_fn())
+        steps += 1
+    elapsed = time.perf_counter() - t
+    return steps, loss, elapsed
+
+
+def main():
+    optimizer = sys.argv[1] if len(sys.argv) > 1 else "Adam"
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+    max_steps = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        wine = os.path.join(tmp, "wine.csv")
+        pd.read_csv(WINE)[WINE_COLUMNS].dropna().to_csv(wine, index=False)
+
+        for (name, csv, dependent_var) in (("iris", IRIS, "species"), ("winequalityN", wine, "quality")):
+            target = optimum(csv, dependent_var) * 1.01
+            print(f"{name}: target MSE {target:.5f} ({optimizer}, rate {rate}, seed {seed})")
+            print(f"{'initializer':>14} {'steps':>7} {'loss':>9} {'time (s)':>9}")
+            for initializer in INITIALIZERS:
+                (steps, loss, elapsed) = steps_to_target(csv, dependent_var, initializer, target, optimizer, rate,
+                                                         max_steps, seed)
+                print(f"{initializer:>14} {steps if loss <= target else f'>{max_steps}':>7} {loss:>9.5f} "
+                      f"{elapsed:>9.2f}")
+            print()
+
+
+if __name__ == "__main__":
+    main()
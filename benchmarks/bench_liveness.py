@@ -0,0 +1,91 @@
+"""
+Peak of the intermediate data the nodes hold during a prediction, with the consumed data released as the plan's
+liveness allows against retained until the end (the old behaviour), on a wide graph over iris.csv (without the
+species) repeated up to <rows> rows: an InpCV feeding <width> chains of <depth> scale nodes, each into a sink.
+
+    python benchmarks/bench_liveness.py [rows] [width] [depth]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import _synthetic
+from node_graph import execution
+from node_graph.execution import ModelPredictor
+
+from bench_train_step import IRIS
+
+
+def wide_graph(width: int, depth: int) -> list:
+    exec_dt = [{"ndtg": "InpCV", "inp": [], "out": [[], []],
+                "const": {"fname": b"a", "has depn. var": b"\xff", "dependent var": b"species"}}]
+    uid = 1
+    for _ in range(width):
+        exec_dt[0]["out"][0].append(uid)
+        for _ in range(depth):
+            exec_dt.append({"ndtg": "BnSCL", "inp": [uid], "out": [[uid + 1]], "const": {}})
+            uid += 1
+        exec_dt.append({"ndtg": "BnSNK", "inp": [uid], "out": [], "const": {}})
+        uid += 1
+    return exec_dt
+
+
+def _nbytes(val) -> int:
+    if hasattr(val, "shape") and hasattr(val, "dtype"):
+        return int(np.prod(val.shape)) * np.dtype(getattr(val.dtype, "as_numpy_dtype", val.dtype)).itemsize
+    return 0
+
+
+def held_bytes(predictor: ModelPredictor) -> int:
+    """
+    the bytes of the (distinct) data referenced by the nodes' inputs & outputs
+    """
+    held = {}
+    for step in predictor.plan.steps:
+        for val in list(step.node.inp.values()) + list(step.node.out.values()):
+            held[id(val)] = _nbytes(val)
+    return sum(held.values())
+
+
+def run(csv: str, width: int, depth: int, retain: bool) -> (int, int, float):
+    predictor = ModelPredictor(wide_graph(width, depth), [], retain=retain)
+    peak = [0]
+    hand_over = execution._hand_over
+
+    def measured(step):
+        hand_over(step)
+        peak[0] = max(peak[0], held_bytes(predictor))
+
+    execution._hand_over = measured
+    try:
+        t = time.perf_counter()
+        predictor.execute({"inp": {"a": ("file", csv)}, "out": {}, "predicting?": True})
+        elapsed = time.perf_counter() - t
+    finally:
+        execution._hand_over = hand_over
+    return peak[0], held_bytes(predictor), elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    depth = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = os.path.join(tmp, "iris.csv")
+        pd.read_csv(IRIS).drop("species", axis=1).sample(rows, replace=True, random_state=0).to_csv(csv, index=False)
+
+        print(f"{rows} rows, {width} chains of {depth} nodes")
+        print(f"{'':>9} {'peak held (MB)':>15} {'held after (MB)':>16} {'time (s)':>9}")
+        for (name, retain) in (("retained", True), ("released", False)):
+            (peak, after, elapsed) = run(csv, width, depth, retain)
+            print(f"{name:>9} {peak / 2**20:>15.1f} {after / 2**20:>16.1f} {elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Cost of the debug logging over a 1000-iteration (eager) training run of the Testing-XIII linear regression model
+(iris.csv): the previous dprint (three inspect.stack() calls per message, every message printed) against the leveled
+logging at debug level (cached call sites, the training loop sampled), at warning level and turned off. The messages
+go to os.devnull, so only the logging itself is measured.
+
+    python benchmarks/bench_logging.py [iterations]
+"""
+
+import builtins
+import contextlib
+import inspect
+import os
+import sys
+import time
+from os import path
+
+import _synthetic
+import __base__
+from node_graph import execution
+from node_graph.execution import ModelTrainer
+
+from bench_train_step import IRIS, LINREG_EXEC_DT
+
+
+def legacy_dprint(*args, **kwargs):
+    """
+    the dprint before the leveled logging
+    """
+    builtins.print(
+        f"{path.relpath(inspect.stack()[1].filename, path.dirname(path.abspath(__base__.__file__)))}:{inspect.stack()[1].lineno}:{inspect.stack()[1].function}",
+        " ¶ ", *args, **kwargs)
+
+
+def legacy_dlog(level, *args, every=1, **fields):
+    # (every message got printed, through the same stack inspection)
+    builtins.print(
+        f"{path.relpath(inspect.stack()[1].filename, path.dirname(path.abspath(__base__.__file__)))}:{inspect.stack()[1].lineno}:{inspect.stack()[1].function}",
+        " ¶ ", *args, *fields.values())
+
+
+def count_lines(func):
+    counted = [0]
+
+    def counting(*args, **kwargs):
+        counted[0] += 1
+        return func(*args, **kwargs)
+    return counting, counted
+
+
+def seconds_to_train(iterations: int, dprint, dlog) -> (float, int):
+    (dprint, printed) = count_lines(dprint)
+    (dlog, logged) = count_lines(dlog)
+    (execution.dprint, execution.dlog) = (dprint, dlog)
+    inst_state = {"inp": {"a": ("file", IRIS)}, "out": {"b": ("file-content", "")}, "predicting?": False}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        t = time.perf_counter()
+        ModelTrainer(LINREG_EXEC_DT).execute(iterations, "MSE", 0.01, inst_state)
+        elapsed = time.perf_counter() - t
+    return elapsed, printed[0] + logged[0]
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    print(f"{iterations} iterations")
+    print(f"{'':>24} {'time (s)':>9} {'calls':>7}")
+    for (name, level, (dprint, dlog)) in (("before (inspect.stack)", None, (legacy_dprint, legacy_dlog)),
+                                          ("after, debug", "debug", (__base__._dprint, __base__._dlog)),
+                                          ("after, warning", "warning", (__base__._dprint, __base__._dlog)),
+                                          ("after, off", "off", (__base__._silent, __base__._silent))):
+        if level is not None:
+            __base__.set_log_level(level)
+        (elapsed, calls) = seconds_to_train(iterations, dprint, dlog)
+        print(f"{name:>24} {elapsed:>9.2f} {calls:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Per-step cost of each loss (the loss and its gradient with respect to the prediction) on 10^6 rows, eagerly and
+traced, next to the old MSE summing the tensor through Python's sum() (on far fewer rows, it iterates element by
+element).
+
+    python benchmarks/bench_losses.py [rows] [classes] [steps]
+"""
+
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+
+import _synthetic
+from node_graph.loss_funcs import LOSS_FUNCTIONS
+
+
+def legacy_mse(ypred, y):
+    n = len(ypred)
+    return sum((ypred - y) ** 2) / n
+
+
+def ms_per_step(loss_func, ypred: tf.Tensor, y: tf.Tensor, steps: int, compiled: bool) -> float:
+    def step(ypred, y):
+        with tf.GradientTape() as g:
+            g.watch(ypred)
+            loss = loss_func(ypred, y)
+        return loss, g.gradient(loss, ypred)
+
+    if compiled:
+        step = tf.function(step, autograph=False)
+    step(ypred, y)  # warm up (and trace)
+
+    t = time.perf_counter()
+    for _ in range(steps):
+        (loss, grad) = step(ypred, y)
+    grad.numpy()
+    return (time.perf_counter() - t) / steps * 1e3
+
+
+def data(name: str, rows: int, classes: int, rng: np.random.Generator) -> (tf.Tensor, tf.Tensor):
+    if name in ("MSE", "MAE", "Huber"):
+        return (tf.constant(rng.normal(size=rows), tf.float32), tf.constant(rng.normal(size=rows), tf.float32))
+    if name == "Binary Cross-Entropy":
+        return (tf.constant(rng.uniform(size=rows), tf.float32),
+                tf.constant(rng.integers(0, 2, size=rows), tf.float32))
+    labels = tf.one_hot(rng.integers(0, classes, size=rows), classes)
+    logits = tf.constant(rng.normal(size=(rows, classes)), tf.float32)
+    return (tf.nn.softmax(logits) if name == "Categorical Cross-Entropy" else logits), labels
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    classes = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    steps = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    rng = np.random.default_rng(0)
+
+    print(f"{rows} rows ({classes} classes for the categorical losses)")
+    print(f"{'loss':>26} {'eager (ms/step)':>16} {'traced (ms/step)':>17}")
+    for (name, loss_func) in LOSS_FUNCTIONS.items():
+        (ypred, y) = data(name, rows, classes, rng)
+        eager = ms_per_step(loss_func, ypred, y, steps, compiled=False)
+        traced = ms_per_step(loss_func, ypred, y, steps, compiled=True)
+        print(f"{name:>26} {eager:>16.2f} {traced:>17.2f}")
+
+    # what the fused softmax-cross-entropy replaces: a softmax node followed by the categorical cross-entropy
+    cce = LOSS_FUNCTIONS["Categorical Cross-Entropy"]
+    unfused = lambda logits, y: cce(tf.nn.softmax(logits), y)
+    (ypred, y) = data("Softmax Cross-Entropy", rows, classes, rng)
+    eager = ms_per_step(unfused, ypred, y, steps, compiled=False)
+    traced = ms_per_step(unfused, ypred, y, steps, compiled=True)
+    print(f"{'softmax + categorical CE':>26} {eager:>16.2f} {traced:>17.2f}")
+
+    legacy_rows = 10 ** 4
+    (ypred, y) = data("MSE", legacy_rows, classes, rng)
+    legacy = ms_per_step(legacy_mse, ypred, y, 1, compiled=False)
+    print(f"{'old MSE (python sum)':>26} {legacy:>16.2f} {'-':>17}   on {legacy_rows} rows")
+
+
+if __name__ == "__main__":
+    main()
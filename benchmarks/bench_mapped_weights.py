@@ -0,0 +1,81 @@
+"""
+Memory & load time of a model's weights in several worker processes (as pre-forked server workers would each load
+the model): the *.w.npz file read into tf.Variables against the weight bundle memory-mapped into tensors (see
+weight_bundle). Every worker loads the weights and reads all of them once (a reduce_sum over each), then reports the
+anonymous (private) memory it grew by--the mapped weights stay in the page cache, shared between the workers.
+
+Linux only (reads /proc/self/smaps_rollup).
+
+    python benchmarks/bench_mapped_weights.py [workers] [weight MB]
+"""
+
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import _synthetic
+import weight_bundle
+
+
+def anonymous_mb() -> float:
+    gc.collect()
+    with open("/proc/self/smaps_rollup") as fo:
+        for line in fo:
+            if line.startswith("Anonymous:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def worker(dpath: str, mapped: bool):
+    import tensorflow as tf
+    tf.constant(0.0) + 1.0  # (TensorFlow's own start up isn't measured)
+
+    before = anonymous_mb()
+    t = time.perf_counter()
+    if mapped:
+        weights = weight_bundle.as_tensors(weight_bundle.load(dpath, "bench"))
+    else:
+        with np.load(os.path.join(dpath, "bench.w.npz")) as npz_obj:
+            weights = [tf.Variable(npz_obj[f"arr_{ind}"]) for ind in range(len(npz_obj))]
+    elapsed = time.perf_counter() - t
+    total = sum(float(tf.reduce_sum(w)) for w in weights)
+    print(f"{elapsed} {anonymous_mb() - before} {total}")
+
+
+def main():
+    if sys.argv[1:2] == ["--worker"]:
+        worker(sys.argv[2], sys.argv[3] == "mapped")
+        return
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    megabytes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    rng = np.random.default_rng(0)
+    # (a few large weight matrices & their biases)
+    arrays = []
+    for _ in range(4):
+        arrays.append(rng.standard_normal((megabytes * 2**18 // 4 // 1024, 1024), dtype=np.float32))
+        arrays.append(rng.standard_normal(1024, dtype=np.float32))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        np.savez(os.path.join(tmp, "bench.w.npz"), *arrays)
+        weight_bundle.save(tmp, "bench", arrays)
+        del arrays
+
+        print(f"{workers} workers, {megabytes} MB of weights")
+        print(f"{'':>8} {'load (ms)':>10} {'private MB per worker':>22} {'private MB in all':>18}")
+        for kind in ("npz", "mapped"):
+            procs = [subprocess.Popen([sys.executable, __file__, "--worker", tmp, kind], stdout=subprocess.PIPE,
+                                      stderr=subprocess.DEVNULL, text=True) for _ in range(workers)]
+            results = [tuple(map(float, proc.communicate()[0].split()[-3:])) for proc in procs]
+            load = sum(r[0] for r in results) / workers
+            private = [r[1] for r in results]
+            print(f"{kind:>8} {load * 1e3:>10.1f} {sum(private) / workers:>22.1f} {sum(private):>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
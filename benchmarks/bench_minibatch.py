@@ -0,0 +1,66 @@
+"""
+Time per training step of full-batch gradient descent against mini-batch SGD as the data grows, on the Testing-XIII
+linear regression model with iris.csv repeated up to the given row counts.
+
+    python benchmarks/bench_minibatch.py [batch size] [steps]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+
+from bench_train_step import IRIS, LINREG_EXEC_DT
+from node_graph.execution import ModelTrainer
+
+ROWS = (10_000, 100_000, 1_000_000)
+
+
+def ms_per_step(csv: str, steps: int, batch_size: int = 0) -> float:
+    inst_state = {"inp": {"a": ("file", csv)}, "out": {"b": ("file-content", "")}, "predicting?": False}
+    trainer = ModelTrainer(LINREG_EXEC_DT)
+    trainer.cycle_exec(inst_state, init_setup=True)
+    trainer.hoist_static()
+    feeds = tuple(producer.out[ofld_nm] for (producer, ofld_nm, _slots) in trainer.static_feeds)
+    rows = trainer.expc_out.shape[0]
+
+    if batch_size == 0:
+        step_fn = trainer.train_step(inst_state, "MSE", 0.01)
+        run = lambda i: step_fn()
+    else:
+        step_fn = trainer.train_step(inst_state, "MSE", 0.01, batched=True)
+        order = np.random.default_rng(0).permutation(rows)
+
+        def run(i):
+            idx = order[(i * batch_size) % rows:][:batch_size]
+            return step_fn(tuple(tf.gather(val, idx) for val in feeds), tf.gather(trainer.expc_out, idx))
+
+    run(0)
+    t = time.perf_counter()
+    for i in range(steps):
+        run(i)
+    elapsed = time.perf_counter() - t
+    return elapsed / steps * 1e3
+
+
+def main():
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    iris = pd.read_csv(IRIS)
+    print(f"{'rows':>10} {'full batch (ms/step)':>21} {f'batch {batch_size} (ms/step)':>21}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in ROWS:
+            csv = os.path.join(tmp, f"iris_{rows}.csv")
+            iris.sample(rows, replace=True, random_state=0).to_csv(csv, index=False)
+            full = ms_per_step(csv, steps)
+            mini = ms_per_step(csv, steps, batch_size)
+            print(f"{rows:>10} {full:>21.3f} {mini:>21.3f}")
+
+
+if __name__ == "__main__":
+    main()
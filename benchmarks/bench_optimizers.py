@@ -0,0 +1,45 @@
+"""
+Training steps each optimizer needs to bring the loss under a target, on the Testing-XIII linear regression model
+(iris.csv).
+
+    python benchmarks/bench_optimizers.py [target loss] [rate] [max steps]
+"""
+
+import sys
+import time
+
+from bench_train_step import IRIS, LINREG_EXEC_DT
+from node_graph.execution import ModelTrainer
+from node_graph.optimizers import OPTIMIZERS
+
+
+def steps_to_target(optimizer: str, target: float, rate: float, max_steps: int) -> (int, float, float):
+    inst_state = {"inp": {"a": ("file", IRIS)}, "out": {"b": ("file-content", "")}, "predicting?": False}
+    trainer = ModelTrainer(LINREG_EXEC_DT)
+    trainer.cycle_exec(inst_state, init_setup=True)
+    trainer.hoist_static()
+    step_fn = trainer.train_step(inst_state, "MSE", rate, optimizer=optimizer, compiled=True)
+
+    t = time.perf_counter()
+    steps = 0
+    loss = float("inf")
+    while loss > target and steps < max_steps:
+        loss = float(step_fn())
+        steps += 1
+    elapsed = time.perf_counter() - t
+    return steps, loss, elapsed
+
+
+def main():
+    target = float(sys.argv[1]) if len(sys.argv) > 1 else 0.05
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+    max_steps = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+    print(f"target loss {target}, rate {rate}")
+    print(f"{'optimizer':>10} {'steps':>7} {'loss':>9} {'time (s)':>9}")
+    for optimizer in OPTIMIZERS:
+        (steps, loss, elapsed) = steps_to_target(optimizer, target, rate, max_steps)
+        print(f"{optimizer:>10} {steps if loss <= target else f'>{max_steps}':>7} {loss:>9.5f} {elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
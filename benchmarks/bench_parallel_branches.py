@@ -0,0 +1,46 @@
+"""
+Time per prediction of a graph of independent heavy branches (a source feeding <branches> matmul nodes, each into a
+sink of its own) with the plan replayed serially against the branches scheduled on a thread pool of 2, 4 & 8 workers.
+The results have to match the serial ones exactly.
+
+    python benchmarks/bench_parallel_branches.py [branches] [repeat]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+import _synthetic
+from node_graph.execution import ModelPredictor
+
+
+def run(workers: int, branches: int, repeat: int) -> (float, list):
+    predictor = ModelPredictor(_synthetic.branches(branches), [], workers=workers, retain=True)  # (to compare)
+    sinks = [step.node for step in predictor.plan.steps if step.node.ndtg == "BnSNK"]
+    predictor.execute({"inp": {}, "out": {}})
+
+    t = time.perf_counter()
+    for _ in range(repeat):
+        predictor.execute({"inp": {}, "out": {}})
+    elapsed = (time.perf_counter() - t) / repeat
+    return elapsed * 1e3, [np.asarray(sink.inp["data"]) for sink in sinks]
+
+
+def main():
+    branches = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    (serial, expected) = run(1, branches, repeat)
+    print(f"{branches} branches of {_synthetic.MATMUL_REPEAT} {_synthetic.MATMUL_SIZE}x{_synthetic.MATMUL_SIZE} "
+          f"matmuls")
+    print(f"{'workers':>8} {'ms/prediction':>14} {'speedup':>8} {'same results':>13}")
+    print(f"{'serial':>8} {serial:>14.2f} {1:>8.2f} {'-':>13}")
+    for workers in (2, 4, 8):
+        (elapsed, results) = run(workers, branches, repeat)
+        same = all(np.array_equal(a, b) for (a, b) in zip(expected, results))
+        print(f"{workers:>8} {elapsed:>14.2f} {serial / elapsed:>8.2f} {str(same):>13}")
+
+
+if __name__ == "__main__":
+    main()
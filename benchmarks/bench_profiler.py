@@ -0,0 +1,61 @@
+"""
+Cost of the node profiler: predictions per second of the Testing-XIII linear regression model (iris.csv) and of a
+long chain of cheap synthetic nodes, with no profiler attached against one recording every node. Writes the last
+profile's JSON report and Chrome trace next to each other in the given directory if one is given.
+
+    python benchmarks/bench_profiler.py [predictions] [chain length] [output directory]
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+import tensorflow as tf
+
+import _synthetic
+from node_graph.execution import ModelPredictor
+from node_graph.profiler import NodeProfiler
+
+from bench_train_step import IRIS, LINREG_EXEC_DT
+
+
+def predictions_per_second(predictor: ModelPredictor, inst_state: dict, predictions: int,
+                           profiler=None) -> float:
+    predictor.profiler = profiler
+    predictor.execute(inst_state)
+    t = time.perf_counter()
+    for _ in range(predictions):
+        predictor.execute(inst_state)
+    return predictions / (time.perf_counter() - t)
+
+
+def main():
+    predictions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    length = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    out_dir = sys.argv[3] if len(sys.argv) > 3 else None
+
+    x = pd.read_csv(IRIS).drop("species", axis=1).to_csv(index=False)
+    cases = (
+        ("linear regression", ModelPredictor(LINREG_EXEC_DT, [tf.Variable([0.3, -0.2, 0.5, 0.1]), tf.Variable(0.25)]),
+         {"inp": {"a": ("file-content", x)}, "out": {"b": ("file-content", "")}, "predicting?": True}),
+        (f"chain of {length}", ModelPredictor(_synthetic.wide_chain(length), []),
+         {"inp": {}, "out": {}}),
+    )
+
+    print(f"{'':>20} {'off (pred/s)':>13} {'on (pred/s)':>12} {'overhead':>9}")
+    profiler = None
+    for (name, predictor, inst_state) in cases:
+        off = predictions_per_second(predictor, inst_state, predictions)
+        profiler = NodeProfiler()
+        on = predictions_per_second(predictor, inst_state, predictions, profiler)
+        print(f"{name:>20} {off:>13.0f} {on:>12.0f} {off / on - 1:>9.1%}")
+
+    if out_dir is not None:
+        profiler.save_json(os.path.join(out_dir, "profile.json"))
+        profiler.save_chrome_trace(os.path.join(out_dir, "profile.trace.json"))
+        print(f"wrote {len(profiler.nodes)} nodes & {len(profiler.events)} trace events to {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
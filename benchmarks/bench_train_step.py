@@ -0,0 +1,56 @@
+"""
+Training steps per second of the eager training step against the compiled (tf.function) one, with and without XLA,
+on the Testing-XIII linear regression model (iris.csv).
+
+    python benchmarks/bench_train_step.py [steps]
+"""
+
+import os
+import sys
+import time
+
+import _synthetic
+from node_graph.execution import ModelTrainer
+
+
+IRIS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Testing-XIII", "resources", "iris.csv")
+
+# the exec data of Testing-XIII/models/LinReg.gem: InpCV -> LRMDL -> OutCV
+LINREG_EXEC_DT = [
+    {"ndtg": "LRMDL", "inp": [3], "out": [[5]], "const": {}},
+    {"ndtg": "OutCV", "inp": [5], "out": [], "const": {"fname": b"b"}},
+    {"ndtg": "InpCV", "inp": [], "out": [[3], []],
+     "const": {"fname": b"a", "has depn. var": b"\xff", "dependent var": b"species"}},
+]
+
+
+def steps_per_second(steps: int, **mode) -> (float, float, float):
+    inst_state = {"inp": {"a": ("file", IRIS)}, "out": {"b": ("file-content", "")}, "predicting?": False}
+    trainer = ModelTrainer(LINREG_EXEC_DT)
+    trainer.cycle_exec(inst_state, init_setup=True)
+    trainer.hoist_static()
+    step_fn = trainer.train_step(inst_state, "MSE", 0.01, **mode)
+
+    t = time.perf_counter()
+    step_fn()  # includes the tracing when compiled
+    first = time.perf_counter() - t
+
+    t = time.perf_counter()
+    for _ in range(steps):
+        loss = step_fn()
+    sps = steps / (time.perf_counter() - t)
+    return sps, first, float(loss)
+
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"{'mode':>16} {'steps/s':>10} {'first step (ms)':>16} {'final loss':>11}")
+    for (name, mode) in (("eager", {}),
+                         ("compiled", {"compiled": True}),
+                         ("compiled + XLA", {"compiled": True, "jit_compile": True})):
+        (sps, first, loss) = steps_per_second(steps, **mode)
+        print(f"{name:>16} {sps:>10.1f} {first * 1e3:>16.1f} {loss:>11.5f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Round-trip & fuzz check of the *.gem reader/writer (gem_format):
+
+1. the shipped (version 2) models re-encode byte for byte, parse like the legacy parser does and read the same
+   once upgraded to version 3
+2. random exec data (empty collections, empty & 64KB constants included) survive dumps() -> loads() in both versions
+   (and the indexed layout, read whole & through MappedExecData), and match the legacy parser on version 2 wherever
+   it parses correctly (it drops empty constant values)
+3. version 3 holds what version 2 can't (ids & counts over 255, constants over 64KB), which version 2 refuses with
+   ProjectFileAppError(FILE_GEM_LIMIT_EXCEEDED), and a node missing a constant its class declares is refused with
+   ProjectFileAppError(FILE_GEM_INVALID) by every writer
+4. ModelFileHandler.save_model -> load_model gives the exec data back, from version 2 & indexed files too, and a save
+   leaves another handler's mapping of the indexed file readable
+5. randomly corrupted files (flipped, inserted & deleted bytes, truncations) of both versions & layouts either parse
+   or raise ProjectFileAppError(FILE_GEM_INVALID)--nothing else, mapped ones node by node too
+
+Exits with a non-zero status on any failure.
+
+    python benchmarks/check_gem_format.py [random graphs] [corruptions]
+"""
+
+import glob
+import os
+import sys
+import tempfile
+
+import numpy as np
+import tensorflow as tf
+
+import _synthetic
+import gem_format
+import project  # (file_handler's import order)
+from errors import ProjectFileAppError
+from file_handler import ModelFileHandler
+
+from bench_gem_parser import legacy_loads, synthetic_exec_dt
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def check_shipped() -> int:
+    failures = 0
+    for fpath in glob.glob(os.path.join(ROOT, "Testing-XIII", "models", "*.gem")):
+        with open(fpath, "rb") as fbo:
+            data = fbo.read()
+        exec_dt = gem_format.loads(data)
+        ok = (gem_format.dumps(exec_dt, version=2) == data and legacy_loads(data) == exec_dt
+              and gem_format.loads(gem_format.dumps(exec_dt)) == exec_dt)
+        print(f"{os.path.relpath(fpath, ROOT)}: {len(exec_dt)} nodes, {'ok' if ok else 'MISMATCH'}")
+        failures += not ok
+    return failures
+
+
+def mapped(data: bytes) -> list:
+    """
+    every node read through a MappedExecData of the data
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        fpath = os.path.join(tmp, "mapped.gem")
+        with open(fpath, "wb") as fbo:
+            fbo.write(data)
+        exec_dt = gem_format.MappedExecData(fpath)
+        try:
+            return [exec_dt[ind] for ind in range(len(exec_dt))]
+        finally:
+            exec_dt.close()
+
+
+def check_random(graphs: int) -> int:
+    failures = 0
+    for seed in range(graphs):
+        nodes = int(np.random.default_rng(seed).integers(0, 60))
+        exec_dt = synthetic_exec_dt(nodes, 300 if seed % 10 else 65535, seed=seed, min_const_size=0)
+        for version in (2, 3):
+            failures += gem_format.loads(gem_format.dumps(exec_dt, version=version)) != exec_dt
+        data = gem_format.dumps(exec_dt, indexed=True)
+        failures += not (gem_format.loads(data) == exec_dt and (seed % 10 or mapped(data) == exec_dt))
+
+        exec_dt = synthetic_exec_dt(nodes, 300, seed=seed)
+        data = gem_format.dumps(exec_dt, version=2)
+        failures += not (gem_format.loads(data) == legacy_loads(data) == exec_dt)
+    print(f"{graphs} random graphs: {failures} failures")
+    return failures
+
+
+def check_limits() -> int:
+    failures = 0
+    rng = np.random.default_rng(0)
+    for (max_id, const_size, nodes) in ((2**32, 10, 50), (300, 70_000, 3), (255, 10, 1)):
+        exec_dt = synthetic_exec_dt(nodes, const_size, max_id=max_id, min_const_size=const_size // 2)
+        if nodes == 1:  # (over 255 inputs)
+            exec_dt[0]["inp"] = [int(uid) for uid in rng.integers(0, 256, 1000)]
+        failures += gem_format.loads(gem_format.dumps(exec_dt)) != exec_dt
+        try:
+            gem_format.dumps(exec_dt, version=2)
+            failures += 1
+        except ProjectFileAppError as e:
+            failures += e.code != ProjectFileAppError.FILE_GEM_LIMIT_EXCEEDED
+
+    exec_dt = synthetic_exec_dt(5, 10, seed=1)
+    node = next(node for node in exec_dt if len(node["const"]) != 0)
+    del node["const"][next(iter(node["const"]))]
+    for options in ({"version": 2}, {}, {"indexed": True}):
+        try:
+            gem_format.dumps(exec_dt, **options)
+            failures += 1
+        except ProjectFileAppError as e:
+            failures += e.code != ProjectFileAppError.FILE_GEM_INVALID
+    print(f"over the version 2 limits & missing constants: {failures} failures")
+    return failures
+
+
+def check_file_handler() -> int:
+    failures = 0
+    for (version, indexed) in ((2, False), (3, False), (3, True)):
+        exec_dt = synthetic_exec_dt(40, 100, seed=1, min_const_size=0)
+        with tempfile.TemporaryDirectory() as tmp:
+            mhndl = ModelFileHandler(tmp, "fuzz")
+            (mhndl.exec_dt, mhndl.weights, mhndl.indexed_gem) = (exec_dt, [tf.Variable([1.0, 2.0])], indexed)
+            mhndl.save_model()
+            if version == 2:
+                with open(os.path.join(tmp, "fuzz.gem"), "wb") as fbo:
+                    fbo.write(gem_format.dumps(exec_dt, version=2))
+            loaded = ModelFileHandler(tmp, "fuzz")
+            loaded.load_model()
+            ok = isinstance(loaded.exec_dt, gem_format.MappedExecData) == indexed and list(loaded.exec_dt) == exec_dt
+            other = ModelFileHandler(tmp, "fuzz")
+            other.load_model()
+            loaded.save_model()  # (over the file both have mapped, if indexed)
+            with open(os.path.join(tmp, "fuzz.gem"), "rb") as fbo:
+                data = fbo.read()
+            ok &= list(other.exec_dt) == exec_dt
+        ok &= (loaded.exec_dt == exec_dt and gem_format.file_version(data) == gem_format.GEM_FVERS
+               and gem_format.is_indexed(data) == indexed)
+        name = "indexed" if indexed else f"version {version}"
+        print(f"save_model -> load_model ({name}) -> save_model: {'ok' if ok else 'MISMATCH'}")
+        failures += not ok
+    return failures
+
+
+def corrupt(data: bytes, rng) -> bytes:
+    data = bytearray(data)
+    for _ in range(int(rng.integers(1, 4))):
+        kind = rng.integers(0, 4)
+        pos = int(rng.integers(0, len(data) + 1))
+        if kind == 0 and pos < len(data):
+            data[pos] = int(rng.integers(0, 256))
+        elif kind == 1:
+            data[pos:pos] = rng.bytes(int(rng.integers(1, 4)))
+        elif kind == 2:
+            del data[pos:pos + int(rng.integers(1, 4))]
+        else:
+            del data[pos:]
+    return bytes(data)
+
+
+def check_corrupted(corruptions: int) -> int:
+    rng = np.random.default_rng(0)
+    (parsed, rejected, failures) = (0, 0, 0)
+    for ind in range(corruptions):
+        exec_dt = synthetic_exec_dt(int(rng.integers(1, 20)), 40, seed=ind, max_id=255 if ind % 3 else 100_000)
+        data = corrupt(gem_format.dumps(exec_dt, version=2 if ind % 3 == 1 else 3, indexed=ind % 3 == 2), rng)
+        read = mapped if ind % 3 == 2 and ind % 10 < 3 else gem_format.loads  # (a share of the indexed ones mapped)
+        try:
+            read(data)
+            parsed += 1
+        except ProjectFileAppError as e:
+            rejected += 1
+            failures += e.code != ProjectFileAppError.FILE_GEM_INVALID
+        except Exception as e:
+            print(f"corruption {ind}: {type(e).__name__}: {e}")
+            failures += 1
+    print(f"{corruptions} corrupted files: {parsed} parsed, {rejected} rejected, {failures} failures")
+    return failures
+
+
+def main():
+    graphs = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    corruptions = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    failures = (check_shipped() + check_random(graphs) + check_limits() + check_file_handler()
+                + check_corrupted(corruptions))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Round-trip check of the model weights through ModelFileHandler, as *.w.npz and as a mapped weight bundle
+(weight_bundle), on the Testing-XIII linear regression model (a (4,) coefficient vector & a scalar bias):
+
+1. save_model -> load_model gives back weights of the same shapes, dtypes & values, then again after switching from
+   one container to the other
+2. a warm started training after the reload actually starts from the loaded weights (the trainer only takes them if
+   every shape matches the model's)
+
+Exits with a non-zero status on any failure.
+
+    python benchmarks/check_weight_bundle.py
+"""
+
+import sys
+import tempfile
+
+import numpy as np
+import tensorflow as tf
+
+import _synthetic
+import project  # (file_handler's import order)
+from file_handler import ModelFileHandler
+
+from bench_train_step import IRIS, LINREG_EXEC_DT
+
+WEIGHTS = [np.array([0.3, -0.2, 0.5, 0.1], dtype=np.float32), np.array(0.25, dtype=np.float32)]
+
+
+def same(weights, expected) -> bool:
+    arrays = [np.asarray(w) for w in weights]
+    return (len(arrays) == len(expected)
+            and all(a.shape == e.shape and a.dtype == e.dtype and np.array_equal(a, e)
+                    for (a, e) in zip(arrays, expected)))
+
+
+def check_round_trips() -> int:
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        mhndl = ModelFileHandler(tmp, "linreg")
+        (mhndl.exec_dt, mhndl.weights) = (LINREG_EXEC_DT, [tf.Variable(w) for w in WEIGHTS])
+        for mapped in (True, False, True):
+            mhndl.mapped_weights = mapped
+            mhndl.save_model()
+            mhndl = ModelFileHandler(tmp, "linreg")
+            mhndl.load_model()
+            ok = mhndl.mapped_weights == mapped and same(mhndl.weights, WEIGHTS)
+            shapes = [tuple(w.shape) for w in mhndl.weights]
+            print(f"save_model -> load_model ({'mapped' if mapped else 'npz'}): {shapes}, {'ok' if ok else 'MISMATCH'}")
+            failures += not ok
+
+        inst_state = {"inp": {"a": ("file", IRIS)}, "out": {"b": ("file-content", "")}, "predicting?": False}
+        report = mhndl.train_model(inst_state, iters=2, loss_name="MSE", rate=0.01, warm_start=True)
+        ok = report.get("warm started") is True
+        print(f"warm start after the reload: {'ok' if ok else 'NOT WARM STARTED'}")
+        failures += not ok
+    return failures
+
+
+def main():
+    sys.exit(1 if check_round_trips() else 0)
+
+
+if __name__ == "__main__":
+    main()
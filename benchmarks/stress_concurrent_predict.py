@@ -0,0 +1,138 @@
+"""
+Stress check of concurrent predictions sharing one set of weights: every thread predicts random row samples of
+iris.csv and compares each result with the linear regression computed directly from the weights.
+
+1. one ModelPredictor per thread, all over the same weights vector
+2. ModelFileHandler.predict_model called from all the threads at once (its predictor pool)
+3. two Linear Regression nodes in one graph, each bound to its own weights
+
+Exits with a non-zero status on any mismatch.
+
+    python benchmarks/stress_concurrent_predict.py [threads] [predictions per thread]
+"""
+
+import os
+import sys
+import threading
+import time
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+
+import _synthetic
+import project  # (file_handler's import order)
+from file_handler import ModelFileHandler
+from node_graph.execution import ModelPredictor
+
+from bench_train_step import IRIS, LINREG_EXEC_DT
+
+
+MODELS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Testing-XIII", "models")
+
+# InpCV feeding two Linear Regression nodes, each with its own output
+TWIN_EXEC_DT = [
+    {"ndtg": "InpCV", "inp": [], "out": [[3, 7], []],
+     "const": {"fname": b"a", "has depn. var": b"\xff", "dependent var": b"species"}},
+    {"ndtg": "LRMDL", "inp": [3], "out": [[5]], "const": {}},
+    {"ndtg": "OutCV", "inp": [5], "out": [], "const": {"fname": b"b"}},
+    {"ndtg": "LRMDL", "inp": [7], "out": [[9]], "const": {}},
+    {"ndtg": "OutCV", "inp": [9], "out": [], "const": {"fname": b"c"}},
+]
+
+
+def request(x: pd.DataFrame, *outs: str) -> dict:
+    return {"inp": {"a": ("file-content", x.to_csv(index=False))},
+            "out": {out: ("file-content", "") for out in outs}, "predicting?": True}
+
+
+def result(outs: dict, out: str) -> np.ndarray:
+    return pd.read_csv(StringIO(outs[out][1]), index_col=0).to_numpy()[:, 0]
+
+
+def expected(x: pd.DataFrame, coef, bias) -> np.ndarray:
+    return (x.to_numpy() @ np.asarray(coef, dtype=np.float64)) + float(bias)
+
+
+def run_threads(threads: int, work) -> (int, float):
+    """
+    runs work(thread index) in every thread at once; returns the mismatches counted (a thread failing counting as
+    one) and the seconds taken
+    """
+    barrier = threading.Barrier(threads)
+    mismatches = [1] * threads
+
+    def target(ind):
+        barrier.wait()
+        mismatches[ind] = work(ind)
+
+    workers = [threading.Thread(target=target, args=(ind,)) for ind in range(threads)]
+    t = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(mismatches), time.perf_counter() - t
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    data = pd.read_csv(IRIS).drop("species", axis=1)
+    weights = [tf.Variable([0.3, -0.2, 0.5, 0.1]), tf.Variable(0.25)]
+    failed = False
+
+    def predictor_work(ind):
+        rng = np.random.default_rng(ind)
+        predictor = ModelPredictor(LINREG_EXEC_DT, weights, compiled=ind % 2 == 0)  # eager & compiled alike
+        bad = 0
+        for _ in range(per_thread):
+            x = data.sample(int(rng.integers(1, 40)), random_state=rng)
+            pred = result(predictor.execute(request(x, "b")), "b")
+            bad += not np.allclose(pred, expected(x, *weights), atol=1e-4)
+        return bad
+
+    (bad, secs) = run_threads(threads, predictor_work)
+    print(f"{threads} predictors over shared weights: {threads * per_thread} predictions in {secs:.2f}s, "
+          f"{bad} mismatches")
+    failed |= bad != 0
+
+    mhndl = ModelFileHandler(MODELS, "LinReg")
+    mhndl.load_model()
+    model_weights = [w.numpy() for w in mhndl.weights]
+
+    def handler_work(ind):
+        rng = np.random.default_rng(100 + ind)
+        bad = 0
+        for _ in range(per_thread):
+            x = data.sample(int(rng.integers(1, 40)), random_state=rng)
+            pred = result(mhndl.predict_model(request(x, "b")), "b")
+            bad += not np.allclose(pred, expected(x, *model_weights), atol=1e-4)
+        return bad
+
+    (bad, secs) = run_threads(threads, handler_work)
+    print(f"ModelFileHandler from {threads} threads: {threads * per_thread} predictions in {secs:.2f}s, "
+          f"{bad} mismatches, {len(mhndl._predictors)} pooled predictors")
+    failed |= bad != 0
+
+    twin_weights = [tf.Variable([0.3, -0.2, 0.5, 0.1]), tf.Variable(0.25),
+                    tf.Variable([-1.0, 2.0, 0.0, 0.5]), tf.Variable(-3.0)]
+    predictor = ModelPredictor(TWIN_EXEC_DT, twin_weights)
+    x = data.sample(20, random_state=0)
+    outs = predictor.execute(request(x, "b", "c"))
+    bad = 0
+    for (lr_nid, out) in ((1, "b"), (3, "c")):
+        lr_weights = predictor.mdl_ref_dt[lr_nid]["%%class"].weights
+        bad += not np.allclose(result(outs, out), expected(x, lr_weights["coef"].value, lr_weights["bias"].value),
+                               atol=1e-4)
+    indices = {predictor.mdl_ref_dt[nid]["%%class"].weights["coef"].index for nid in (1, 3)}
+    print(f"two Linear Regression nodes in one graph: weight indices {sorted(indices)}, {bad} mismatches")
+    failed |= bad != 0 or len(indices) != 2
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,93 @@
+"""
+Debug logging shared by every module (through the `from __base__ import *` line __autoinject__.py puts on top of them).
+
+    dprint(*args, **fields)                 a debug message
+    dlog(level, *args, every=1, **fields)   a message of the given level (LOG_DEBUG/INFO/WARNING/ERROR)
+
+The args make up the message (joined with spaces like print() does) and the fields are appended as key=value pairs,
+or everything as a JSON object per line with GRAPHICALAI_LOG_FORMAT=json. Nothing is formatted unless the message
+is logged, so pass the values rather than an f-string on hot paths. every=N logs only every N-th call from that line.
+
+Every message is prefixed with where it was logged from (file:line:function), looked up once per call site.
+
+GRAPHICALAI_LOG sets the lowest level logged (debug, info, warning, error or off; debug by default), changeable
+later with set_log_level(). "off" is read once at startup: dprint & dlog are then functions doing nothing at all.
+"""
+
 from os import path
 import builtins
-import inspect
+import json
+import os
+import sys
+
+__all__ = ["dprint", "dlog", "set_log_level", "LOG_DEBUG", "LOG_INFO", "LOG_WARNING", "LOG_ERROR", "LOG_OFF"]
+
+LOG_DEBUG = 10
+LOG_INFO = 20
+LOG_WARNING = 30
+LOG_ERROR = 40
+LOG_OFF = 100
+
+_LEVELS = {"debug": LOG_DEBUG, "info": LOG_INFO, "warning": LOG_WARNING, "error": LOG_ERROR, "off": LOG_OFF}
+_LEVEL_NAMES = {level: name for (name, level) in _LEVELS.items()}
+_ROOT = path.dirname(path.abspath(__file__))
+
+
+class _LogConfig:
+    level = _LEVELS.get(os.environ.get("GRAPHICALAI_LOG", "debug").lower(), LOG_DEBUG)
+    json = os.environ.get("GRAPHICALAI_LOG_FORMAT", "").lower() == "json"
+    sites = {}  # (code, line) to [the call site's "file:line:function", calls]
+
+
+def set_log_level(level: str):
+    """
+    level is one of debug, info, warning, error or off (takes no effect if logging was turned off at startup)
+    """
+    _LogConfig.level = _LEVELS[level.lower()]
+
+
+def _site(frame) -> list:
+    key = (frame.f_code, frame.f_lineno)
+    site = _LogConfig.sites.get(key)
+    if site is None:
+        fname = frame.f_code.co_filename
+        try:
+            fname = path.relpath(fname, _ROOT)
+        except ValueError:  # (another drive)
+            pass
+        site = _LogConfig.sites[key] = [f"{fname}:{frame.f_lineno}:{frame.f_code.co_name}", 0]
+    return site
+
+
+def _emit(level: int, site: list, args: tuple, fields: dict):
+    if _LogConfig.json:
+        builtins.print(json.dumps({"level": _LEVEL_NAMES[level], "site": site[0], "msg": " ".join(map(str, args)),
+                                   **fields}, default=str))
+    else:
+        prefix = () if level == LOG_DEBUG else (f"{_LEVEL_NAMES[level]}:",)
+        builtins.print(site[0], " ¶ ", *prefix, *args, *(f"{k}={v}" for (k, v) in fields.items()))
+
+
+def _dprint(*args, **fields):
+    if _LogConfig.level > LOG_DEBUG:
+        return
+    _emit(LOG_DEBUG, _site(sys._getframe(1)), args, fields)
+
+
+def _dlog(level: int, *args, every: int = 1, **fields):
+    if _LogConfig.level > level:
+        return
+    site = _site(sys._getframe(1))
+    site[1] += 1
+    if every == 1 or site[1] % every == 1:
+        _emit(level, site, args, fields)
+
+
+def _silent(*args, **kwargs):
+    pass
 
 
-def dprint(*args, **kwargs):
-    # builtins.dprint(__file__, path.abspath(__file__), inspect.stack()[1].filename)
-    builtins.print(
-        f"{path.relpath(inspect.stack()[1].filename, path.dirname(path.abspath(__file__)))}:{inspect.stack()[1].lineno}:{inspect.stack()[1].function}",
-        " ¶ ", *args, **kwargs)
+if _LogConfig.level == LOG_OFF:
+    dprint = dlog = _silent
+else:
+    (dprint, dlog) = (_dprint, _dlog)
@@ -29,6 +29,8 @@ class ProjectFileAppError(AppBaseException):
     MDL_ID_INVALID = 5
     FILE_GEM_INVALID = 6
     MDL_FILE_NON_EXISTENT = 7
+    FILE_GEM_LIMIT_EXCEEDED = 8
+    FILE_WEIGHTS_INVALID = 9
 
 
 class ProjectUIError(AppBaseException):
@@ -38,15 +40,25 @@ class ProjectUIError(AppBaseException):
 
 class ModelExecutionRuntimeError(AppBaseException):
     ERROR = 1
+    BATCH_ROWS_MISMATCH = 2
 
 
 class ModelExecutionError(AppBaseException):
     DEBUG_ERROR = 1
+    GRAPH_SELF_LOOP = 2
 
 
 class ModelTrainingError(AppBaseException):
     WEIGHT_REF_NOT_ACTIVATED = 1
     WEIGHT_VALUE_FORMATTED_TWICE = 2
+    ALGORITHM_UNKNOWN = 3
+    BATCH_SIZE_INVALID = 4
+    BATCH_DATA_NOT_ROWWISE = 5
+    OPTIMIZER_UNKNOWN = 6
+    LOSS_INPUT_INVALID = 7
+    VALIDATION_SPLIT_INVALID = 8
+    INITIALIZER_UNKNOWN = 9
+    WEIGHT_REF_ALREADY_BOUND = 10
 
 
 class IOAttributeError(AppBaseException):
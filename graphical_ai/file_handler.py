@@ -3,14 +3,19 @@ from __base__ import *  # ~~~ automatically generated by __autoinject__.py ~~~
 from typing import List, Dict, Optional
 
 import os
+import threading
 import yaml
 import numpy as np
 import tensorflow as tf
 
+import gem_format
+import weight_bundle
 from errors import *
 from model_view.components import AttributeSelector
 from node_graph.execution import ModelPredictor, ModelTrainer
 from node_graph.nodes import node_class_ref
+from node_graph.profiler import NodeProfiler
+from node_graph.training_weights import FlatWeights
 from node_state import NodeState
 from project.model_component import Model
 from project.sidemenu_components import IOField, ModelIOConfigurator
@@ -63,7 +68,7 @@ class ReferencedProjectHandler:
         if root_file in self.refs["proj"]:
             del self.refs["proj"][root_file]
         else:
-            dprint(f"error: the project file path reference <{root_file}> was not found")
+            dlog(LOG_ERROR, f"the project file path reference <{root_file}> was not found")
 
     # TODO: executable project might not have root_files
     def add_exec_project(self, name: str, root_file: str):  # add exec project to the reference
@@ -74,7 +79,7 @@ class ReferencedProjectHandler:
         if root_file in self.refs["exec-proj"]:
             del self.refs["exec-proj"][root_file]
         else:
-            dprint(f"error: the exec project file path reference <{root_file}> was not found")
+            dlog(LOG_ERROR, f"the exec project file path reference <{root_file}> was not found")
 
 
 class ModelFileHandler:
@@ -84,18 +89,42 @@ class ModelFileHandler:
     Each models has 3 files (coincidentally for each stages of modelling AI/ML):
     - *.mdl.yaml, file data containing serialized data from all aspects of a model (incld. attrs and positions)
     - *.gem, GraphicalAI Executable Model--compact binary file format, purely for model execution
-    - *.w.npz, additional file data of trained model weights for predicting models after training
-
+    - *.w.npz, additional file data of trained model weights for predicting models after training (or a memory-mapped
+      *.w.json manifest & *.npy bundle instead, see weight_bundle)
+    - *.opt.npz (optional), the optimizer state of the last training, to resume training from
     """
     def __init__(self, path, name):
         self.path = path
         self.name = name
 
         self.mdl_dt = {}  # intermediate serialized data of the model instance
-        self.exec_dt = []  # intermediate compacted executable data
+        self.exec_dt = []  # intermediate compacted executable data (or the MappedExecData of an indexed *.gem file)
 
         # TODO: add mechanism to invalidate the weights once the models are procedurally modified
         self.weights: Optional[List[tf.Variable]] = None
+        self.opt_state: Optional[dict] = None  # see ModelTrainer.optimizer_state()
+
+        # bumped every time the exec data or the weights change; prepared predictors are only reused while the
+        # version (and the prediction settings below) they were built for is still current
+        self.version = 0
+        # a predictor runs one request at a time, but predictors share the weights, so concurrent predictions each
+        # borrow an idle one from the pool (or get a new one built)
+        self._predictors: List[ModelPredictor] = []  # idle predictors of _predictor_key
+        self._predictor_key: Optional[tuple] = None  # see _pool_key()
+        self._predictor_lock = threading.Lock()  # guards the pool
+        self.max_idle_predictors = 8
+        # predictions run through traced graph functions (see ModelPredictor); opt-in, as on the models so far eager
+        # prediction is as fast (see benchmarks/bench_compiled_prediction.py)
+        self.compiled_prediction = False
+        self.prediction_workers = 1  # threads running a prediction's independent branches (see ModelPredictor)
+        self.intermediates: Optional[Dict[int, dict]] = None  # of the last prediction retaining them, for debugging
+        self.flat_weights = False  # the weights are loaded & trained in one contiguous buffer (see FlatWeights)
+        # the *.gem file is saved in the indexed layout, which is then memory-mapped when loaded: its nodes are only
+        # decoded once a predictor or a trainer is built (see gem_format.MappedExecData)
+        self.indexed_gem = False
+        # the weights are saved as a weight bundle, which is then memory-mapped when loaded: the predictors read them
+        # in place, shared between the processes loading the model (see weight_bundle)
+        self.mapped_weights = False
 
     def save_model(self):
         """
@@ -106,49 +135,37 @@ class ModelFileHandler:
         with open(os.path.join(self.path, f"{self.name}.mdl.yaml"), "w") as fbo:
             fbo.write(yaml.dump(self.mdl_dt))
 
-        # saving *.gem
-        EMDL_FTYPE = 0x10
-        GEM_FVERS = 0x02
-        GEM_UIDSIZE = 1  # byte size for UID
-        _COLLC_SIZE = 1  # private variable for common default byte size for collection lengths
-        _CONST_COLLC_SIZE = 2
-        _NODE_SIZE = 3  # byte size for the length of a single binary-serialized executable node data
-
-        fdt = []
-        fdt.append(bytearray([ord("\xba"), ord("S"), ord("H"), ord("C"), EMDL_FTYPE, GEM_FVERS,
-                              ord("\n")]))  # magic word, file type, file type version
-        fdt.append(bytearray([GEM_UIDSIZE, ord("\n")]))
-
-        for node in self.exec_dt:
-            node_bdt = bytearray()
-
-            node_bdt.extend(node["ndtg"].encode("ASCII"))
-            node_bdt.extend(len(node["inp"]).to_bytes(_COLLC_SIZE, "big"))
-            node_bdt.extend(len(node["out"]).to_bytes(_COLLC_SIZE, "big"))
-            node_bdt.extend(len(node["const"]).to_bytes(_COLLC_SIZE, "big"))
-            node_bdt.extend(b"".join([uid.to_bytes(GEM_UIDSIZE, "big") for uid in node["inp"]]))
-            node_bdt.extend(b"".join(
-                [(len(i).to_bytes(_COLLC_SIZE, "big") + b"".join([uid.to_bytes(GEM_UIDSIZE, "big") for uid in i]))
-                 for i in node["out"]])
-            )
-            # TODO: optimization: maybe using the optimization from earlier, and directly use the "cached" fld data
-            nd_const_ordered = node_class_ref[node["ndtg"]]._field_data()["constant"]
-            # using nd_const_ordered instead of directly iterating through the constant ordered from the node dict,
-            # because using field data's order of the constant provides standardization of the ordering of the dict
-            node_bdt.extend(b"".join(
-                [(len(node["const"][i]).to_bytes(_CONST_COLLC_SIZE, "big") + node["const"][i]) for i in
-                 nd_const_ordered])
-            )
-            node_bdt.extend(b"\n")
-            node_bdt = bytearray(len(node_bdt).to_bytes(_NODE_SIZE, "big")) + node_bdt
-            fdt.append(node_bdt)
-
-        with open(os.path.join(self.path, f"{self.name}.gem"), "wb") as fbo:
-            fbo.writelines(fdt)
+        # saving *.gem, moved over the previous file rather than written into it: whoever still maps that one (other
+        # handlers & processes) keeps reading it
+        if isinstance(self.exec_dt, gem_format.MappedExecData):
+            # (a file still mapped can't be replaced on every system; this handler's own mapping goes)
+            (mapped, self.exec_dt) = (self.exec_dt, self.exec_dt[:])
+            mapped.close()
+        gem_dt = gem_format.dumps(self.exec_dt, indexed=self.indexed_gem)
+        weight_bundle.write_atomic(os.path.join(self.path, f"{self.name}.gem"), lambda fo: fo.write(gem_dt))
 
         # saving *.w.npz
-        dprint(f"model {self.name}: weights {[np.array(w) for w in self.weights]}")
-        np.savez(os.path.join(self.path, f"{self.name}.w.npz"), *[np.array(w) for w in self.weights])
+        if isinstance(self.weights, FlatWeights):
+            arrays = self.weights.arrays()
+        else:
+            arrays = [np.array(w) for w in self.weights]
+        dprint(f"model {self.name}: weights {arrays}")
+        npz_fpath = os.path.join(self.path, f"{self.name}.w.npz")
+        if self.mapped_weights:
+            weight_bundle.save(self.path, self.name, arrays)
+            if os.path.exists(npz_fpath):
+                os.remove(npz_fpath)
+        else:
+            np.savez(npz_fpath, *arrays)
+            weight_bundle.remove(self.path, self.name)
+
+        # saving *.opt.npz (removing the previous training's if the last one left no optimizer state, e.g. a direct
+        # solve: it would be resumed from otherwise)
+        opt_fpath = os.path.join(self.path, f"{self.name}.opt.npz")
+        if self.opt_state is not None:
+            np.savez(opt_fpath, **self.opt_state)
+        elif os.path.isfile(opt_fpath):
+            os.remove(opt_fpath)
 
     def load_model(self):
         """
@@ -160,175 +177,53 @@ class ModelFileHandler:
             fdt = mdl_fo.read()
             self.mdl_dt = yaml.safe_load(fdt)
 
-        # loading *.gem
-        NDTG_LEN = 5
-        _COLLC_SIZE = 1
-        _CONST_COLLC_SIZE = 2
-        _NODE_SIZE = 3  # byte size for the length of a single binary-serialized executable node data
-
-        with open(os.path.join(self.path, self.name+".gem"), "rb") as gem_fo:
-            self.exec_dt = []
-
-            fdt_raw = gem_fo.read()
-            fdt = []
-            # meta-processing file data to a processed raw file data
-            fdt.append(fdt_raw[0:7])  # meta data: magic code, file type, file version
-            fdt.append(fdt_raw[7:9])  # meta data: id size (for the actual data)
-
-            mmode = "size"  # meta-mode
-            size = 0
-            sbuf = b""
-            fbuf = b""
-            for ci in range(9, len(fdt_raw)):
-                if len(sbuf) == _NODE_SIZE and mmode == "size":
-                    size = int.from_bytes(sbuf, "big")
-                    mmode = "node-data"
-                    fbuf = fdt_raw[ci:ci + 1]
-                elif len(fbuf) == size and mmode == "node-data":
-                    fdt.append(fbuf)
-                    mmode = "size"
-                    size = 0
-                    sbuf = fdt_raw[ci:ci + 1]
-                    fbuf = b""
-                elif ci == len(fdt_raw)-1 and mmode == "node-data":
-                    fbuf += fdt_raw[ci:ci + 1]
-                    fdt.append(fbuf)
-                elif mmode == "size":
-                    sbuf += fdt_raw[ci:ci + 1]
-                else:
-                    fbuf += fdt_raw[ci:ci + 1]
-
-            # dprint(fdt)
-            if fdt[0][0:4] != b"\xbaSHC":  # or len(fdt) <= 2
-                raise ProjectFileAppError(msg="", code=ProjectFileAppError.FILE_GEM_INVALID)
-            nddt = fdt[2:]
-            # TODO: implement file type and version check and version conversion
-            FTYPE = fdt[0][4]
-            VERSN = fdt[0][5]
-            ID_SZ = fdt[1][0]
-
-            for nd in nddt:
-                ndnm = nd[0:NDTG_LEN].decode("ASCII")
-                inp_size = None
-                out_size = None
-                const_size = None
-                # input fields stores all of its input field id
-                # output fields only stores an array of referenced inp field's id
-                fld_inp = []
-                fld_out = [-1]  # will be read as index -1 after first append; only here bc IndexError
-                tmp_out_refs = []
-                fld_const = [-1]  # will be read as index -1 after first append; only here bc IndexError
-
-                cbuf = b""
-                mode = "sizes"
-                for i in range(NDTG_LEN, NDTG_LEN+len(nd[NDTG_LEN:])):
-                    if len(cbuf) == _COLLC_SIZE and mode == "sizes":
-                        if inp_size is None:
-                            inp_size = int.from_bytes(cbuf, "big")
-                        elif out_size is None:
-                            out_size = int.from_bytes(cbuf, "big")
-                        elif const_size is None:
-                            const_size = int.from_bytes(cbuf, "big")
-                            # dprint("SIZES BEF", inp_size, out_size, const_size)
-                            if inp_size > 0:
-                                mode = "inp"
-                            elif out_size > 0:
-                                mode = "ref_sizes"
-                            elif const_size > 0:
-                                mode = "const_dt_sizes"
-                            else:
-                                mode = None
-
-                        cbuf = nd[i:i + 1]
-                    elif len(cbuf) == ID_SZ and mode == "inp":
-                        if inp_size > 1:
-                            fld_inp.append(int.from_bytes(cbuf, "big"))
-                            inp_size -= 1
-                        else:
-                            fld_inp.append(int.from_bytes(cbuf, "big"))
-
-                            if out_size > 0:
-                                mode = "ref_sizes"
-                            elif const_size > 0:
-                                mode = "const_dt_sizes"
-                            else:
-                                mode = None
-                        cbuf = nd[i:i + 1]
-                    elif len(
-                            cbuf) == _COLLC_SIZE and mode == "ref_sizes":  # getting the length of the ref inps
-                        # there will always be an integer in the fld_out list to signify its size before
-                        # it properly converts into a further subarray of connected referenced inputs within a
-                        # single output connector
-                        if out_size > 0:
-                            ref_size = int.from_bytes(cbuf, "big")
-                            out_size -= 1
-                            if ref_size > 0:
-                                fld_out.append(int.from_bytes(cbuf, "big"))
-                                mode = "out"
-                            else:
-                                fld_out.append([])
-                            cbuf = nd[i:i + 1]
-                        else:
-                            mode = "const_dt_sizes"
-                            cbuf += nd[i:i + 1]
-                    elif len(
-                            cbuf) == ID_SZ and mode == "out":  # reads each input id referenced from one out
-                        if fld_out[-1] > 1:
-                            tmp_out_refs.append(int.from_bytes(cbuf, "big"))
-                            fld_out[-1] -= 1
-                        elif fld_out[-1] == 1:
-                            tmp_out_refs.append(int.from_bytes(cbuf, "big"))
-                            fld_out[-1] = tmp_out_refs.copy()
-                            tmp_out_refs.clear()
-
-                        if out_size != 0 and type(fld_out[-1]) == list:
-                            mode = "ref_sizes"
-                        elif out_size == 0 and type(fld_out[-1]) == list:
-                            mode = "const_dt_sizes"
-                        cbuf = nd[i:i + 1]
-                    elif len(cbuf) == _CONST_COLLC_SIZE and mode == "const_dt_sizes":
-                        # there will always be an integer in the fld_out list to signify its size before
-                        # it properly converts into a further subarray of connected referenced inputs within a
-                        # single output connector
-                        fld_const.append(int.from_bytes(cbuf, "big"))
-                        mode = "const"
-                        cbuf = nd[i:i + 1]
-                    elif len(cbuf) == fld_const[-1] and mode == "const":
-                        fld_const[-1] = cbuf
-                        if const_size > 0:
-                            mode = "const_dt_sizes"
-                        else:
-                            mode = None  # end
-                        cbuf = nd[i:i + 1]
-                    elif fld_const[-1] == 0 and mode == "const":
-                        del fld_const[-1]
-                        if const_size > 0:
-                            mode = "const_dt_sizes"
-                        else:
-                            mode = None  # end
-                        cbuf += nd[i:i + 1]
-                    else:
-                        cbuf += nd[i:i + 1]
-                node_exec_dt = {}
-                node_exec_dt["ndtg"] = ndnm
-                node_exec_dt["inp"] = fld_inp
-                node_exec_dt["out"] = fld_out[1:]
-                # TODO: optimization: maybe directly set the object instead of trashing the field data
-
-                node_exec_dt["const"] = {name: val for (name, val) in
-                                         zip(list(node_class_ref[ndnm]._field_data()["constant"]), fld_const[1:])}
-                self.exec_dt.append(node_exec_dt)
+        # loading *.gem (only its header if it's indexed: the file is mapped instead)
+        gem_fpath = os.path.join(self.path, self.name+".gem")
+        with open(gem_fpath, "rb") as gem_fo:
+            header = gem_fo.read(gem_format.GEM_HEADER_SIZE)
+        if isinstance(self.exec_dt, gem_format.MappedExecData):  # (loaded before)
+            self.exec_dt.close()
+        if gem_format.is_indexed(header):
+            self.exec_dt = gem_format.MappedExecData(gem_fpath)
+            self.indexed_gem = True
+        else:
+            with open(gem_fpath, "rb") as gem_fo:
+                gem_dt = gem_fo.read()
+            self.exec_dt = gem_format.loads(gem_dt)
+            if gem_format.file_version(gem_dt) != gem_format.GEM_FVERS:
+                dlog(LOG_INFO, f"model {self.name}: upgraded from *.gem version {gem_format.file_version(gem_dt)}; "
+                               f"saved as version {gem_format.GEM_FVERS} from now on")
 
         # dprint(" exec data", self.exec_dt)
 
-        # conditional loading *.w.npz
+        # conditional loading *.w.npz (or the weight bundle, mapped)
         dprint(f"model {self.name}: weights {self.weights}")
-        self.weights = []
-        npz_obj = np.load(os.path.join(self.path, self.name+".w.npz"))
-        for ind in range(0, len(npz_obj)):
-            self.weights.append(tf.Variable(npz_obj[f"arr_{ind}"]))
+        self.mapped_weights = weight_bundle.exists(self.path, self.name)
+        if self.mapped_weights:
+            arrays = weight_bundle.load(self.path, self.name)
+        else:
+            with np.load(os.path.join(self.path, self.name+".w.npz")) as npz_obj:
+                arrays = [npz_obj[f"arr_{ind}"] for ind in range(0, len(npz_obj))]
+        if self.flat_weights:
+            self.weights = FlatWeights.from_arrays(arrays)
+        elif self.mapped_weights:
+            # (only ever read by the predictors; training starts from its own variables, see train_model())
+            self.weights = weight_bundle.as_tensors(arrays)
+        else:
+            self.weights = [tf.Variable(arr) for arr in arrays]
         dprint(f"model {self.name}: weights {self.weights}")
 
+        # conditional loading *.opt.npz
+        opt_fpath = os.path.join(self.path, self.name+".opt.npz")
+        if os.path.exists(opt_fpath):
+            with np.load(opt_fpath) as npz_obj:
+                self.opt_state = {key: npz_obj[key] for key in npz_obj.files}
+            self.opt_state["optimizer"] = str(self.opt_state["optimizer"])
+        else:
+            self.opt_state = None
+
+        self.version += 1
+
     def save_model_instance(self, model: Model, io_train: ModelIOConfigurator, io_pred: ModelIOConfigurator):
         """
         serializes model object instance into the model data
@@ -386,7 +281,7 @@ class ModelFileHandler:
 
         # ============================================================================================================ #
 
-        self.exec_dt.clear()
+        self.exec_dt = []
 
         scene_itms = model.items()
         obj_ref_id = {i: (ind + 1) for (ind, i) in
@@ -433,6 +328,8 @@ class ModelFileHandler:
 
                 self.exec_dt.append(exec_ndt)
 
+        self.version += 1
+
     def regen_model_instance(self, parent=None) -> (Model, ModelIOConfigurator, ModelIOConfigurator):
         """
         regenerates the model object instance from the loaded model data (data must be already loaded in)
@@ -535,18 +432,93 @@ class ModelFileHandler:
     #   out: {attr_name:(datatype,data)}
     #   predicting?: bool
 
-    def predict_model(self, inst_state: dict):
+    def predict_model(self, inst_state: dict, *, retain_intermediates: bool = False,
+                      profiler: Optional[NodeProfiler] = None):
+        """
+        retain_intermediates keeps everything the nodes saw (instead of releasing it as soon as it's consumed) and
+        stores it as `intermediates` (node id to its inputs & outputs) for debugging
+
+        profiler records the nodes executed for this prediction (see NodeProfiler)
+        """
         if self.weights is not None:
-            executor = ModelPredictor(self.exec_dt, self.weights)
-            return executor.execute(inst_state)
+            (predictor, key) = self._acquire_predictor()
+            predictor.retain = retain_intermediates
+            predictor.profiler = profiler
+            try:
+                outs = predictor.execute(inst_state)
+                if retain_intermediates:
+                    self.intermediates = predictor.intermediates()
+                return outs
+            finally:
+                predictor.retain = False
+                predictor.profiler = None
+                self._release_predictor(predictor, key)
         else:
             dprint("MODEL PREDICTION REQUIRES WEIGHTS--WEIGHTS MUST BE CREATED AFTER MODEL TRAINING")
 
-    def train_model(self, inst_state: dict, *, iters: int, loss_name: str, rate: float):
+    def predict_model_batch(self, inst_states: List[dict]) -> Optional[List[dict]]:
+        """
+        predicts several independent requests with a single execution of the model (see ModelPredictor.execute_batch)
+        """
+        if self.weights is not None:
+            (predictor, key) = self._acquire_predictor()
+            try:
+                return predictor.execute_batch(inst_states)
+            finally:
+                self._release_predictor(predictor, key)
+        else:
+            dprint("MODEL PREDICTION REQUIRES WEIGHTS--WEIGHTS MUST BE CREATED AFTER MODEL TRAINING")
+
+    def _pool_key(self) -> tuple:
+        """
+        what the pooled predictors are built for: the model version & the prediction settings, so changing either
+        empties the pool
+        """
+        return (self.version, self.compiled_prediction, self.prediction_workers)
+
+    def _acquire_predictor(self) -> (ModelPredictor, tuple):
+        """
+        an idle prepared predictor of the current model version & prediction settings (and their pool key) for the
+        caller to use alone, only building a new one (node instances, deserialized constants, execution plan) if every
+        one is busy or the model or the settings have changed since
+        """
+        with self._predictor_lock:
+            key = self._pool_key()
+            if self._predictor_key != key:
+                self._predictors.clear()
+                self._predictor_key = key
+            if len(self._predictors) != 0:
+                return self._predictors.pop(), key
+            (exec_dt, weights, compiled, workers) = (self.exec_dt, self.weights, self.compiled_prediction,
+                                                     self.prediction_workers)
+        return ModelPredictor(exec_dt, weights, compiled=compiled, workers=workers), key
+
+    def _release_predictor(self, predictor: ModelPredictor, key: tuple):
+        with self._predictor_lock:
+            current = key == self._pool_key() == self._predictor_key
+            if current and len(self._predictors) < self.max_idle_predictors:
+                self._predictors.append(predictor)
+
+    def train_model(self, inst_state: dict, *, iters: int, loss_name: str, rate: float, warm_start: bool = False,
+                    **options) -> dict:
+        """
+        options are passed on to ModelTrainer.execute() (training algorithm, batch size, stopping criteria, etc.);
+        returns the trainer's report of the run
+
+        warm_start continues from the current weights (and the optimizer state they were trained with) instead of
+        starting from zero, as long as they still fit the model
+        """
+        if warm_start and self.weights is not None:
+            options.setdefault("warm_weights", self.weights)
+            options.setdefault("opt_state", self.opt_state)
+        options.setdefault("flat_weights", self.flat_weights)
         trainer = ModelTrainer(self.exec_dt)
-        trainer.execute(iters, loss_name, rate, inst_state)
+        report = trainer.execute(iters, loss_name, rate, inst_state, **options)
         self.weights = trainer.global_weights_vec
+        self.opt_state = trainer.optimizer_state()
+        self.version += 1
         # TODO: return trainer's output too
+        return report
 
     def required_attrs(self):
         """
@@ -692,19 +664,25 @@ class ProjectFileHandler:
 
         dprint(f"deleting model <{mdl_id}:{self.dat['mdl_ids'][mdl_id]}> [NOT IMPLEMENTED]")
 
-    def predict_model(self, mdl_id: int, inst_state: dict):
+    def predict_model(self, mdl_id: int, inst_state: dict, *, retain_intermediates: bool = False,
+                      profiler: Optional[NodeProfiler] = None):
         if not self._valid_model_id(mdl_id): raise ProjectFileAppError(msg="", code=ProjectFileAppError.MDL_ID_INVALID)
 
         dprint(f"predicting model <{mdl_id}:{self.dat['mdl_ids'][mdl_id]}>")
 
-        self.mhndls[mdl_id].predict_model(inst_state)
+        self.mhndls[mdl_id].predict_model(inst_state, retain_intermediates=retain_intermediates, profiler=profiler)
+
+    def get_mdl_intermediates(self, mdl_id: int) -> Optional[Dict[int, dict]]:
+        if not self._valid_model_id(mdl_id): raise ProjectFileAppError(msg="", code=ProjectFileAppError.MDL_ID_INVALID)
+
+        return self.mhndls[mdl_id].intermediates
 
-    def train_model(self, mdl_id: int, iters: int, loss_name: str, rate: float, inst_state: dict):
+    def train_model(self, mdl_id: int, iters: int, loss_name: str, rate: float, inst_state: dict, **options) -> dict:
         if not self._valid_model_id(mdl_id): raise ProjectFileAppError(msg="", code=ProjectFileAppError.MDL_ID_INVALID)
 
         dprint(f"training model <{mdl_id}:{self.dat['mdl_ids'][mdl_id]}>")
 
-        self.mhndls[mdl_id].train_model(inst_state, iters=iters, loss_name=loss_name, rate=rate)
+        return self.mhndls[mdl_id].train_model(inst_state, iters=iters, loss_name=loss_name, rate=rate, **options)
 
     def get_mdl_refs(self) -> dict:
         return self.dat["mdl_ids"]
@@ -0,0 +1,446 @@
+from __base__ import *  # ~~~ automatically generated by __autoinject__.py ~~~
+
+from collections.abc import Sequence
+from typing import Dict, List, Tuple
+
+import gc
+import mmap
+import struct
+
+from errors import ProjectFileAppError
+from node_graph.nodes import node_class_ref
+
+# *.gem, GraphicalAI Executable Model: the model's exec data (see GraphIndex) in a compact binary layout
+#
+#   header: magic word b"\xbaSHC", file type, file version, b"\n", (see the versions) b"\n"
+#
+#   version 3, the ids, counts & sizes are all variable-length (unsigned LEB128 varints), so a model is only limited
+#   by memory. The header's 8th byte is the layout:
+#       GEM_LAYOUT_SEQUENTIAL: the records right after the header
+#       GEM_LAYOUT_INDEXED: the node count (4 bytes) & the file offset of every record (8 bytes each, big endian),
+#           then the records--any node can be read on its own (see MappedExecData)
+#   One record per node:
+#       record size (the rest of the record)
+#       node tag size, node tag (ASCII)
+#       input count, output count, constant count
+#       input connector ids
+#       per output: referenced input count, referenced input connector ids
+#       per constant field, in the node class' field order: value size, value
+#       b"\n"
+#
+#   version 2, fixed-size big endian integers (a model can't have connector ids or counts over 255). The header's 8th
+#   byte is the id size. One record per node:
+#       record size (3 bytes, the rest of the record)
+#       node tag (5 ASCII characters)
+#       input count, output count, constant count (1 byte each)
+#       input connector ids (id size each)
+#       per output: referenced input count (1 byte), referenced input connector ids (id size each)
+#       per constant field, in the node class' field order: value size (2 bytes), value
+#       b"\n"
+#
+# version 2 files are still read (into the same exec data, so the model is saved as version 3 from then on) and can
+# be written with dumps(version=2) while the model fits in it.
+
+GEM_MAGIC = b"\xbaSHC"
+EMDL_FTYPE = 0x10
+GEM_FVERS = 0x03  # the version written
+GEM_FVERS_V2 = 0x02
+GEM_LAYOUT_SEQUENTIAL = 0x00
+GEM_LAYOUT_INDEXED = 0x01
+GEM_UIDSIZE = 1  # byte size for UID (version 2)
+NDTG_LEN = 5
+_COLLC_SIZE = 1  # common default byte size for collection lengths (version 2)
+_CONST_COLLC_SIZE = 2
+_NODE_SIZE = 3  # byte size for the length of a single binary-serialized executable node data (version 2)
+GEM_HEADER_SIZE = 9
+
+_ID_FORMATS = {1: "B", 2: "H", 4: "I", 8: "Q"}  # id size to its struct format character
+_NODE_COUNT = struct.Struct(">I")
+_OFFSET = struct.Struct(">Q")
+_RECORD_HEAD = struct.Struct(">BH5sBBB")  # record size (3 bytes, split), node tag, the three counts
+_CONST_SIZE = struct.Struct(">H")
+_SMALL_VARINTS = [bytes([n]) for n in range(0x80)]
+_MALFORMED = (struct.error, IndexError, KeyError, ValueError)  # (UnicodeDecodeError is a ValueError)
+
+_const_names: Dict[str, Tuple[str, ...]] = {}  # node tag to the names of its constant fields, in the field order
+
+
+def const_names(ndtg: str) -> Tuple[str, ...]:
+    """
+    the constant field names of the node class, in the order they're written in (built once per node class, instead
+    of the whole field data of every node)
+    """
+    names = _const_names.get(ndtg)
+    if names is None:
+        names = _const_names[ndtg] = tuple(node_class_ref[ndtg]._field_data()["constant"])
+    return names
+
+
+def dumps(exec_dt: List[dict], *, version: int = GEM_FVERS, indexed: bool = False) -> bytes:
+    """
+    the *.gem file data of the model exec data, in the given file version (3 or 2); indexed writes the version 3
+    indexed layout
+    """
+    if version == GEM_FVERS:
+        return _dumps_v3_indexed(exec_dt) if indexed else _dumps_v3(exec_dt)
+    if version == GEM_FVERS_V2:
+        try:
+            return _dumps_v2(exec_dt)
+        except OverflowError as e:
+            raise ProjectFileAppError(msg=f"the model doesn't fit in a version 2 *.gem file: {e}",
+                                      code=ProjectFileAppError.FILE_GEM_LIMIT_EXCEEDED)
+    raise ProjectFileAppError(msg=f"unknown *.gem version <{version}> (indexed: {indexed})",
+                              code=ProjectFileAppError.FILE_GEM_INVALID)
+
+
+def loads(data) -> List[dict]:
+    """
+    the model exec data of the *.gem file data (bytes or any buffer), of any version read. Every record is decoded in
+    place through a memoryview, jumping from record to record by their sizes.
+
+    Raises ProjectFileAppError(FILE_GEM_INVALID) on anything malformed.
+    """
+    buf = memoryview(data)
+    version = file_version(buf)
+    if version == GEM_FVERS:
+        decode = _loads_v3_indexed if buf[7] == GEM_LAYOUT_INDEXED else _loads_v3
+    else:
+        decode = _loads_v2
+
+    # the decoded records can't form reference cycles, while the collections their lists & dicts would trigger walk
+    # every object of the process (TensorFlow's included): the collector is paused for the decoding
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        return decode(buf)
+    except _MALFORMED as e:
+        raise _malformed(e)
+    finally:
+        if collecting:
+            gc.enable()
+
+
+def file_version(data) -> int:
+    """
+    the file version of the *.gem file data, checking its header
+    """
+    if len(data) < GEM_HEADER_SIZE or data[0:4] != GEM_MAGIC:
+        raise ProjectFileAppError(msg="not a *.gem file", code=ProjectFileAppError.FILE_GEM_INVALID)
+    (ftype, version, layout) = (data[4], data[5], data[7])
+    if ftype != EMDL_FTYPE or not ((version == GEM_FVERS and layout in (GEM_LAYOUT_SEQUENTIAL, GEM_LAYOUT_INDEXED))
+                                   or (version == GEM_FVERS_V2 and layout in _ID_FORMATS)):
+        raise ProjectFileAppError(msg=f"unsupported *.gem file (type {ftype:#x}, version {version}, {layout})",
+                                  code=ProjectFileAppError.FILE_GEM_INVALID)
+    return version
+
+
+def is_indexed(data) -> bool:
+    """
+    whether the *.gem file data is in the indexed layout (checking its header)
+    """
+    return file_version(data) == GEM_FVERS and data[7] == GEM_LAYOUT_INDEXED
+
+
+class MappedExecData(Sequence):
+    """
+    The exec data of an indexed *.gem file, memory-mapped (read only) rather than read: opening it only reads the
+    header & the node count, and every node is decoded from its record when it's looked up. Each look up decodes a
+    new node dict, so a deep copy (the executors take one) decodes the nodes straight into it.
+
+    The pages of the file are shared through the OS' page cache, between the processes mapping the same model too.
+    The file can't be written over while it's mapped (see close()).
+
+    Raises ProjectFileAppError(FILE_GEM_INVALID) on anything malformed, when opened or when a node is looked up.
+    """
+
+    def __init__(self, fpath: str):
+        with open(fpath, "rb") as fo:
+            try:
+                self._map = mmap.mmap(fo.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # (an empty file)
+                raise ProjectFileAppError(msg="not a *.gem file", code=ProjectFileAppError.FILE_GEM_INVALID)
+        self._buf = memoryview(self._map)
+        try:
+            if not is_indexed(self._buf):
+                raise ProjectFileAppError(msg="not an indexed *.gem file", code=ProjectFileAppError.FILE_GEM_INVALID)
+            self._count = _index_count(self._buf)
+        except ProjectFileAppError:
+            self.close()
+            raise
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, ind):
+        if isinstance(ind, slice):
+            return [self[i] for i in range(*ind.indices(self._count))]
+        if ind < 0:
+            ind += self._count
+        if not 0 <= ind < self._count:
+            raise IndexError(f"node index <{ind}> out of range")
+        try:
+            (offset,) = _OFFSET.unpack_from(self._buf, GEM_HEADER_SIZE + _NODE_COUNT.size + ind * _OFFSET.size)
+            return _node_at_v3(self._buf, offset)[0]
+        except _MALFORMED as e:
+            raise _malformed(e)
+
+    def __deepcopy__(self, memo) -> List[dict]:
+        return self[:]
+
+    def close(self):
+        """
+        unmaps the file (before writing over it); the nodes decoded so far are left as they are
+        """
+        self._buf.release()
+        self._map.close()
+
+
+def _malformed(e: Exception) -> ProjectFileAppError:
+    return ProjectFileAppError(msg=f"malformed *.gem file: {e!r}", code=ProjectFileAppError.FILE_GEM_INVALID)
+
+
+def _varint(n: int) -> bytes:
+    if 0 <= n < 0x80:
+        return _SMALL_VARINTS[n]
+    if n < 0:
+        raise ValueError(f"negative integer <{n}>")
+    out = bytearray()
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _read_varint(buf: memoryview, pos: int) -> (int, int):
+    """
+    the varint at pos & the position right after it
+    """
+    byte = buf[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    (n, shift) = (byte & 0x7F, 7)
+    while True:
+        pos += 1
+        byte = buf[pos]
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos + 1
+        shift += 7
+
+
+def _read_ids(buf: memoryview, pos: int, count: int) -> List[int]:
+    """
+    the count varints from pos on, followed by the position right after them
+    """
+    ids = []
+    for _ in range(count):
+        byte = buf[pos]
+        if byte < 0x80:  # (the one-byte ids read inline)
+            ids.append(byte)
+            pos += 1
+        else:
+            (uid, pos) = _read_varint(buf, pos)
+            ids.append(uid)
+    ids.append(pos)
+    return ids
+
+
+def _dumps_v3(exec_dt: List[dict]) -> bytes:
+    fdt = [bytes([*GEM_MAGIC, EMDL_FTYPE, GEM_FVERS, ord("\n"), GEM_LAYOUT_SEQUENTIAL, ord("\n")])]
+    for node in exec_dt:
+        fdt.append(_record_v3(node))
+    return b"".join(fdt)
+
+
+def _record_v3(node: dict) -> bytes:
+    """
+    the whole record of the node, its size included
+    """
+    try:
+        ndtg = node["ndtg"].encode("ASCII")
+        names = const_names(node["ndtg"])
+        node_bdt = [_varint(len(ndtg)), ndtg, _varint(len(node["inp"])), _varint(len(node["out"])),
+                    _varint(len(names))]
+        node_bdt.extend(_varint(uid) for uid in node["inp"])
+        for refs in node["out"]:
+            node_bdt.append(_varint(len(refs)))
+            node_bdt.extend(_varint(uid) for uid in refs)
+        for name in names:
+            val = _const_value(node, name)
+            node_bdt.append(_varint(len(val)))
+            node_bdt.append(val)
+    except ValueError as e:
+        raise ProjectFileAppError(msg=f"node <{node['ndtg']}> can't be written: {e}",
+                                  code=ProjectFileAppError.FILE_GEM_INVALID)
+    node_bdt.append(b"\n")
+    node_bdt = b"".join(node_bdt)
+    return _varint(len(node_bdt)) + node_bdt
+
+
+def _const_value(node: dict, name: str) -> bytes:
+    """
+    the binary data of the node's constant field, which its node class declares
+    """
+    try:
+        return node["const"][name]
+    except KeyError:
+        raise ProjectFileAppError(msg=f"node <{node['ndtg']}> can't be written: its constant <{name}> is missing",
+                                  code=ProjectFileAppError.FILE_GEM_INVALID)
+
+
+def _dumps_v3_indexed(exec_dt: List[dict]) -> bytes:
+    records = [_record_v3(node) for node in exec_dt]
+    offsets = []
+    pos = GEM_HEADER_SIZE + _NODE_COUNT.size + len(records) * _OFFSET.size
+    for record in records:
+        offsets.append(pos)
+        pos += len(record)
+    try:
+        index = struct.pack(f">I{len(offsets)}Q", len(offsets), *offsets)
+    except struct.error as e:
+        raise ProjectFileAppError(msg=f"the model doesn't fit in an indexed *.gem file: {e}",
+                                  code=ProjectFileAppError.FILE_GEM_LIMIT_EXCEEDED)
+    header = bytes([*GEM_MAGIC, EMDL_FTYPE, GEM_FVERS, ord("\n"), GEM_LAYOUT_INDEXED, ord("\n")])
+    return b"".join([header, index, *records])
+
+
+def _loads_v3(buf: memoryview) -> List[dict]:
+    exec_dt = []
+    pos = GEM_HEADER_SIZE
+    while pos < len(buf):
+        (node, pos) = _node_at_v3(buf, pos)
+        exec_dt.append(node)
+    return exec_dt
+
+
+def _loads_v3_indexed(buf: memoryview) -> List[dict]:
+    count = _index_count(buf)
+    offsets = struct.unpack_from(f">{count}Q", buf, GEM_HEADER_SIZE + _NODE_COUNT.size)
+    return [_node_at_v3(buf, offset)[0] for offset in offsets]
+
+
+def _index_count(buf: memoryview) -> int:
+    """
+    the node count of the indexed layout, checking its offset table fits in the file
+    """
+    try:
+        (count,) = _NODE_COUNT.unpack_from(buf, GEM_HEADER_SIZE)
+    except struct.error as e:
+        raise _malformed(e)
+    if GEM_HEADER_SIZE + _NODE_COUNT.size + count * _OFFSET.size > len(buf):
+        raise ProjectFileAppError(msg=f"malformed *.gem file: truncated offset table of {count} nodes",
+                                  code=ProjectFileAppError.FILE_GEM_INVALID)
+    return count
+
+
+def _node_at_v3(buf: memoryview, pos: int) -> (dict, int):
+    """
+    the exec data of the node whose record (its size included) starts at pos & the position right after the record
+    """
+    (size, pos) = _read_varint(buf, pos)
+    end = pos + size
+    if end > len(buf) or buf[end - 1] != ord("\n"):
+        raise ValueError(f"truncated node record at byte {pos}")
+    with buf[:end] as record:  # (reading past the record fails right away; released even then, for close()ing)
+        return _record_node_v3(record, pos, end), end
+
+
+def _record_node_v3(buf: memoryview, pos: int, end: int) -> dict:
+    """
+    the exec data of the node whose record spans buf[pos:end] (after its size)
+    """
+    (tag_size, pos) = _read_varint(buf, pos)
+    ndtg = bytes(buf[pos:pos + tag_size]).decode("ASCII")
+    pos += tag_size
+    (inp_size, pos) = _read_varint(buf, pos)
+    (out_size, pos) = _read_varint(buf, pos)
+    (const_size, pos) = _read_varint(buf, pos)
+
+    fld_inp = _read_ids(buf, pos, inp_size)
+    pos = fld_inp.pop()
+
+    fld_out = []
+    for _ in range(out_size):
+        (ref_size, pos) = _read_varint(buf, pos)
+        refs = _read_ids(buf, pos, ref_size)
+        pos = refs.pop()
+        fld_out.append(refs)
+
+    fld_const = []
+    for _ in range(const_size):
+        (val_size, pos) = _read_varint(buf, pos)
+        fld_const.append(bytes(buf[pos:pos + val_size]))
+        pos += val_size
+    if pos != end - 1:
+        raise ValueError(f"node record size mismatch at byte {pos}")
+
+    return {"ndtg": ndtg, "inp": fld_inp, "out": fld_out, "const": dict(zip(const_names(ndtg), fld_const))}
+
+
+def _dumps_v2(exec_dt: List[dict]) -> bytes:
+    fdt = []
+    fdt.append(bytearray([GEM_MAGIC[0], GEM_MAGIC[1], GEM_MAGIC[2], GEM_MAGIC[3], EMDL_FTYPE, GEM_FVERS_V2,
+                          ord("\n")]))  # magic word, file type, file type version
+    fdt.append(bytearray([GEM_UIDSIZE, ord("\n")]))
+
+    for node in exec_dt:
+        node_bdt = bytearray()
+
+        node_bdt.extend(node["ndtg"].encode("ASCII"))
+        node_bdt.extend(len(node["inp"]).to_bytes(_COLLC_SIZE, "big"))
+        node_bdt.extend(len(node["out"]).to_bytes(_COLLC_SIZE, "big"))
+        node_bdt.extend(len(node["const"]).to_bytes(_COLLC_SIZE, "big"))
+        node_bdt.extend(b"".join([uid.to_bytes(GEM_UIDSIZE, "big") for uid in node["inp"]]))
+        node_bdt.extend(b"".join(
+            [(len(i).to_bytes(_COLLC_SIZE, "big") + b"".join([uid.to_bytes(GEM_UIDSIZE, "big") for uid in i]))
+             for i in node["out"]])
+        )
+        # using the field data's order of the constants instead of the node dict's provides standardization of the
+        # ordering
+        node_bdt.extend(b"".join(
+            [(len(_const_value(node, i)).to_bytes(_CONST_COLLC_SIZE, "big") + _const_value(node, i)) for i in
+             const_names(node["ndtg"])])
+        )
+        node_bdt.extend(b"\n")
+        node_bdt = bytearray(len(node_bdt).to_bytes(_NODE_SIZE, "big")) + node_bdt
+        fdt.append(node_bdt)
+
+    return b"".join(fdt)
+
+
+def _loads_v2(buf: memoryview) -> List[dict]:
+    (id_size, id_fmt) = (buf[7], _ID_FORMATS[buf[7]])
+    exec_dt = []
+    pos = GEM_HEADER_SIZE
+    while pos < len(buf):
+        (size_hi, size_lo, ndtg, inp_size, out_size, _const_size) = _RECORD_HEAD.unpack_from(buf, pos)
+        end = pos + _NODE_SIZE + (size_hi << 16 | size_lo)
+        if end > len(buf) or buf[end - 1] != ord("\n"):
+            raise ValueError(f"truncated node record at byte {pos}")
+        ndtg = ndtg.decode("ASCII")
+        pos += _RECORD_HEAD.size
+
+        fld_inp = list(struct.unpack_from(f">{inp_size}{id_fmt}", buf, pos))
+        pos += inp_size * id_size
+
+        fld_out = []
+        for _ in range(out_size):
+            ref_size = buf[pos]
+            fld_out.append(list(struct.unpack_from(f">{ref_size}{id_fmt}", buf, pos + 1)))
+            pos += 1 + ref_size * id_size
+
+        # (the values run up to the record's end; the constant count isn't needed to read them)
+        fld_const = []
+        while pos < end - 1:
+            (val_size,) = _CONST_SIZE.unpack_from(buf, pos)
+            pos += _CONST_SIZE.size
+            fld_const.append(bytes(buf[pos:pos + val_size]))
+            pos += val_size
+        if pos != end - 1:
+            raise ValueError(f"node record overrun at byte {pos}")
+
+        exec_dt.append({"ndtg": ndtg, "inp": fld_inp, "out": fld_out,
+                        "const": dict(zip(const_names(ndtg), fld_const))})
+        pos = end
+    return exec_dt
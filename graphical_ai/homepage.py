@@ -126,7 +126,7 @@ class LoadProject(QWidget):
             self.sg_lp_submitted.emit(ProjectFileHandler.load_project(w.root_file))
         except ProjectFileAppError as e:
             if e.code == ProjectFileAppError.PROJ_FILE_DOESNT_EXIST:
-                dprint("error: attempted to load project files that does not exist")
+                dlog(LOG_ERROR, "attempted to load project files that does not exist")
             else:
                 raise e
 
@@ -138,7 +138,7 @@ class LoadProject(QWidget):
             self.sg_lp_submitted.emit(ProjectFileHandler.load_project(file_path))
         except ProjectFileAppError as e:
             if e.code == ProjectFileAppError.PROJ_FILE_DOESNT_EXIST:
-                dprint("error: attempted to load project files that does not exist")
+                dlog(LOG_ERROR, "attempted to load project files that does not exist")
             else:
                 raise e
 
@@ -0,0 +1,248 @@
+from __base__ import *  # ~~~ automatically generated by __autoinject__.py ~~~
+
+from typing import List, Dict, Tuple, NamedTuple
+
+import heapq
+
+from node_graph.nodes import NodeExec
+from node_graph.graph_index import GraphIndex
+from node_state import NodeState
+from errors import ModelExecutionError
+
+
+class PlanStep(NamedTuple):
+    """
+    Everything needed to execute a single node and hand its outputs over, resolved ahead of time so the executors
+    never have to look anything up while replaying the plan.
+    """
+    nid: int  # node id (index in the model exec data)
+    node: NodeExec
+    const: dict  # deserialized constant field data
+    inp_flds: Tuple[str, ...]  # input field names that must be filled before executing (empty for input nodes)
+    # (output field name, ((consumer node, consumer input field name), ...)) for each output field, in field order
+    wiring: Tuple[Tuple[str, Tuple[Tuple[NodeExec, str], ...]], ...]
+    # (producer node, output field name) of the outputs no step after this one consumes: the ones this step is the
+    # last consumer of, and its own outputs nothing consumes
+    frees: Tuple[Tuple[NodeExec, str], ...] = ()
+
+
+class ExecutionPlan:
+    """
+    The node graph resolved once into a flat, immutable execution order. Executors replay `steps` front to back
+    instead of walking the graph on every cycle.
+
+    The order is topological over all the nodes reachable from the anchor (input) nodes; ties are broken by the order
+    the nodes were discovered from the anchors, which is the same order the old breadth-first queue visited them in.
+
+    Loops
+    -----
+    A loop through at least 2 different nodes is allowed (as it was with the old queue). It is broken at the node of
+    the loop discovered first: the connections coming back into that node are recorded in `back_edges`, and that node
+    reads those inputs from whatever the previous cycle left behind. On the very first cycle they are not filled yet,
+    so the node (and everything downstream of it within the loop) gets skipped with an "incomplete input" warning.
+
+    A node connected to itself could never be read by the old queue either, so it is rejected up front.
+
+    Liveness
+    --------
+    Every step also knows the outputs it is the last consumer of in the plan's order (`frees`), so executors can drop
+    their references to an intermediate as soon as it has been consumed (the consumers each hold their own reference
+    through their input fields until they are executed).
+    """
+
+    def __init__(self, mdl_ref_dt: List[dict], index: GraphIndex):
+        node_adj_list = index.node_adj_list
+        for nid in node_adj_list:
+            if nid in node_adj_list[nid]:
+                raise ModelExecutionError(msg=f"node <{nid}:{mdl_ref_dt[nid]['ndtg']}> is connected to itself",
+                                          code=ModelExecutionError.GRAPH_SELF_LOOP)
+
+        # discovery order from the anchors (also limits the plan to the reachable nodes)
+        rank = {}
+        frontier = list(dict.fromkeys(index.node_anchors))
+        for nid in frontier:
+            rank[nid] = len(rank)
+        ind = 0
+        while ind < len(frontier):
+            for nxt in node_adj_list[frontier[ind]]:
+                if nxt not in rank:
+                    rank[nxt] = len(rank)
+                    frontier.append(nxt)
+            ind += 1
+
+        cut = set()  # connections ignored while ordering (the back edges)
+        order = _topo_order(sorted(rank, key=rank.get), node_adj_list, rank, cut)
+
+        steps = []
+        for nid in order:
+            nd = mdl_ref_dt[nid]
+            node: NodeExec = nd["%%class"]
+            fld_meta = node.field_data
+
+            wiring = []
+            if node.state != NodeState.OUTPUT:
+                for (ind, ofld_nm) in enumerate(fld_meta["output"]):
+                    slots = tuple((mdl_ref_dt[cns_nid]["%%class"], inp_nm)
+                                  for (cns_nid, inp_nm) in index.consumers(nd["out"][ind]))
+                    wiring.append((ofld_nm, slots))
+
+            steps.append(PlanStep(
+                nid=nid,
+                node=node,
+                const=nd["const"],
+                inp_flds=tuple(fld_meta["input"]) if node.state != NodeState.INPUT else (),
+                wiring=tuple(wiring),
+            ))
+
+        # the last consumer of each output (the producer itself if nothing consumes it)
+        pos = {step.node: ind for (ind, step) in enumerate(steps)}
+        frees = [[] for _ in steps]
+        for (ind, step) in enumerate(steps):
+            for (ofld_nm, slots) in step.wiring:
+                frees[max([ind] + [pos[node] for (node, _ifld_nm) in slots if node in pos])].append((step.node, ofld_nm))
+        steps = [step._replace(frees=tuple(free)) for (step, free) in zip(steps, frees)]
+
+        self.steps: Tuple[PlanStep, ...] = tuple(steps)
+        self.back_edges: Tuple[Tuple[int, int], ...] = tuple(sorted(cut))  # (from node id, to node id)
+
+        # the steps whose outputs can change while the data stays the same: nodes with weights, everything downstream
+        # of them and the output nodes. The static rest only depends on the data, so executors can execute it once
+        # per data and keep its outputs around.
+        weighted = [nid for nid in order if len(mdl_ref_dt[nid]["%%class"].weights) != 0]
+        dependent = set(weighted)
+        while len(weighted) != 0:
+            for nxt in node_adj_list[weighted.pop()]:
+                if nxt not in dependent:
+                    dependent.add(nxt)
+                    weighted.append(nxt)
+        self.dynamic_steps: Tuple[PlanStep, ...] = tuple(
+            step for step in self.steps if step.nid in dependent or step.node.state == NodeState.OUTPUT)
+        self.static_steps: Tuple[PlanStep, ...] = tuple(
+            step for step in self.steps if step.nid not in dependent and step.node.state != NodeState.OUTPUT)
+
+    def feeds_into(self, steps: Tuple[PlanStep, ...]) -> Tuple[Tuple[NodeExec, str, Tuple[Tuple[NodeExec, str], ...]], ...]:
+        """
+        (producer node, output field name, consumers among the given steps) of every static output feeding into the
+        given steps
+        """
+        nodes = {step.node for step in steps}
+        return tuple(
+            (step.node, ofld_nm, tuple(slot for slot in slots if slot[0] in nodes))
+            for step in self.static_steps for (ofld_nm, slots) in step.wiring
+            if any(slot[0] in nodes for slot in slots))
+
+    def dependencies(self, steps: Tuple[PlanStep, ...]) -> (Tuple[int, ...], Tuple[Tuple[int, ...], ...]):
+        """
+        for each of the given steps: how many of the given steps feed into it, and the positions of the given steps it
+        feeds into (over the forward connections only, the back edges left out)
+        """
+        pos = {step.node: ind for (ind, step) in enumerate(steps)}
+        back_edges = set(self.back_edges)
+        waiting = [0] * len(steps)
+        successors = []
+        for step in steps:
+            nxt = sorted({pos[node] for (_ofld_nm, slots) in step.wiring for (node, _ifld_nm) in slots
+                          if node in pos and (step.nid, steps[pos[node]].nid) not in back_edges})
+            for ind in nxt:
+                waiting[ind] += 1
+            successors.append(tuple(nxt))
+        return tuple(waiting), tuple(successors)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __iter__(self):
+        return iter(self.steps)
+
+
+def _succ(nid: int, nodes: set, adj: Dict[int, List[int]], cut: set) -> List[int]:
+    return [nxt for nxt in adj[nid] if nxt in nodes and (nid, nxt) not in cut]
+
+
+def _topo_order(nodes: List[int], adj: Dict[int, List[int]], rank: Dict[int, int], cut: set) -> List[int]:
+    """
+    orders the given nodes (sorted by discovery rank) topologically by their strongly connected components,
+    recursively cutting each loop open at its earliest discovered node
+    """
+    node_set = set(nodes)
+    comps = _sccs(nodes, node_set, adj, cut)
+    comp_of = {nid: ci for (ci, comp) in enumerate(comps) for nid in comp}
+
+    # Kahn's algorithm over the components, with their earliest discovery rank as the priority
+    in_deg = [0] * len(comps)
+    for nid in nodes:
+        for nxt in _succ(nid, node_set, adj, cut):
+            if comp_of[nxt] != comp_of[nid]:
+                in_deg[comp_of[nxt]] += 1
+    heap = [(min(rank[n] for n in comp), ci) for (ci, comp) in enumerate(comps) if in_deg[ci] == 0]
+    heapq.heapify(heap)
+
+    order = []
+    while len(heap) != 0:
+        (_, ci) = heapq.heappop(heap)
+        comp = sorted(comps[ci], key=rank.get)
+        if len(comp) == 1:
+            order.append(comp[0])
+        else:
+            entry = comp[0]
+            comp_set = set(comp)
+            for nid in comp:
+                if entry in _succ(nid, comp_set, adj, cut):
+                    cut.add((nid, entry))
+            order.extend(_topo_order(comp, adj, rank, cut))
+        for nid in comp:
+            for nxt in _succ(nid, node_set, adj, cut):
+                if comp_of[nxt] != ci:
+                    in_deg[comp_of[nxt]] -= 1
+                    if in_deg[comp_of[nxt]] == 0:
+                        heapq.heappush(heap, (min(rank[n] for n in comps[comp_of[nxt]]), comp_of[nxt]))
+    return order
+
+
+def _sccs(nodes: List[int], node_set: set, adj: Dict[int, List[int]], cut: set) -> List[List[int]]:
+    """
+    Tarjan's strongly connected components (iterative, so long chains don't hit the recursion limit)
+    """
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    comps = []
+
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(_succ(root, node_set, adj, cut)))]
+        while len(work) != 0:
+            (nid, succ) = work[-1]
+            descended = False
+            for nxt in succ:
+                if nxt not in index:
+                    index[nxt] = low[nxt] = len(index)
+                    stack.append(nxt)
+                    on_stack.add(nxt)
+                    work.append((nxt, iter(_succ(nxt, node_set, adj, cut))))
+                    descended = True
+                    break
+                elif nxt in on_stack:
+                    low[nid] = min(low[nid], index[nxt])
+            if descended:
+                continue
+
+            work.pop()
+            if len(work) != 0:
+                low[work[-1][0]] = min(low[work[-1][0]], low[nid])
+            if low[nid] == index[nid]:
+                comp = []
+                while True:
+                    top = stack.pop()
+                    on_stack.discard(top)
+                    comp.append(top)
+                    if top == nid:
+                        break
+                comps.append(comp)
+
+    return comps
@@ -1,67 +1,211 @@
 from __base__ import *  # ~~~ automatically generated by __autoinject__.py ~~~
 
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
 import copy
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import numpy as np
 import tensorflow as tf
 
-from node_graph.nodes import node_class_ref
+from node_graph.graph_index import GraphIndex
+from node_graph.exec_plan import ExecutionPlan, PlanStep
+from node_graph.initializers import INITIALIZERS
+from node_graph.least_squares import solve_affine
 from node_graph.loss_funcs import LOSS_FUNCTIONS
-from node_graph.training_weights import WeightRef
+from node_graph.nodes import LinearRegressionMDL
+from node_graph.optimizers import OPTIMIZERS, Optimizer
+from node_graph.profiler import NodeProfiler
+from node_graph.stopping import StoppingCriteria
+from node_graph.training_weights import FlatWeights, WeightRef, trainable_variables
 from node_state import NodeState
-from errors import ModelExecutionRuntimeError, ModelExecutionError
+from errors import ModelExecutionRuntimeError, ModelExecutionError, ModelTrainingError
+
+TRAINING_ALGORITHMS = ("Gradient Descent", "Mini-batch SGD", "Direct solve")
+LOG_EVERY = 100  # the training loop logs (at debug level) only one iteration/step/cycle out of this many
 
 
 class ModelPredictor:
     """
     Merely executes the `execute()` function for each node and handles the movement of input and output
     between nodes. The ModelPredictor assumes all weights have been properly trained.
+
+    A predictor runs one request at a time (its nodes hold the data of the run), but it only ever reads the weights,
+    so several predictors of a model can share them and run in parallel threads.
+
+    Within a request, workers > 1 executes the independent branches of the graph (e.g. two models fed by the same
+    input) on a thread pool of that many threads--see _cycle_exec_parallel(). The setup cycle, graphs with loops and
+    traced graph functions always replay the plan serially.
+
+    The nodes drop their references to the intermediate data as soon as it has been consumed (see the plan's
+    liveness), so only the data still waiting on a consumer is kept alive. retain keeps everything the nodes saw
+    around after the run instead, for debugging (see intermediates()).
+
+    A profiler attached (`profiler`) records every node executed, see NodeProfiler.
     """
     # TODO: executor will need info about variable selection, variable specifier, etc.
 
-    def __init__(self, model_exec_data, weights: List[tf.Variable]):
+    def __init__(self, model_exec_data, weights: List[tf.Variable], *, compiled: bool = False, max_traces: int = 8,
+                 workers: int = 1, retain: bool = False):
         # each individual nodes are labelled with an id based on its index in the model exec data list
         self.mdl_ref_dt = copy.deepcopy(model_exec_data)  # mapper between node-exec id and the actual node data
-        self.inp_ref_nd = {}  # mapper between input id to its respective node (through node id) and its name
-        self.node_anchors = []
         self.global_weights_vec: List[tf.Variable] = weights
 
-        self.node_adj_list = {nid:[] for nid in range(0, len(self.mdl_ref_dt))}
-        for (nid, nd) in enumerate(self.mdl_ref_dt):
-            nd["%%class"] = node_class_ref[nd["ndtg"]]()
-            # dprint(nd, nd["%%class"].state)
-            # dprint(nid, nd["inp"])
-            # dprint("zip?", nd["inp"], nd["%%class"].field_data()["input"])
-            for (inp_id, inp_nm) in zip(nd["inp"], nd["%%class"].field_data["input"]):
-                self.inp_ref_nd[inp_id] = (nid, inp_nm)
-            for (out_nid, out_nd) in enumerate(self.mdl_ref_dt):
-                out_fld = [j for i in out_nd["out"] for j in i]
-                if len(nd["inp"]+out_fld) > len(set(nd["inp"]) | set(out_fld)):
-                    self.node_adj_list[out_nid].append(nid)
-            for const_nm in nd["const"]:
-                nd["const"][const_nm] = nd["%%class"].field_data["constant"][const_nm].bin_deserialize(nd["const"][const_nm])
-            if nd["%%class"].state == NodeState.INPUT:
-                self.node_anchors.append(nid)
-            # dprint("FIELD APPENDING", nd["inp"], nd["out"])
-        # dprint(self.node_adj_list)
+        index = GraphIndex(self.mdl_ref_dt)
+        self.inp_ref_nd = index.inp_ref_nd  # mapper between input id to its respective node (through node id) and its name
+        self.node_anchors = index.node_anchors
+        self.node_adj_list = index.node_adj_list
+
+        self.plan = ExecutionPlan(self.mdl_ref_dt, index)
+        self._bound = False  # whether the nodes' weights are bound yet (see _bind())
+
+        # a loop needs the plan's order to carry its values between cycles, so it's never run in parallel
+        self.workers = workers if len(self.plan.back_edges) == 0 else 1
+        self._pool: Optional[ThreadPoolExecutor] = None  # started on the first parallel cycle
+        self._dependencies = {}  # node ids of a subset of the steps to its dependencies (see ExecutionPlan)
+        self.retain = retain  # (a loop carries its values between cycles, so a graph with one retains them anyway)
+        self.profiler: Optional[NodeProfiler] = None
+
+        # compiled prediction: the weight-dependent nodes between the static (input) nodes and the output nodes are
+        # traced into a graph function, once per signature (dtypes & shapes, row counts aside) of the data fed into them
+        # (a loop would carry values between cycles, which a traced function can't, so those always run eagerly)
+        self.compiled = compiled and len(self.plan.back_edges) == 0
+        self.max_traces = max_traces
+        self._traces = OrderedDict()  # signature to its traced concrete function, least recently used first
+        self._graph_steps = tuple(st for st in self.plan.dynamic_steps if st.node.state != NodeState.OUTPUT)
+        self._output_steps = tuple(st for st in self.plan.dynamic_steps if st.node.state == NodeState.OUTPUT)
+        graph_nodes = {st.node for st in self._graph_steps}
+        # (producer node, output field name, consumers inside the graph) of the data fed into the graph
+        self._graph_feeds = self.plan.feeds_into(self._graph_steps)
+        # (producer node, output field name, consumers outside the graph) of the data coming out of the graph
+        self._graph_results = tuple(
+            (st.node, ofld_nm, tuple(slot for slot in slots if slot[0] not in graph_nodes))
+            for st in self._graph_steps for (ofld_nm, slots) in st.wiring
+            if any(slot[0] not in graph_nodes for slot in slots))
 
     def execute(self, inst_state) -> Dict[str, tuple]:
         dprint("Model Prediction Begin")
 
-        # resets the weights to immediately prepare for the next round of execution
-        for nd in self.mdl_ref_dt:
-            nd["%%class"].weights.reset()
-
-        self.cycle_exec(inst_state, init_setup=True)
-        self.cycle_exec(inst_state)
+        if self.compiled:
+            self.execute_compiled(inst_state)
+        else:
+            self.cycle_exec(inst_state, steps=self.plan.static_steps)
+            self._bind(inst_state)
+            self.cycle_exec(inst_state, steps=self.plan.dynamic_steps)
 
         dprint("Model Prediction Finished")
 
         return inst_state["out"]
 
-    def cycle_exec(self, cycle_state, init_setup=False):
+    def execute_compiled(self, inst_state):
+        """
+        executes the static nodes, then the traced graph function of the data's signature (tracing it first if it
+        isn't cached), then the output nodes
+        """
+        self.cycle_exec(inst_state, steps=self.plan.static_steps)
+
+        # (read from the consumers: the producers may have been released of them already)
+        feeds = [_as_tensor(slots[0][0].inp.get(slots[0][1])) for (_producer, _ofld_nm, slots) in self._graph_feeds]
+        if not all(isinstance(val, tf.Tensor) for val in feeds):
+            dlog(LOG_WARNING, "data fed into the model isn't numerical; predicting eagerly")
+            self._bind(inst_state)
+            self.cycle_exec(inst_state, steps=self.plan.dynamic_steps)
+            return
+
+        signature = tuple((_relaxed_shape(val), val.dtype) for val in feeds)
+        if signature in self._traces:
+            self._traces.move_to_end(signature)
+        else:
+            self._traces[signature] = self._trace(inst_state, feeds)
+            if len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+
+        if self.profiler is None:
+            results = self._traces[signature](*feeds)
+        else:
+            with self.profiler.span("graph function"):
+                results = self._traces[signature](*feeds)
+        for ((producer, ofld_nm, slots), val) in zip(self._graph_results, results):
+            producer.out[ofld_nm] = val
+            for (ext_node, ifld_nm) in slots:
+                ext_node.inp[ifld_nm] = val
+        del feeds, results
+
+        self.cycle_exec(inst_state, steps=self._output_steps)
+
+        if self._releasing(False):
+            # the eager replay never reaches the graph's steps, which would have released these
+            for (producer, ofld_nm, slots) in self._graph_feeds + self._graph_results:
+                producer.out.pop(ofld_nm, None)
+            for (_producer, _ofld_nm, slots) in self._graph_feeds:
+                for (ext_node, ifld_nm) in slots:
+                    ext_node.inp.pop(ifld_nm, None)
+
+    def _trace(self, inst_state, feeds: List[tf.Tensor]):
+        dprint(f"tracing model prediction for {[(_relaxed_shape(val), val.dtype.name) for val in feeds]}")
+
+        # the traced function captures the bound weight variables themselves
+        self._bind(inst_state)
+
+        def graph(*args):
+            for ((_producer, _ofld_nm, slots), val) in zip(self._graph_feeds, args):
+                for (ext_node, ifld_nm) in slots:
+                    ext_node.inp[ifld_nm] = val
+            self.cycle_exec({"inp": {}, "out": {}, "predicting?": True}, steps=self._graph_steps)
+            return tuple(producer.out[ofld_nm] for (producer, ofld_nm, _slots) in self._graph_results)
+
+        # autograph off: the node walk is plain Python that should simply run (once) while tracing
+        return tf.function(graph, autograph=False).get_concrete_function(
+            *[tf.TensorSpec(_relaxed_shape(val), val.dtype) for val in feeds])
+
+    def execute_batch(self, inst_states: List[dict]) -> List[Dict[str, tuple]]:
+        """
+        Runs several independent requests through a single execution of the graph. Each request's input nodes are
+        executed on their own, their outputs stacked row-wise for the rest of the graph to run once on, and whatever
+        reaches the output nodes is split back by row count so each request gets only its own rows.
+
+        Assumes every node between the input and output nodes works row by row (true for every prediction model).
+        """
+        dprint(f"Model Batch Prediction Begin ({len(inst_states)} requests)")
+
+        if not self._bound:
+            self.cycle_exec(inst_states[0], steps=self.plan.static_steps)
+            self._bind(inst_states[0])
+        self.cycle_exec_batch(inst_states)
+
+        dprint("Model Batch Prediction Finished")
+
+        return [inst_state["out"] for inst_state in inst_states]
+
+    def intermediates(self) -> Dict[int, dict]:
+        """
+        node id to its node's type and the inputs & outputs it holds after the last run (all of them when retaining them)
+        """
+        return {step.nid: {"ndtg": step.node.ndtg, "inp": dict(step.node.inp), "out": dict(step.node.out)}
+                for step in self.plan.steps}
+
+    def _releasing(self, init_setup: bool) -> bool:
+        """
+        whether a cycle drops the consumed data (the setup cycle's data gets executed again, and a trace's tensors are
+        symbolic anyway)
+        """
+        return not (self.retain or init_setup or len(self.plan.back_edges) != 0 or tf.inside_function())
+
+    def _bind(self, inst_state):
         """
-        executes the model node graph
+        binds the nodes' weights to the weights vector through the setup cycle of the weight-dependent steps, on the
+        first run only: the bindings belong to this predictor's own node instances and stay for its lifetime, while the
+        weights themselves are only ever read (so any number of predictors can share them). Requires the static steps
+        to have been executed.
+        """
+        if not self._bound:
+            self.cycle_exec(inst_state, init_setup=True, steps=self.plan.dynamic_steps)
+            self._bound = True
+
+    def cycle_exec(self, cycle_state, init_setup=False, steps: Optional[Tuple[PlanStep, ...]] = None):
+        """
+        executes the model node graph (or only the given subset of the plan's steps)
         """
         dprint("Model Prediction Cycle Begin")
 
@@ -72,60 +216,55 @@ class ModelPredictor:
         # dprint("ANCHOR", self.node_anchors)
         # dprint("ADJLST", self.node_adj_list)
 
-        # this is a modified breadth-first search where there are no visited queue, because first time you visit
-        # Node A, it might not be ready till all the other connected nodes assigns the values to Node A's input.
-        # In other words, calling the already visited Node A is OK, and once the last connected node refers to Node A,
-        # then it will allow Node A to execute (because then all the Node A's inputs are assigned with values).
-
+        # (the weights are bound in plan order, and a trace has to be built by a single thread)
+        if self.workers > 1 and not init_setup and not tf.inside_function():
+            self._cycle_exec_parallel(cycle_state, self.plan.steps if steps is None else steps)
+            dprint("Model Prediction Cycle Finished")
+            return
+
+        # the node graph was already resolved into a flat execution order (see ExecutionPlan), so a cycle is only a
+        # replay of the plan's steps
+
+        # per each node executed
+        # ----------------------
+        # 1. check all input field data is filled
+        # 2. retrieve all the constant's value
+        # 3. execute the node
+        # 4. check output field data is valid
+        #   ~ Are all necessary fields filled (else return a warning and fill that field with None)
+        #   ~ Additional unknown fields will be sent out as a warning and break
+        #   ~ [Tentative:TypeChecking] If that output field does not have a correct type (else return a warning)
+        # 5. Fill each referenced input field with the data from output through the plan's pre-resolved wiring
+        # 6. Drop the data no node executed later needs anymore (see ExecutionPlan)
+        # --- done ---
+
+        release = self._releasing(init_setup)
+        profiler = None if tf.inside_function() else self.profiler  # (traced nodes don't really execute)
         weights_activated = 0
-        queue = self.node_anchors.copy()
-        while len(queue) != 0:
-            first = queue[0]
-            del queue[0]
-            nd_dt = self.mdl_ref_dt[first]  # note: reference (not copy)
-            fld_meta = nd_dt["%%class"].field_data
-
-            for nd_ref in self.node_adj_list[first]:
-                queue.append(nd_ref)
-
-            # dprint("STATE:", nd_dt["%%class"].state)
-            # dprint("FIELD:", fld_meta)
-            # dprint("ND DT:", nd_dt)
-
-            # per each node executed
-            # ----------------------
-            # 1. check all input field data is filled
-            # 2. retrieve all the constant's value
-            # 3. execute the node
-            # 4. check output field data is valid
-            #   ~ Are all necessary fields filled (else return a warning and fill that field with None)
-            #   ~ Additional unknown fields will be sent out as a warning and break
-            #   ~ [Tentative:TypeChecking] If that output field does not have a correct type (else return a warning)
-            # 5. Find each output field's reference input field ID through the mapper to find the node
-            # 6. Fill the referenced input field with the data from output
-            # --- done ---
-
-            if nd_dt["%%class"].state != NodeState.INPUT:
-                # dprint("INP", nd_dt["%%class"].inp)
-                valid_inp = True
-                for ifld_nm in fld_meta["input"]:
-                    if ifld_nm not in nd_dt["%%class"].inp:
-                        valid_inp = False
-                        break
-                if valid_inp is False:
-                    dprint("warning: incomplete input")
-                    continue
+        step: PlanStep
+        for step in (self.plan.steps if steps is None else steps):
+            node = step.node
+
+            if not _inputs_ready(step):
+                dlog(LOG_WARNING, "incomplete input")
+                if release:
+                    _release(step)
+                continue
 
             # NOTE: retrieving value directly from the constant widget object itself rather than deserializing
             #   binary data is not garunteed to have the same value as the user specified, as this class strives
             #   to be independent from node data. Only from the read binary data.
-            nd_dt["%%class"].const = nd_dt["const"]  # {k:fld_meta["constant"][k].value() for k in fld_meta["constant"]}
+            node.const = step.const
             try:
-                nd_dt["%%class"].execute(cycle_state)
-                if init_setup and len(nd_dt["%%class"].weights) != 0:
+                if profiler is None:
+                    node.execute(cycle_state)
+                else:
+                    with profiler.measure(step):
+                        node.execute(cycle_state)
+                if init_setup and len(node.weights) != 0:
                     # activates the weight
                     w: WeightRef
-                    for w in nd_dt["%%class"].weights.collection:
+                    for w in node.weights.collection:
                         # fyi, activation happens after the node has set the weight's shape
                         w.activate_set(self.global_weights_vec, weights_activated)
                         weights_activated += 1
@@ -134,30 +273,138 @@ class ModelPredictor:
             except BaseException as e:
                 raise ModelExecutionError(msg=e, code=ModelExecutionError.DEBUG_ERROR)
 
-            if nd_dt["%%class"].state != NodeState.OUTPUT:
-                # dprint("OUT", nd_dt["%%class"].out)
-                for (ind, ofld_nm) in enumerate(fld_meta["output"]):
-                    # each output field in this node
-                    if ofld_nm not in nd_dt["%%class"].out:
-                        dprint(f"warning: output field <{ofld_nm}> is missing; will be replaced with None")
-                        nd_dt["%%class"].out[ofld_nm] = None
-                    for inp_ref in nd_dt["out"][ind]:
-                        # each referenced input of ext node of the individual output field in the current master node
-                        ext_node = self.mdl_ref_dt[self.inp_ref_nd[inp_ref][0]]
-                        ext_node["%%class"].inp[self.inp_ref_nd[inp_ref][1]] = nd_dt["%%class"].out[ofld_nm]
-                # dprint(nd_dt["%%class"].out)
-
-            # TODO: create a diagram why we do this instead of using visited list
-            # this is it removes any additional occurrences of the current <first> node presently from the queue, as to
-            # not repeat, while also allow loops with at least 2 different node instance it has to loop through
-            # (or else it just directly refers back to the queue and get removed instantly and its unreadable
-            # w/ a single node instance loop)
-            queue = [n for n in queue if n != first]
+            _hand_over(step)
+            if release:
+                _release(step)
 
         dprint("Model Prediction Cycle Finished")
 
+    def _cycle_exec_parallel(self, cycle_state, steps: Tuple[PlanStep, ...]):
+        """
+        Executes each step on the thread pool as soon as all the steps feeding into it are done, so independent
+        branches run at the same time (TensorFlow ops release the GIL while they compute). A step with incomplete
+        inputs is skipped like in the serial replay, still releasing the steps waiting on it.
+
+        A failing step stops anything new from being scheduled; its error is raised once the running steps are done.
+        """
+        key = tuple(step.nid for step in steps)
+        if key not in self._dependencies:
+            self._dependencies[key] = self.plan.dependencies(steps)
+        (waiting, successors) = self._dependencies[key]
+        waiting = list(waiting)
+        release = self._releasing(False)
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="predictor")
+
+        running = {self._pool.submit(self._exec_step, steps[ind], cycle_state, release): ind
+                   for ind in range(len(steps)) if waiting[ind] == 0}
+        while len(running) != 0:
+            (done, _pending) = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                ind = running.pop(future)
+                if future.exception() is not None:
+                    wait(running)
+                    raise future.exception()
+                for nxt in successors[ind]:
+                    waiting[nxt] -= 1
+                    if waiting[nxt] == 0:
+                        running[self._pool.submit(self._exec_step, steps[nxt], cycle_state, release)] = nxt
+
+    def _exec_step(self, step: PlanStep, cycle_state, release: bool):
+        """
+        executes a single (non-setup) step and hands its outputs over (releasing what it consumed if release)
+        """
+        node = step.node
+        if not _inputs_ready(step):
+            dlog(LOG_WARNING, "incomplete input")
+            if release:
+                _release(step)
+            return
+
+        node.const = step.const
+        try:
+            if self.profiler is None:
+                node.execute(cycle_state)
+            else:
+                with self.profiler.measure(step):
+                    node.execute(cycle_state)
+        except ModelExecutionRuntimeError as e:
+            raise e
+        except BaseException as e:
+            raise ModelExecutionError(msg=e, code=ModelExecutionError.DEBUG_ERROR)
+
+        _hand_over(step)
+        if release:
+            _release(step)
+
+    def cycle_exec_batch(self, cycle_states: List[dict]):
+        """
+        executes the model node graph once for all the given (non-setup) cycle states; see execute_batch()
+        """
+        dprint("Model Batch Prediction Cycle Begin")
+
+        for cycle_state in cycle_states:
+            cycle_state["first"] = False
+        batch_state = {"inp": {}, "out": {}, "predicting?": True, "first": False}  # for the nodes in between
+
+        rows: Optional[List[int]] = None  # row count of each request
+        release = self._releasing(False)
+        profiler = self.profiler
+        step: PlanStep
+        for step in self.plan.steps:
+            node = step.node
+
+            if not _inputs_ready(step):
+                dlog(LOG_WARNING, "incomplete input")
+                if release:
+                    _release(step)
+                continue
+
+            node.const = step.const
+            if profiler is not None:
+                (wall, cpu) = profiler.clock()
+            try:
+                if node.state == NodeState.INPUT:
+                    outs = []
+                    for cycle_state in cycle_states:
+                        node.out = {}
+                        node.execute(cycle_state)
+                        outs.append(node.out)
+                    node.out = {}
+                    for ofld_nm in node.field_data["output"]:
+                        vals = [out.get(ofld_nm) for out in outs]
+                        node.out[ofld_nm] = _stack_rows(vals)
+                        if node.out[ofld_nm] is not None:
+                            vrows = [len(v) for v in vals]
+                            if rows is None:
+                                rows = vrows
+                            elif rows != vrows:
+                                raise ModelExecutionRuntimeError(
+                                    msg=f"batched inputs of <{node.ndtg}> have mismatched row counts {rows} & {vrows}",
+                                    code=ModelExecutionRuntimeError.BATCH_ROWS_MISMATCH)
+                elif node.state == NodeState.OUTPUT:
+                    stacked = node.inp
+                    splits = {ifld_nm: _split_rows(val, rows, len(cycle_states)) for (ifld_nm, val) in stacked.items()}
+                    for (ind, cycle_state) in enumerate(cycle_states):
+                        node.inp = {ifld_nm: splits[ifld_nm][ind] for ifld_nm in splits}
+                        node.execute(cycle_state)
+                    node.inp = stacked
+                else:
+                    node.execute(batch_state)
+            except ModelExecutionRuntimeError as e:
+                raise e
+            except BaseException as e:
+                raise ModelExecutionError(msg=e, code=ModelExecutionError.DEBUG_ERROR)
+            if profiler is not None:
+                profiler.record_step(step, wall, cpu)  # (an input or output node over all the requests)
+
+            _hand_over(step)
+            if release:
+                _release(step)
+
+        dprint("Model Batch Prediction Cycle Finished")
+
 
-# TODO: add an option to automatically initialize the global weights vec like to random, linear steps, init value, etc.
 class ModelTrainer:
     """
     Similar to the purpose of ModelPredictor, but this time, its like the "debug" version of the ModelPredictor, with
@@ -167,97 +414,392 @@ class ModelTrainer:
     """
 
     def __init__(self, model_exec_data):
-        self.global_weights_vec: List[tf.Variable] = []
+        self.global_weights_vec: List[tf.Variable] = []  # or FlatWeights (see execute())
+        self.optimizer: Optional[Optimizer] = None  # applies the gradients, keeping its state alongside the weights
+        self.optimizer_name: Optional[str] = None
+        self.grad_norm: Optional[tf.Variable] = None  # global norm of the last training step's gradients
+        self.report: Optional[dict] = None  # how the last training run went, see execute()
+        self.profiler: Optional[NodeProfiler] = None  # see execute()
         self.interim_pred = None
 
-        self.mdl_ref_dt = copy.deepcopy(model_exec_data)
-        self.inp_ref_nd = {}
-        self.node_anchors = []
+        self.mdl_ref_dt = copy.deepcopy(model_exec_data)  # see GraphIndex for the model reference data layout
 
         self.expc_out = None  # the expected output/prediction (i.e. the answer key)
 
-        """
-        Model Reference Data
-        --------------------
-        [
-            Node {
-                node tag "ndtg": str,
-                input numerical ids for each input fields "inp": [int],
-                output per index is another list of input numerical ids connecting with the output "out": [[int]],
-                constant fields "const": ConstantFields {
-                    constant field name: its binary data
-                }
-            },
-               .
-               .
-               .
-        ]
-        """
-
-        self.node_adj_list = {nid: [] for nid in range(0, len(self.mdl_ref_dt))}
-        for (nid, nd) in enumerate(self.mdl_ref_dt):
-            nd["%%class"] = node_class_ref[nd["ndtg"]]()
-            for (inp_id, inp_nm) in zip(nd["inp"], nd["%%class"].field_data["input"]):
-                self.inp_ref_nd[inp_id] = (nid, inp_nm)
-            for (out_nid, out_nd) in enumerate(self.mdl_ref_dt):
-                out_fld = [j for i in out_nd["out"] for j in i]
-                if len(nd["inp"]+out_fld) > len(set(nd["inp"]) | set(out_fld)):
-                    self.node_adj_list[out_nid].append(nid)
-            for const_nm in nd["const"]:  # convert constant field binary data into usable data by custom deserialization
-                nd["const"][const_nm] = nd["%%class"].field_data["constant"][const_nm].bin_deserialize(
-                    nd["const"][const_nm])
-            if nd["%%class"].state == NodeState.INPUT:
-                self.node_anchors.append(nid)
-
-    def execute(self, iterations: int, loss_name: str, rate: float, inst_state):
+        index = GraphIndex(self.mdl_ref_dt)
+        self.inp_ref_nd = index.inp_ref_nd
+        self.node_anchors = index.node_anchors
+        self.node_adj_list = index.node_adj_list
+
+        self.plan = ExecutionPlan(self.mdl_ref_dt, index)
+        # (producer node, output field name, weight-dependent consumers) of the static data the training steps run on
+        self.static_feeds = self.plan.feeds_into(self.plan.dynamic_steps)
+
+    def execute(self, iterations: int, loss_name: str, rate: float, inst_state, *,
+                algorithm: str = "Gradient Descent", batch_size: int = 32, shuffle: bool = True,
+                steps_per_epoch: Optional[int] = None, seed: Optional[int] = None, optimizer: str = "SGD",
+                opt_state: Optional[dict] = None, initializer: str = "Zeros",
+                node_initializers: Optional[Dict[int, str]] = None, init_scale: float = 0.05,
+                warm_weights: Optional[List[tf.Variable]] = None,
+                validation_split: float = 0.0, patience: Optional[int] = None,
+                tolerance: Optional[float] = None, grad_tolerance: Optional[float] = None,
+                time_budget: Optional[float] = None, compiled: bool = False, jit_compile: bool = False,
+                flat_weights: bool = False, profiler: Optional[NodeProfiler] = None) -> dict:
         """
         1. find the anchor nodes
-        2. execute the first cycle tracking down all the weights
-        3. re-execute again and again
-        """
-        dprint("Model Training Begin")
-        dprint(f"Iterations {iterations} - Loss {loss_name} - Rate {rate}")
+        2. execute the first cycle tracking down all the weights (and computing the weight-independent nodes once)
+        3. re-execute the weight-dependent nodes again and again
 
-        loss_func = LOSS_FUNCTIONS[loss_name]
+        algorithm is one of TRAINING_ALGORITHMS:
+            "Gradient Descent": every step computes the loss over the whole data (iterations counts the setup cycle too)
+            "Mini-batch SGD": iterations is the number of epochs, each going through the (reshuffled, if shuffle) data
+                <batch_size> rows at a time--at most <steps_per_epoch> steps per epoch if given. seed makes the
+                shuffling reproducible
+            "Direct solve": the exact least squares solution in one go where the model allows it (see
+                direct_solve()), gradient descent otherwise
 
-        self.cycle_exec(inst_state, init_setup=True)
-        dprint("GLOBAL WEIGHTS VEC", self.global_weights_vec)
+        optimizer is one of OPTIMIZERS, applying each step's gradients with the learning rate. opt_state (see
+        optimizer_state()) resumes the optimizer from a previous run, if it was the same optimizer over the same weights
+
+        initializer (one of INITIALIZERS) sets the weights' starting values, overridden per node (by node id) by
+        node_initializers; see initialize(). seed makes the random ones reproducible
+
+        warm_weights starts the training from previously trained weights instead, if they match the model's weights
+        in count and shapes (see warm_start())
 
-        for _ in range(iterations-1):
-            # ndtg, inp = self.cycle_exec(inst_state, intercept_out=True)
-            # if ndtg == "OutCV":
-            #     pred = inp["data"]
+        validation_split holds that fraction of the rows (picked by seed) out of training to compute a validation loss
+        on after every iteration. patience, tolerance, grad_tolerance & time_budget end the run early (see
+        StoppingCriteria)
 
-                with tf.GradientTape(persistent=True) as g:
-                    ndtg, inp = self.cycle_exec(inst_state, intercept_out=True)
-                    if ndtg == "OutCV":
-                        loss: tf.Tensor = loss_func(inp["data"], self.expc_out)
+        compiled traces each training step (see train_step()) into a single tf.function, optionally compiled further
+        with XLA through jit_compile
 
-                dl_dw = g.gradient(loss, self.global_weights_vec)
-                dprint("LOSS", loss.numpy())
-                dprint("GRADIENT", dl_dw)
+        flat_weights keeps the weights in one contiguous buffer (see FlatWeights), so the gradients are taken and the
+        optimizer updates applied on all of them at once
 
-                for i, w in enumerate(self.global_weights_vec):
-                    w.assign_sub(rate * dl_dw[i])
+        profiler records every node executed (see NodeProfiler); the steps of a compiled training only as a whole
 
-                #     linreg.coef.assign_sub(learning_rate * dl_dw2)
-                #     linreg.bias.assign_sub(learning_rate * dl_db2)
+        Returns (and keeps as `report`) how the run went: the criterion that ended it ("iterations" if none did),
+        the iterations run, the last training/validation loss and whether it was warm started.
+        """
+        dprint("Model Training Begin")
+        dprint(f"{algorithm} - Iterations {iterations} - Loss {loss_name} - Optimizer {optimizer} - Rate {rate} - "
+               f"Compiled {compiled} (XLA {jit_compile})")
+
+        if algorithm not in TRAINING_ALGORITHMS:
+            raise ModelTrainingError(msg=f"unknown training algorithm <{algorithm}>",
+                                     code=ModelTrainingError.ALGORITHM_UNKNOWN)
+        stopping = StoppingCriteria(patience=patience, tolerance=tolerance, grad_tolerance=grad_tolerance,
+                                    time_budget=time_budget)
+        self.report = {"stopped by": "iterations", "iterations": 0, "loss": None, "validation loss": None,
+                       "warm started": False, "seconds": 0.0}
+
+        self.profiler = profiler
+        self.global_weights_vec = FlatWeights() if flat_weights else []
+        self.cycle_exec(inst_state, init_setup=True)
+        if flat_weights:
+            self.global_weights_vec.pack()
+        self.hoist_static()
+        self.initialize(initializer, node_initializers, scale=init_scale, seed=seed)
+        if warm_weights is not None:
+            self.report["warm started"] = self.warm_start(warm_weights)
+        dprint("GLOBAL WEIGHTS VEC", self.global_weights_vec)
 
-        self.cycle_exec(inst_state)  # so the final output without interception can be fully executed
+        feeds = tuple(producer.out[ofld_nm] for (producer, ofld_nm, _slots) in self.static_feeds)
+        if algorithm == "Direct solve" and not self.direct_solve(loss_name):
+            dprint("direct solve doesn't apply to this model; training with gradient descent instead")
+            algorithm = "Gradient Descent"
+
+        if algorithm == "Direct solve":
+            self.report["stopped by"] = "direct solve"
+        else:
+            (train, held_out) = self.split((feeds, self.expc_out), validation_split, seed)
+            minibatch = algorithm == "Mini-batch SGD"
+            step_fn = self.train_step(inst_state, loss_name, rate, optimizer=optimizer, batched=minibatch,
+                                      data=train, compiled=compiled, jit_compile=jit_compile)
+            if opt_state is not None and opt_state.get("optimizer") == optimizer:
+                resumed = self.optimizer.restore({k: v for (k, v) in opt_state.items() if k != "optimizer"})
+                dprint(f"optimizer state {'resumed' if resumed else 'does not fit the weights; starting over'}")
+            eval_fn = None if held_out is None else self.eval_step(inst_state, loss_name, held_out, compiled=compiled)
+            if profiler is not None:
+                step_fn = profiler.wrap(step_fn, "training step")
+                eval_fn = None if eval_fn is None else profiler.wrap(eval_fn, "validation loss")
+
+            if minibatch:
+                rounds = self.minibatch_sgd(step_fn, train, iterations, batch_size, shuffle=shuffle,
+                                            steps_per_epoch=steps_per_epoch, seed=seed)
+            else:
+                rounds = ((float(step_fn()), float(self.grad_norm)) for _ in range(iterations-1))
+            for (loss, grad_norm) in rounds:
+                val_loss = None if eval_fn is None else float(eval_fn())
+                self.report["iterations"] += 1
+                self.report["loss"] = loss
+                self.report["validation loss"] = val_loss
+                dlog(LOG_DEBUG, "iteration", self.report["iterations"], loss=loss, validation_loss=val_loss,
+                     grad_norm=grad_norm, every=LOG_EVERY)
+
+                reason = stopping.check(loss, grad_norm, val_loss)
+                if reason is not None:
+                    self.report["stopped by"] = reason
+                    break
+
+        # so the final output without interception can be fully executed (over the whole data)
+        self._feed(feeds)
+        self.cycle_exec(inst_state, steps=self.plan.dynamic_steps)
 
         # resets the weights in-preparation for the next execution
         for nd in self.mdl_ref_dt:
             nd["%%class"].weights.reset()
 
-        dprint("Model Training Finished")
+        self.report["seconds"] = time.perf_counter() - stopping.start
+        dprint("Model Training Finished", self.report)
 
-    def cycle_exec(self, cycle_state, init_setup=False, intercept_out=False):
+        return self.report
+
+    def warm_start(self, weights: List[tf.Variable]) -> bool:
+        """
+        Copies the given weights (e.g. the model's last trained ones) into the activated global weights vector, if
+        they match it weight for weight in shape--otherwise the model changed since, and the weights stay as they
+        were initialized.
+        The given weights are only read, so they can keep serving predictions while training. Returns whether it did.
+        """
+        if len(weights) != len(self.global_weights_vec) or any(
+                tuple(w.shape) != tuple(gw.shape) for (w, gw) in zip(weights, self.global_weights_vec)):
+            dlog(LOG_WARNING, "the weights don't match the model's; training from the initialized weights")
+            return False
+        if isinstance(self.global_weights_vec, FlatWeights) and self.global_weights_vec.packed:
+            self.global_weights_vec.assign_all(weights)
+            return True
+        for (w, gw) in zip(weights, self.global_weights_vec):
+            gw.assign(tf.cast(w, gw.dtype))
+        return True
+
+    def initialize(self, initializer: str = "Zeros", node_initializers: Optional[Dict[int, str]] = None, *,
+                   scale: float = 0.05, seed: Optional[int] = None):
+        """
+        Sets the starting values of the activated weights, node by node in plan order (so a seed always gives the
+        same values): with the node's own initializer in node_initializers (node id to initializer name) or the
+        global one. A data-driven initializer not applying to a node leaves it at zero.
+
+        Requires the setup cycle to have been executed and the static nodes hoisted (the least squares seed reads
+        the data fed into the node).
+        """
+        node_initializers = node_initializers or {}
+        rng = np.random.default_rng(seed)
+        for step in self.plan.steps:
+            node = step.node
+            if len(node.weights) == 0:
+                continue
+            name = node_initializers.get(step.nid, initializer)
+            if name not in INITIALIZERS:
+                raise ModelTrainingError(msg=f"unknown initializer <{name}>",
+                                         code=ModelTrainingError.INITIALIZER_UNKNOWN)
+
+            values = INITIALIZERS[name](node, rng, scale, self.expc_out)
+            if values is None:
+                dlog(LOG_WARNING, f"initializer <{name}> doesn't apply to node <{step.nid}:{node.ndtg}>; left at zero")
+                continue
+            for w in node.weights.collection:
+                w.value.assign(np.asarray(values[w.name], dtype=w.value.dtype.as_numpy_dtype))
+
+    def direct_solve(self, loss_name: str) -> bool:
+        """
+        Solves the weights in closed form if the weight-dependent part of the model is a single Linear Regression node
+        fed by static data and feeding the output node directly, trained under MSE: the exact solution gradient
+        descent would converge to. Returns whether it did (nothing is changed otherwise).
+        """
+        graph = [step for step in self.plan.dynamic_steps if step.node.state != NodeState.OUTPUT]
+        if loss_name != "MSE" or len(graph) != 1 or not isinstance(graph[0].node, LinearRegressionMDL):
+            return False
+        node = graph[0].node
+        ((_ofld_nm, slots),) = graph[0].wiring
+        if len(slots) != 1 or slots[0][0].ndtg != "OutCV":
+            return False
+
+        x = node.inp.get("x")
+        y = self.expc_out
+        coef = node.weights["coef"].value
+        if not (_has_rows(x) and _has_rows(y) and x.shape.rank == 2 and y.shape.rank == 1
+                and x.shape[0] == y.shape[0] and tuple(x.shape[1:]) == tuple(coef.shape)):
+            return False
+
+        (coef_val, bias_val) = solve_affine(x.numpy(), y.numpy())
+        coef.assign(coef_val.astype(np.float32))
+        node.weights["bias"].value.assign(np.float32(bias_val))
+        dprint("DIRECT SOLVE", coef_val, bias_val)
+        return True
+
+    def split(self, data: tuple, validation_split: float, seed: Optional[int] = None) -> (tuple, Optional[tuple]):
+        """
+        splits the (static feeds, expected output) data into the rows to train on and the rows held out for
+        validation (None if validation_split is 0)
+        """
+        if validation_split == 0:
+            return data, None
+        if not 0 < validation_split < 1:
+            raise ModelTrainingError(msg=f"invalid validation split <{validation_split}>",
+                                     code=ModelTrainingError.VALIDATION_SPLIT_INVALID)
+
+        order = np.random.default_rng(seed).permutation(self._rows(data))
+        held = min(max(int(len(order) * validation_split), 1), len(order) - 1)
+        return _take_rows(data, np.sort(order[held:])), _take_rows(data, np.sort(order[:held]))
+
+    def minibatch_sgd(self, step_fn, data: tuple, epochs: int, batch_size: int, *, shuffle: bool = True,
+                      steps_per_epoch: Optional[int] = None, seed: Optional[int] = None):
+        """
+        Runs the (batched) training steps over row slices of the (static feeds, expected output) data, so each step
+        only computes the batch's rows. Every tensor with rows is sliced; anything else (scalars, non-numerical data)
+        is fed whole.
+
+        Yields the mean loss and gradient norm of the steps after each epoch.
+        """
+        if batch_size <= 0 or (steps_per_epoch is not None and steps_per_epoch <= 0):
+            raise ModelTrainingError(msg=f"invalid batch size <{batch_size}> or steps per epoch <{steps_per_epoch}>",
+                                     code=ModelTrainingError.BATCH_SIZE_INVALID)
+        rows = self._rows(data)
+
+        rng = np.random.default_rng(seed)
+        for epoch in range(epochs):
+            order = rng.permutation(rows) if shuffle else None
+            total = 0.0
+            grad_norms = 0.0
+            steps = 0
+            for start in range(0, rows, batch_size):
+                if steps_per_epoch is not None and steps == steps_per_epoch:
+                    break
+                if order is None:
+                    batch = _take_rows(data, slice(start, start + batch_size))
+                else:
+                    batch = _take_rows(data, order[start:start + batch_size])
+                loss = step_fn(*batch)
+                total += loss * min(batch_size, rows - start)
+                grad_norms += self.grad_norm.read_value()
+                steps += 1
+            dlog(LOG_DEBUG, "epoch", epoch, every=LOG_EVERY)
+            yield float(total / min(rows, steps * batch_size)), float(grad_norms / steps)
+
+    def train_step(self, inst_state, loss_name: str, rate: float, *, optimizer: str = "SGD", batched: bool = False,
+                   data: Optional[tuple] = None, compiled: bool = False, jit_compile: bool = False):
+        """
+        Returns a function doing a single optimizer step on the weights, returning the loss before the step (the
+        gradients' global norm is kept in `grad_norm`). Requires the setup cycle to have been executed (and the static
+        nodes hoisted). Sets up a fresh optimizer state for the weights.
+
+        The step runs on the given (static feeds, expected output) data--the whole hoisted data by default--unless
+        batched: then it takes the static feeds (see static_feeds) and the expected output to run on as its arguments
+        instead.
+
+        When compiled, the node walk through the dynamic steps, the loss and the weight update are traced into one
+        tf.function, so the Python side only runs while tracing and every later step is a single graph call.
+        """
+        loss_func = LOSS_FUNCTIONS[loss_name]
+        if optimizer not in OPTIMIZERS:
+            raise ModelTrainingError(msg=f"unknown optimizer <{optimizer}>", code=ModelTrainingError.OPTIMIZER_UNKNOWN)
+        # the optimizer's variables (and grad_norm) have to exist before the step gets traced
+        variables = trainable_variables(self.global_weights_vec)
+        self.optimizer = OPTIMIZERS[optimizer](rate)
+        self.optimizer.build(variables)
+        self.optimizer_name = optimizer
+        self.grad_norm = tf.Variable(0.0)
+
+        def step(feeds: tuple, expc_out):
+            self._feed(feeds)
+            with tf.GradientTape() as g:
+                ndtg, inp = self.cycle_exec(inst_state, intercept_out=True, steps=self.plan.dynamic_steps)
+                if ndtg == "OutCV":
+                    loss: tf.Tensor = loss_func(inp["data"], expc_out)
+
+            dl_dw = g.gradient(loss, variables)
+            dlog(LOG_DEBUG, "gradient", dl_dw, every=LOG_EVERY)
+
+            self.grad_norm.assign(tf.linalg.global_norm(dl_dw))
+            self.optimizer.apply(dl_dw, variables)
+
+            return loss
+
+        if not batched:
+            # the data gets captured by the trace as constants rather than passed in on every call
+            if data is None:
+                data = (tuple(producer.out[ofld_nm] for (producer, ofld_nm, _slots) in self.static_feeds),
+                        self.expc_out)
+            whole = step
+            step = lambda: whole(*data)
+
+        if compiled:
+            # autograph off: the node walk is plain Python that should simply run (once) while tracing
+            # reduce_retracing: a mini-batch epoch's last (smaller) batch shouldn't keep a trace of its own
+            return tf.function(step, jit_compile=jit_compile, autograph=False, reduce_retracing=batched)
+        return step
+
+    def eval_step(self, inst_state, loss_name: str, data: tuple, *, compiled: bool = False):
+        """
+        Returns a function computing the loss over the given (static feeds, expected output) data without touching
+        the weights (e.g. the validation loss)
+        """
+        loss_func = LOSS_FUNCTIONS[loss_name]
+        (feeds, expc_out) = data
+
+        def evaluate():
+            self._feed(feeds)
+            ndtg, inp = self.cycle_exec(inst_state, intercept_out=True, steps=self.plan.dynamic_steps)
+            if ndtg == "OutCV":
+                return loss_func(inp["data"], expc_out)
+
+        if compiled:
+            return tf.function(evaluate, autograph=False)
+        return evaluate
+
+    def _rows(self, data: tuple) -> int:
+        """
+        the row count of the (static feeds, expected output) data, which every tensor with rows has to share
+        """
+        (feeds, expc_out) = data
+        if not _has_rows(expc_out):
+            raise ModelTrainingError(msg="the expected output has no rows to split",
+                                     code=ModelTrainingError.BATCH_DATA_NOT_ROWWISE)
+        rows = expc_out.shape[0]
+        for val in feeds:
+            if _has_rows(val) and val.shape[0] != rows:
+                raise ModelTrainingError(msg=f"data of {val.shape[0]} rows doesn't match the expected output's {rows}",
+                                         code=ModelTrainingError.BATCH_DATA_NOT_ROWWISE)
+        return rows
+
+    def optimizer_state(self) -> Optional[dict]:
+        """
+        the optimizer name and state after training, to resume from later (see execute())
+        """
+        if self.optimizer is None:
+            return None
+        return {"optimizer": self.optimizer_name, **self.optimizer.state()}
+
+    def _feed(self, feeds: tuple):
+        for ((_producer, _ofld_nm, slots), val) in zip(self.static_feeds, feeds):
+            for (ext_node, ifld_nm) in slots:
+                ext_node.inp[ifld_nm] = val
+
+    def hoist_static(self):
+        """
+        Keeps the outputs of the weight-independent nodes (computed by the setup cycle) as tensors in their consumers'
+        inputs, so the following cycles only have to execute the weight-dependent steps--e.g. the training data is
+        parsed once per training run instead of once per iteration.
+
+        Numerical data is kept as float32, the dtype the weights are trained in.
+        """
+        for step in self.plan.static_steps:
+            node = step.node
+            node.out = {ofld_nm: _as_tensor(val) for (ofld_nm, val) in node.out.items()}
+            _hand_over(step)
+        self.expc_out = _as_tensor(self.expc_out)
+
+    def cycle_exec(self, cycle_state, init_setup=False, intercept_out=False, steps: Optional[Tuple[PlanStep, ...]] = None):
         """
         first defines whether the cycle is first or not. It is to determine whether this cycle should do weight
         initialization and other prep work.
+
+        steps limits the cycle to a subset of the plan (e.g. the dynamic steps once the static ones are hoisted)
         """
 
-        dprint("Model Training Cycle Begin")
+        dlog(LOG_DEBUG, "Model Training Cycle Begin", every=LOG_EVERY)
 
         cycle_state["first"] = init_setup
 
@@ -266,40 +808,28 @@ class ModelTrainer:
         # dprint("ANCHOR", self.node_anchors)
         # dprint("ADJLST", self.node_adj_list)
 
-        queue = self.node_anchors.copy()
-        while len(queue) != 0:
-            first = queue[0]
-            del queue[0]
-
-            nd_dt = self.mdl_ref_dt[first]  # note: reference (not copy)
-            fld_meta = nd_dt["%%class"].field_data
+        profiler = None if tf.inside_function() else self.profiler  # (traced nodes don't really execute)
+        step: PlanStep
+        for step in (self.plan.steps if steps is None else steps):
+            node = step.node
 
-            for nd_ref in self.node_adj_list[first]:
-                queue.append(nd_ref)
+            if not _inputs_ready(step):
+                dlog(LOG_WARNING, "incomplete input")
+                continue
 
-            # dprint("STATE:", nd_dt["%%class"].state)
-            # dprint("FIELD:", fld_meta)
-            # dprint("ND DT:", nd_dt)
-
-            if nd_dt["%%class"].state != NodeState.INPUT:
-                valid_inp = True
-                for ifld_nm in fld_meta["input"]:
-                    if ifld_nm not in nd_dt["%%class"].inp:
-                        valid_inp = False
-                        break
-                if valid_inp is False:
-                    dprint("warning: incomplete input")
-                    continue
-
-            nd_dt["%%class"].const = nd_dt["const"]  # {k:fld_meta["constant"][k].value() for k in fld_meta["constant"]}
+            node.const = step.const
             try:
-                if nd_dt["%%class"].state == NodeState.OUTPUT and intercept_out:
-                    return (nd_dt["%%class"].ndtg, nd_dt["%%class"].inp)
-                nd_dt["%%class"].execute(cycle_state)
-                if init_setup and len(nd_dt["%%class"].weights) != 0:
+                if node.state == NodeState.OUTPUT and intercept_out:
+                    return (node.ndtg, node.inp)
+                if profiler is None:
+                    node.execute(cycle_state)
+                else:
+                    with profiler.measure(step):
+                        node.execute(cycle_state)
+                if init_setup and len(node.weights) != 0:
                     # activates the weight
                     w: WeightRef
-                    for w in nd_dt["%%class"].weights.collection:
+                    for w in node.weights.collection:
                         # fyi, activation happens after the node has set the weight's shape
                         w.activate(self.global_weights_vec)
             except ModelExecutionRuntimeError as e:
@@ -307,32 +837,97 @@ class ModelTrainer:
             except BaseException as e:
                 raise ModelExecutionError(msg=e, code=ModelExecutionError.DEBUG_ERROR)
 
-            if nd_dt["%%class"].state != NodeState.OUTPUT:
-                # dprint("OUT", nd_dt["%%class"].out)
-                for (ind, ofld_nm) in enumerate(fld_meta["output"]):
-                    # each output field in this node
-                    if ofld_nm not in nd_dt["%%class"].out:
-                        dprint(f"warning: output field <{ofld_nm}> is missing; will be replaced with None")
-                        nd_dt["%%class"].out[ofld_nm] = None
-                    for inp_ref in nd_dt["out"][ind]:
-                        # each referenced input of ext node of the individual output field in the current master node
-                        ext_node = self.mdl_ref_dt[self.inp_ref_nd[inp_ref][0]]
-                        ext_node["%%class"].inp[self.inp_ref_nd[inp_ref][1]] = nd_dt["%%class"].out[ofld_nm]
-                # dprint(nd_dt["%%class"].out)
-
-                if init_setup and nd_dt["%%class"].ndtg == "InpCV":
-                    self.expc_out = nd_dt["%%class"].out["y"]
-
-            # TODO: create a diagram why we do this instead of using visited list
-            # this is it removes any additional occurrences of the current <first> node presently from the queue, as to
-            # not repeat, while also allow loops with at least 2 different node instance it has to loop through
-            # (or else it just directly refers back to the queue and get removed instantly and its unreadable
-            # w/ a single node instance loop)
-
-            # dprint("removes add. occur. eh?", queue, first)
-            queue = [n for n in queue if n != first]
-
-        dprint("Model Training Cycle Finished")
+            _hand_over(step)
+
+            if init_setup and node.ndtg == "InpCV":
+                self.expc_out = node.out["y"]
+
+        dlog(LOG_DEBUG, "Model Training Cycle Finished", every=LOG_EVERY)
 
         return (None, None)
 
+
+def _inputs_ready(step: PlanStep) -> bool:
+    """
+    whether all the input fields of the step's node have been filled
+    """
+    for ifld_nm in step.inp_flds:
+        if ifld_nm not in step.node.inp:
+            return False
+    return True
+
+
+def _hand_over(step: PlanStep):
+    """
+    fills every input field referencing the step's node outputs with that output's data
+    """
+    node = step.node
+    for (ofld_nm, slots) in step.wiring:
+        # each output field in this node
+        if ofld_nm not in node.out:
+            dlog(LOG_WARNING, f"output field <{ofld_nm}> is missing; will be replaced with None")
+            node.out[ofld_nm] = None
+        for (ext_node, ifld_nm) in slots:
+            # each referenced input of ext node of the individual output field in the current master node
+            ext_node.inp[ifld_nm] = node.out[ofld_nm]
+
+
+def _release(step: PlanStep):
+    """
+    drops the step's node's references to its inputs, and the outputs no later step consumes (see PlanStep.frees)
+    """
+    step.node.inp.clear()
+    for (producer, ofld_nm) in step.frees:
+        producer.out.pop(ofld_nm, None)
+
+
+def _relaxed_shape(val: tf.Tensor) -> tuple:
+    """
+    the shape of the data fed into a trace, its row count left open: requests of any number of rows share the trace
+    """
+    return tuple(val.shape) if val.shape.rank == 0 else (None, *val.shape[1:])
+
+
+def _as_tensor(val):
+    """
+    numerical numpy data as a float32 tensor (anything else is left as is)
+    """
+    if isinstance(val, np.ndarray) and (np.issubdtype(val.dtype, np.number) or val.dtype == np.bool_):
+        return tf.constant(val, dtype=tf.float32)
+    return val
+
+
+def _has_rows(val) -> bool:
+    return isinstance(val, tf.Tensor) and val.shape.rank != 0
+
+
+def _take_rows(data: tuple, rows) -> tuple:
+    """
+    the given rows (a slice or indices) of the (static feeds, expected output) data
+    """
+    take = (lambda val: val[rows]) if isinstance(rows, slice) else (lambda val: tf.gather(val, rows))
+    (feeds, expc_out) = data
+    return tuple(take(val) if _has_rows(val) else val for val in feeds), take(expc_out)
+
+
+def _stack_rows(vals: list):
+    """
+    stacks each request's data row-wise (None if no request has any data for it)
+    """
+    if all(v is None for v in vals):
+        return None
+    if all(isinstance(v, np.ndarray) for v in vals):
+        return np.concatenate(vals, axis=0)
+    return tf.concat(vals, axis=0)
+
+
+def _split_rows(val, rows: Optional[List[int]], count: int) -> list:
+    """
+    splits stacked data back into each of the <count> request's rows (data that isn't row-wise goes to every request
+    as is)
+    """
+    if rows is None or val is None or len(np.shape(val)) == 0:
+        return [val] * count
+    if isinstance(val, np.ndarray):
+        return np.split(val, np.cumsum(rows)[:-1], axis=0)
+    return tf.split(val, rows, axis=0)
@@ -0,0 +1,57 @@
+from __base__ import *  # ~~~ automatically generated by __autoinject__.py ~~~
+
+from typing import List, Dict, Tuple
+
+from node_graph.nodes import node_class_ref
+from node_state import NodeState
+
+
+class GraphIndex:
+    """
+    Resolves the model reference data in place (instantiates each node's class into "%%class" and deserializes its
+    constant field binary data) and indexes the connections between the nodes. Shared by both executors.
+
+    Every connection is keyed by the id of the input connector it ends at, so a single pass over the nodes' input ids
+    followed by a single pass over their output references builds the whole index: O(nodes + connections).
+
+    Model Reference Data
+    --------------------
+    [
+        Node {
+            node tag "ndtg": str,
+            input numerical ids for each input fields "inp": [int],
+            output per index is another list of input numerical ids connecting with the output "out": [[int]],
+            constant fields "const": ConstantFields {
+                constant field name: its binary data
+            }
+        },
+           .
+           .
+           .
+    ]
+    """
+
+    def __init__(self, mdl_ref_dt: List[dict]):
+        self.inp_ref_nd: Dict[int, Tuple[int, str]] = {}  # input id to its respective node (node id) and field name
+        self.node_anchors: List[int] = []  # input nodes, where the execution starts from
+        self.node_adj_list: Dict[int, List[int]] = {}  # node id to the node ids consuming any of its outputs
+
+        for (nid, nd) in enumerate(mdl_ref_dt):
+            nd["%%class"] = node_class_ref[nd["ndtg"]]()
+            fld_meta = nd["%%class"].field_data
+            for (inp_id, inp_nm) in zip(nd["inp"], fld_meta["input"]):
+                self.inp_ref_nd[inp_id] = (nid, inp_nm)
+            for const_nm in nd["const"]:  # convert constant field binary data into usable data by custom deserialization
+                nd["const"][const_nm] = fld_meta["constant"][const_nm].bin_deserialize(nd["const"][const_nm])
+            if nd["%%class"].state == NodeState.INPUT:
+                self.node_anchors.append(nid)
+
+        for (nid, nd) in enumerate(mdl_ref_dt):
+            # consumers are kept unique and in node id order (the order the executors have always visited them in)
+            self.node_adj_list[nid] = sorted({self.inp_ref_nd[inp_ref][0] for refs in nd["out"] for inp_ref in refs})
+
+    def consumers(self, inp_refs: List[int]) -> Tuple[Tuple[int, str], ...]:
+        """
+        (node id, input field name) of every input connector an output field is referencing
+        """
+        return tuple(self.inp_ref_nd[inp_ref] for inp_ref in inp_refs)
@@ -0,0 +1,86 @@
+from __base__ import *  # ~~~ automatically generated by __autoinject__.py ~~~
+
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import tensorflow as tf
+
+from node_graph.least_squares import solve_affine
+from node_graph.nodes import NodeExec, LinearRegressionMDL
+
+_SEED_ROWS = 4096  # rows sampled for the least squares seed
+
+
+def _weightwise(func: Callable[[Tuple[int, ...], np.random.Generator, float], np.ndarray]):
+    """
+    an initializer giving every weight of the node a value of its own from its shape alone
+    """
+    def init(node: NodeExec, rng: np.random.Generator, scale: float, expc_out) -> Dict[str, np.ndarray]:
+        return {w.name: func(tuple(w.value.shape), rng, scale) for w in node.weights.collection}
+    return init
+
+
+def _fans(shape: Tuple[int, ...]) -> (int, int):
+    if len(shape) == 0:
+        return 1, 1
+    if len(shape) == 1:
+        return shape[0], 1
+    return int(np.prod(shape[:-1])), shape[-1]
+
+
+def _zeros(shape, rng, scale):
+    return np.zeros(shape)
+
+
+def _constant(shape, rng, scale):
+    return np.full(shape, scale)
+
+
+def _uniform(shape, rng, scale):
+    return rng.uniform(-scale, scale, size=shape)
+
+
+def _normal(shape, rng, scale):
+    return rng.normal(0.0, scale, size=shape)
+
+
+def _glorot(shape, rng, scale):
+    (fan_in, fan_out) = _fans(shape)
+    limit = np.sqrt(6 / (fan_in + fan_out))
+    return rng.uniform(-limit, limit, size=shape)
+
+
+def _he(shape, rng, scale):
+    (fan_in, _fan_out) = _fans(shape)
+    return rng.normal(0.0, np.sqrt(2 / fan_in), size=shape)
+
+
+def _least_squares(node: NodeExec, rng: np.random.Generator, scale: float, expc_out) -> Optional[Dict[str, np.ndarray]]:
+    """
+    the least squares fit of a Linear Regression node's input against the expected output, over a sample of the rows
+    (only for a node fed with data having the expected output's rows)
+    """
+    x = node.inp.get("x")
+    if not isinstance(node, LinearRegressionMDL) or not isinstance(x, tf.Tensor) or not isinstance(expc_out, tf.Tensor):
+        return None
+    coef = node.weights["coef"].value
+    if not (x.shape.rank == 2 and expc_out.shape.rank == 1 and x.shape[0] == expc_out.shape[0]
+            and tuple(x.shape[1:]) == tuple(coef.shape)):
+        return None
+
+    rows = rng.choice(x.shape[0], size=min(x.shape[0], _SEED_ROWS), replace=False)
+    (coef_val, bias_val) = solve_affine(tf.gather(x, rows).numpy(), tf.gather(expc_out, rows).numpy())
+    return {"coef": coef_val, "bias": np.array(bias_val)}
+
+
+# initializer name to the function giving the values of all the weights of a node (by weight name), or None if it
+# doesn't apply to the node. <scale> is the value of Constant, the range of Uniform & the standard deviation of Normal
+INITIALIZERS = {
+    "Zeros": _weightwise(_zeros),
+    "Constant": _weightwise(_constant),
+    "Uniform": _weightwise(_uniform),
+    "Normal": _weightwise(_normal),
+    "Glorot": _weightwise(_glorot),
+    "He": _weightwise(_he),
+    "Least squares": _least_squares,
+}
@@ -0,0 +1,31 @@
+from __base__ import *  # ~~~ automatically generated by __autoinject__.py ~~~
+
+from typing import Tuple
+
+import numpy as np
+
+
+def solve_affine(x: np.ndarray, y: np.ndarray, chunk_rows: int = 65536) -> Tuple[np.ndarray, float]:
+    """
+    The coef & bias minimizing the squared error of `x @ coef + bias` against y, for x of shape (rows, features) and
+    y of shape (rows,).
+
+    Solved by a QR decomposition of the augmented matrix [x 1 y], taken <chunk_rows> rows at a time: each chunk is
+    stacked under the triangular factor so far and decomposed again, so only a (features + 2)² factor is kept
+    between chunks however tall the data is, and the squared condition number of the normal equations is avoided.
+    """
+    feats = x.shape[1]
+    r = np.zeros((0, feats + 2))
+    for start in range(0, x.shape[0], chunk_rows):
+        xc = x[start:start + chunk_rows]
+        aug = np.empty((xc.shape[0], feats + 2))
+        aug[:, :feats] = xc
+        aug[:, feats] = 1.0
+        aug[:, feats + 1] = y[start:start + chunk_rows]
+        r = np.linalg.qr(np.vstack((r, aug)), mode="r")
+
+    # [x 1] = Q R[:k, :k] & y = Q R[:k, k] + (residual orthogonal to it), so the rest is a small triangular system
+    # (lstsq rather than a triangular solve, so linearly dependent columns still get a minimum norm solution)
+    k = feats + 1
+    sol = np.linalg.lstsq(r[:k, :k], r[:k, k], rcond=None)[0]
+    return sol[:feats], float(sol[feats])
@@ -1,13 +1,90 @@
 from __base__ import *  # ~~~ automatically generated by __autoinject__.py ~~~
 
+from typing import Callable, Optional, Tuple
+
 import tensorflow as tf
 
+from errors import ModelTrainingError
+
+_EPSILON = 1e-7  # keeps the logarithms of the cross-entropies finite
+
+
+class LossFunction:
+    """
+    A loss together with what it expects: the prediction and the expected output are <dtype> tensors of the same
+    shape, with a rank among <ranks> (any rank if None); <shape> describes them for the user.
+
+    The losses are single vectorized reductions over the whole batch (no Python iteration over the tensors), so they
+    cost the same eagerly and when traced into a compiled training step.
+    """
+
+    def __init__(self, func: Callable[[tf.Tensor, tf.Tensor], tf.Tensor], shape: str,
+                 ranks: Optional[Tuple[int, ...]] = None, dtype: tf.DType = tf.float32):
+        self.func = func
+        self.shape = shape
+        self.ranks = ranks
+        self.dtype = dtype
+
+    def __call__(self, ypred: tf.Tensor, y: tf.Tensor) -> tf.Tensor:
+        ypred = tf.convert_to_tensor(ypred)
+        y = tf.cast(y, self.dtype)
+        self.check(ypred, y)
+        return self.func(ypred, y)
+
+    def check(self, ypred: tf.Tensor, y: tf.Tensor):
+        """
+        raises if the (static) shapes or dtype don't match the declaration
+        """
+        if ypred.dtype != self.dtype:
+            raise ModelTrainingError(msg=f"prediction is {ypred.dtype.name}, expected {self.dtype.name}",
+                                     code=ModelTrainingError.LOSS_INPUT_INVALID)
+        if self.ranks is not None and ypred.shape.rank not in self.ranks:
+            raise ModelTrainingError(msg=f"prediction of shape {ypred.shape}, expected {self.shape}",
+                                     code=ModelTrainingError.LOSS_INPUT_INVALID)
+        if not ypred.shape.is_compatible_with(y.shape):
+            raise ModelTrainingError(msg=f"prediction of shape {ypred.shape} & expected output of shape {y.shape}, "
+                                         f"expected {self.shape}",
+                                     code=ModelTrainingError.LOSS_INPUT_INVALID)
+
 
 def __mean_squared_error(ypred: tf.Tensor, y: tf.Tensor):
-    n = len(ypred)
-    return sum((ypred - y) ** 2) / n
+    return tf.math.reduce_mean(tf.math.squared_difference(ypred, y))
+
+
+def __mean_absolute_error(ypred: tf.Tensor, y: tf.Tensor):
+    return tf.math.reduce_mean(tf.math.abs(ypred - y))
+
+
+def __huber(ypred: tf.Tensor, y: tf.Tensor, delta: float = 1.0):
+    # quadratic within delta of the expected output, linear beyond
+    err = tf.math.abs(ypred - y)
+    quad = tf.math.minimum(err, delta)
+    return tf.math.reduce_mean(0.5 * quad * quad + delta * (err - quad))
+
+
+def __binary_cross_entropy(ypred: tf.Tensor, y: tf.Tensor):
+    p = tf.clip_by_value(ypred, _EPSILON, 1 - _EPSILON)
+    return -tf.math.reduce_mean(y * tf.math.log(p) + (1 - y) * tf.math.log(1 - p))
+
+
+def __categorical_cross_entropy(ypred: tf.Tensor, y: tf.Tensor):
+    p = tf.clip_by_value(ypred, _EPSILON, 1 - _EPSILON)
+    return -tf.math.reduce_mean(tf.math.reduce_sum(y * tf.math.log(p), axis=-1))
+
+
+def __softmax_cross_entropy(ypred: tf.Tensor, y: tf.Tensor):
+    # softmax & cross-entropy fused into one op: no probabilities in between, and stable for large logits
+    return tf.math.reduce_mean(tf.nn.softmax_cross_entropy_with_logits(labels=y, logits=ypred))
 
 
 LOSS_FUNCTIONS = {
-    "MSE": __mean_squared_error,
+    "MSE": LossFunction(__mean_squared_error, "any shape, same for both"),
+    "MAE": LossFunction(__mean_absolute_error, "any shape, same for both"),
+    "Huber": LossFunction(__huber, "any shape, same for both"),
+    "Binary Cross-Entropy": LossFunction(__binary_cross_entropy, "(rows,) or (rows, 1) probabilities & 0/1 labels",
+                                         ranks=(1, 2)),
+    "Categorical Cross-Entropy": LossFunction(__categorical_cross_entropy,
+                                              "(rows, classes) probabilities & one-hot labels", ranks=(2,)),
+    "Softmax Cross-Entropy": LossFunction(__softmax_cross_entropy, "(rows, classes) logits & one-hot labels",
+                                          ranks=(2,)),
 }
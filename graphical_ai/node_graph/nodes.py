@@ -22,6 +22,7 @@ class NodeExec:
         self.out = {}
         self.const = {}
         self.field_data = self._field_data()
+        self.weights = self.weights.fresh()  # this instance's own references to the class' declared weights
 
     def interface(self, scene: QGraphicsScene, pos: tuple) -> FasterNode:
         """
@@ -0,0 +1,128 @@
+from __base__ import *  # ~~~ automatically generated by __autoinject__.py ~~~
+
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+import tensorflow as tf
+
+
+class Optimizer:
+    """
+    Applies the gradients of a training step to the weights. An optimizer keeps its own state (its slots) for each
+    weight of the global weights vector, in the same order as the weights, plus the count of steps applied.
+
+    Slots are tf.Variables created once by build(), before any compiled training step gets traced, so a traced step
+    only ever updates them in place.
+    """
+    slot_names: Tuple[str, ...] = ()
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.iterations: Optional[tf.Variable] = None
+        self.slots: List[Dict[str, tf.Variable]] = []  # per weight: slot name to its state
+
+    def build(self, weights: List[tf.Variable]):
+        self.iterations = tf.Variable(0, dtype=tf.int64)
+        self.slots = [{nm: tf.Variable(tf.zeros_like(w)) for nm in self.slot_names} for w in weights]
+
+    def apply(self, grads: List[tf.Tensor], weights: List[tf.Variable]):
+        self.iterations.assign_add(1)
+        for (g, w, slots) in zip(grads, weights, self.slots):
+            self._update(g, w, slots)
+
+    def _update(self, g: tf.Tensor, w: tf.Variable, slots: Dict[str, tf.Variable]):
+        raise NotImplementedError
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """
+        the optimizer state as flat named arrays (see ModelFileHandler's *.opt.npz)
+        """
+        state = {"iterations": self.iterations.numpy()}
+        for (ind, slots) in enumerate(self.slots):
+            for (nm, var) in slots.items():
+                state[f"{ind}.{nm}"] = var.numpy()
+        return state
+
+    def restore(self, state: Dict[str, np.ndarray]) -> bool:
+        """
+        takes over a previously saved state if it fits the built slots (same weights count & shapes); returns whether
+        it did
+        """
+        if len(state) != 1 + sum(len(slots) for slots in self.slots) or "iterations" not in state:
+            return False
+        for (ind, slots) in enumerate(self.slots):
+            for (nm, var) in slots.items():
+                key = f"{ind}.{nm}"
+                if key not in state or np.shape(state[key]) != tuple(var.shape):
+                    return False
+
+        self.iterations.assign(int(state["iterations"]))
+        for (ind, slots) in enumerate(self.slots):
+            for (nm, var) in slots.items():
+                var.assign(state[f"{ind}.{nm}"])
+        return True
+
+
+class _GradientDescent(Optimizer):
+    def _update(self, g, w, slots):
+        w.assign_sub(self.rate * g)
+
+
+class _Momentum(Optimizer):
+    slot_names = ("velocity",)
+
+    def __init__(self, rate: float, momentum: float = 0.9):
+        super().__init__(rate)
+        self.momentum = momentum
+
+    def _update(self, g, w, slots):
+        v = slots["velocity"].assign(self.momentum * slots["velocity"] + g)
+        w.assign_sub(self.rate * v)
+
+
+class _Nesterov(_Momentum):
+    def _update(self, g, w, slots):
+        # the step is taken from where the momentum is about to carry the weight
+        v = slots["velocity"].assign(self.momentum * slots["velocity"] + g)
+        w.assign_sub(self.rate * (g + self.momentum * v))
+
+
+class _Adam(Optimizer):
+    slot_names = ("m", "v")
+
+    def __init__(self, rate: float, beta_1: float = 0.9, beta_2: float = 0.999, epsilon: float = 1e-7):
+        super().__init__(rate)
+        self.beta_1 = beta_1
+        self.beta_2 = beta_2
+        self.epsilon = epsilon
+
+    def _update(self, g, w, slots):
+        t = tf.cast(self.iterations, w.dtype)
+        m = slots["m"].assign(self.beta_1 * slots["m"] + (1 - self.beta_1) * g)
+        v = slots["v"].assign(self.beta_2 * slots["v"] + (1 - self.beta_2) * g * g)
+        m_hat = m / (1 - self.beta_1 ** t)
+        v_hat = v / (1 - self.beta_2 ** t)
+        w.assign_sub(self.rate * m_hat / (tf.sqrt(v_hat) + self.epsilon))
+
+
+class _RMSProp(Optimizer):
+    slot_names = ("rms",)
+
+    def __init__(self, rate: float, rho: float = 0.9, epsilon: float = 1e-7):
+        super().__init__(rate)
+        self.rho = rho
+        self.epsilon = epsilon
+
+    def _update(self, g, w, slots):
+        s = slots["rms"].assign(self.rho * slots["rms"] + (1 - self.rho) * g * g)
+        w.assign_sub(self.rate * g / (tf.sqrt(s) + self.epsilon))
+
+
+# optimizer name to its class, constructed with the learning rate (the other hyperparameters keep their defaults)
+OPTIMIZERS = {
+    "SGD": _GradientDescent,
+    "Momentum": _Momentum,
+    "Nesterov": _Nesterov,
+    "Adam": _Adam,
+    "RMSProp": _RMSProp,
+}
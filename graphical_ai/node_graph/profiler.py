@@ -0,0 +1,148 @@
+from __base__ import *  # ~~~ automatically generated by __autoinject__.py ~~~
+
+from typing import Dict, List, Optional
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class NodeProfiler:
+    """
+    Records every node execution of the executors it's attached to (see ModelPredictor.profiler &
+    ModelTrainer.profiler): wall & CPU time, the shapes and bytes of the node's inputs and outputs, and the calls
+    across cycles. Executors without a profiler only ever check it's None, so profiling costs nothing when off.
+
+    Nodes traced into a graph function only execute while being traced, so the traced function calls are recorded as
+    a whole instead (as spans, see span()).
+
+    The records export as JSON (to_json()) and as Chrome trace events (chrome_trace()), viewable in chrome://tracing
+    or Perfetto.
+    """
+
+    def __init__(self, max_events: int = 100_000):
+        self.nodes: Dict[str, dict] = {}  # "<node id:node tag>" or span name to its totals
+        self.events: List[tuple] = []  # (name, start, wall, cpu, thread, inp, out) per execution, up to max_events
+        self.max_events = max_events  # (the totals keep counting past it)
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()  # nodes of parallel branches record at the same time
+
+    @contextmanager
+    def measure(self, step):
+        """
+        records the execution of the step's node running inside
+        """
+        (wall, cpu) = self.clock()
+        try:
+            yield
+        finally:
+            self.record_step(step, wall, cpu)
+
+    @contextmanager
+    def span(self, name: str):
+        """
+        records whatever runs inside as an entry of its own, e.g. a call of a traced graph function
+        """
+        (wall, cpu) = self.clock()
+        try:
+            yield
+        finally:
+            self.record(name, wall, cpu)
+
+    def wrap(self, func, name: str):
+        """
+        func recording every call of it as a span
+        """
+        def profiled(*args):
+            with self.span(name):
+                return func(*args)
+        return profiled
+
+    @staticmethod
+    def clock() -> (float, float):
+        """
+        the wall & (this thread's) CPU time to record an execution from
+        """
+        return time.perf_counter(), time.thread_time()
+
+    def record_step(self, step, wall: float, cpu: float):
+        self.record(f"<{step.nid}:{step.node.ndtg}>", wall, cpu, node=step.node, nid=step.nid)
+
+    def record(self, name: str, wall: float, cpu: float, *, node=None, nid: Optional[int] = None):
+        (wall_dur, cpu_dur) = (time.perf_counter() - wall, time.thread_time() - cpu)
+        (inp, out) = ((describe_fields(node.inp), describe_fields(node.out)) if node is not None else (None, None))
+
+        with self._lock:
+            totals = self.nodes.get(name)
+            if totals is None:
+                totals = self.nodes[name] = {"nid": nid, "ndtg": None if node is None else node.ndtg, "calls": 0,
+                                             "wall": 0.0, "cpu": 0.0, "inp": {}, "out": {}}
+            totals["calls"] += 1
+            totals["wall"] += wall_dur
+            totals["cpu"] += cpu_dur
+            if node is not None:
+                totals["inp"] = inp  # the shapes of the last call
+                totals["out"] = out
+            if len(self.events) < self.max_events:
+                # (kept as is and only turned into trace events on export, the recording being on the hot path)
+                self.events.append((name, wall, wall_dur, cpu_dur, threading.get_ident(), inp, out))
+
+    def summary(self) -> List[dict]:
+        """
+        the totals of every node (and span), the most time-consuming first
+        """
+        with self._lock:
+            rows = [{"name": name, **totals, "wall_mean": totals["wall"] / totals["calls"]}
+                    for (name, totals) in self.nodes.items()]
+        return sorted(rows, key=lambda row: row["wall"], reverse=True)
+
+    def to_json(self) -> str:
+        return json.dumps({"nodes": self.summary()}, indent=2)
+
+    def chrome_trace(self) -> str:
+        """
+        every execution recorded as a complete ("X") event of the Chrome trace event format
+        """
+        with self._lock:
+            events = list(self.events)
+        pid = os.getpid()
+        trace = [{"name": name, "cat": "span" if inp is None else "node", "ph": "X", "ts": (wall - self.start) * 1e6,
+                  "dur": wall_dur * 1e6, "pid": pid, "tid": tid,
+                  "args": {"cpu_ms": cpu_dur * 1e3, "inp": inp or {}, "out": out or {}}}
+                 for (name, wall, wall_dur, cpu_dur, tid, inp, out) in events]
+        return json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"})
+
+    def save_json(self, path: str):
+        with open(path, "w") as fbo:
+            fbo.write(self.to_json())
+
+    def save_chrome_trace(self, path: str):
+        with open(path, "w") as fbo:
+            fbo.write(self.chrome_trace())
+
+    def clear(self):
+        with self._lock:
+            self.nodes.clear()
+            self.events.clear()
+            self.start = time.perf_counter()
+
+
+def describe_fields(fields: dict) -> Dict[str, dict]:
+    """
+    field name to the shape, dtype & bytes of its data (or only its type for anything not array-like)
+    """
+    desc = {}
+    for (fld_nm, val) in list(fields.items()):
+        if hasattr(val, "shape") and hasattr(val, "dtype"):
+            dtype = np.dtype(getattr(val.dtype, "as_numpy_dtype", val.dtype))
+            shape = tuple(val.shape)
+            size = math.prod(shape) if None not in shape else 0
+            desc[fld_nm] = {"shape": list(shape), "dtype": dtype.name, "bytes": size * dtype.itemsize}
+        else:
+            desc[fld_nm] = {"type": type(val).__name__}
+    return desc
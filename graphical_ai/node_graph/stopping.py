@@ -0,0 +1,58 @@
+from __base__ import *  # ~~~ automatically generated by __autoinject__.py ~~~
+
+from typing import Optional
+
+import math
+import time
+
+
+class StoppingCriteria:
+    """
+    The criteria ending a training run before its iterations are up, checked after every iteration (every epoch for
+    mini-batch training). Each one is off while None; a run whose loss is no longer finite always stops.
+
+    - patience: iterations in a row without the validation loss (the training loss without a held-out split)
+      improving on its best so far
+    - tolerance: the relative change of the training loss from the previous iteration falling to or under it
+    - grad_tolerance: the global norm of the gradients falling to or under it
+    - time_budget: seconds since the criteria were created
+    """
+
+    def __init__(self, *, patience: Optional[int] = None, tolerance: Optional[float] = None,
+                 grad_tolerance: Optional[float] = None, time_budget: Optional[float] = None):
+        self.patience = patience
+        self.tolerance = tolerance
+        self.grad_tolerance = grad_tolerance
+        self.time_budget = time_budget
+
+        self.start = time.perf_counter()
+        self.best = math.inf
+        self.waited = 0
+        self.prev: Optional[float] = None
+
+    def check(self, loss: float, grad_norm: float, val_loss: Optional[float] = None) -> Optional[str]:
+        """
+        the name of the criterion met by this iteration, if any
+        """
+        if not math.isfinite(loss):
+            return "diverged"
+        if self.grad_tolerance is not None and grad_norm <= self.grad_tolerance:
+            return "gradient norm"
+
+        prev, self.prev = self.prev, loss
+        if self.tolerance is not None and prev is not None and abs(prev - loss) <= self.tolerance * abs(prev):
+            return "loss tolerance"
+
+        if self.patience is not None:
+            monitored = loss if val_loss is None else val_loss
+            if monitored < self.best:
+                self.best = monitored
+                self.waited = 0
+            else:
+                self.waited += 1
+                if self.waited >= self.patience:
+                    return "patience"
+
+        if self.time_budget is not None and time.perf_counter() - self.start >= self.time_budget:
+            return "time budget"
+        return None
@@ -1,20 +1,40 @@
 from __base__ import *  # ~~~ automatically generated by __autoinject__.py ~~~
 
-from typing import List, Optional, Tuple
+from typing import Iterable, List, Optional, Sequence, Tuple
 
+import numpy as np
 import tensorflow as tf
 
 from errors import ModelTrainingError
 
 
 class WeightRef:
-    index: Optional[int] = None
+    """
+    A node's reference to one of its weights in a global weights vector. Belongs to a single node instance (see
+    NodeWeights.fresh()), and once bound (activated) it can't be pointed anywhere else until it is reset.
+    """
     name: str
-    shape: Optional[Tuple[int, ...]] = None
-    __ref_global_weights_vec: Optional[List[tf.Variable]] = None
 
     def __init__(self, name: str):
         self.name = name
+        self.shape: Optional[Tuple[int, ...]] = None
+        self.__index: Optional[int] = None
+        self.__ref_global_weights_vec: Optional[List[tf.Variable]] = None
+
+    @property
+    def index(self) -> Optional[int]:
+        return self.__index
+
+    @property
+    def bound(self) -> bool:
+        return self.__ref_global_weights_vec is not None
+
+    def __bind(self, global_weights_vec: List[tf.Variable], index: int):
+        if self.bound:
+            raise ModelTrainingError(msg=f"weight <{self.name}> is already bound",
+                                     code=ModelTrainingError.WEIGHT_REF_ALREADY_BOUND)
+        self.__index = index
+        self.__ref_global_weights_vec = global_weights_vec
 
     def format_value(self, shape: Optional[Tuple[int, ...]]):
         if self.shape is None:  # TODO: None is a valid Tensorflow shape type: represents scalar values (fix this)
@@ -27,25 +47,26 @@ class WeightRef:
         Makes the weight usable when training after adding the weight references to the global weight vector
         of the ModelTrainer class.
         """
+        if self.bound:
+            raise ModelTrainingError(msg=f"weight <{self.name}> is already bound",
+                                     code=ModelTrainingError.WEIGHT_REF_ALREADY_BOUND)
         global_weights_vec.append(tf.Variable(tf.constant(0.0, shape=self.shape)))
-        self.index = len(global_weights_vec)-1
-        self.__ref_global_weights_vec = global_weights_vec
+        self.__bind(global_weights_vec, len(global_weights_vec)-1)
 
     def activate_set(self, global_weights_vec: Optional[List[tf.Variable]], index: int):
         """
         Connects the weight in the node to the global weights vector to be used (i.e. opposite of activate())
         """
-        self.index = index
-        self.__ref_global_weights_vec = global_weights_vec
+        self.__bind(global_weights_vec, index)
 
     @property
     def value(self):
         if self.__ref_global_weights_vec is None:
             raise ModelTrainingError(msg="", code=ModelTrainingError.WEIGHT_REF_NOT_ACTIVATED)
-        return self.__ref_global_weights_vec[self.index]
+        return self.__ref_global_weights_vec[self.__index]
 
     def reset(self):
-        self.index = None
+        self.__index = None
         self.shape = None
         self.__ref_global_weights_vec = None
 
@@ -80,6 +101,118 @@ class NodeWeights:
     def __len__(self):
         return len(self.collection)
 
+    def fresh(self) -> "NodeWeights":
+        """
+        new unbound references to the same weights (node classes declare their weights once as a class attribute;
+        each node instance works with its own fresh copy, so instances never rebind each other's weights)
+        """
+        return NodeWeights(*(WeightRef(w.name) for w in self.collection))
+
     def reset(self):
         for w in self.collection:
             w.reset()
+
+
+class WeightView:
+    """
+    One weight stored in the buffer of a FlatWeights, at its offset and with its shape. Reads as a tensor wherever one
+    is expected (TensorFlow ops, a tensor's operators) and assigns through to its slice of the buffer, so nodes use it
+    like the tf.Variable it stands in for.
+    """
+    __array_priority__ = 100  # numpy defers to the view's operators (as it does to a tf.Variable's)
+
+    def __init__(self, buffer: tf.Variable, offset: int, shape: Tuple[int, ...]):
+        self.buffer = buffer
+        self.offset = offset
+        self.size = int(np.prod(shape, dtype=np.int64))
+        self.shape = tf.TensorShape(shape)
+        self.dtype = buffer.dtype
+
+    def read_value(self) -> tf.Tensor:
+        return tf.reshape(self.buffer[self.offset:self.offset+self.size], self.shape)
+
+    def assign(self, value):
+        self.buffer[self.offset:self.offset+self.size].assign(tf.reshape(tf.cast(value, self.dtype), [-1]))
+        return self
+
+    def numpy(self) -> np.ndarray:
+        return self.read_value().numpy()
+
+    def __tf_tensor__(self, dtype=None, name=None) -> tf.Tensor:
+        return tf.convert_to_tensor(self.read_value(), dtype=dtype, name=name)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        return np.asarray(self.numpy(), dtype=dtype)
+
+    def __repr__(self):
+        return f"<WeightView offset={self.offset} shape={tuple(self.shape)} numpy={self.numpy()}>"
+
+
+# a view on the left of an operator reads its value first, like a tf.Variable does
+for _op in ("__add__", "__radd__", "__sub__", "__rsub__", "__mul__", "__rmul__", "__truediv__", "__rtruediv__",
+            "__matmul__", "__rmatmul__", "__pow__", "__neg__", "__getitem__"):
+    setattr(WeightView, _op, (lambda op: lambda self, *args: getattr(self.read_value(), op)(*args))(_op))
+
+
+class FlatWeights(list):
+    """
+    A global weights vector keeping all the weights in one contiguous float32 buffer. The weights get appended as
+    separate variables while they're activated (see WeightRef.activate()), then pack() moves them into the buffer,
+    each entry becoming a WeightView of its slice--the WeightRefs stay bound to the same entries.
+
+    Once packed, the gradients are taken and applied on the buffer alone (see trainable_variables()), and copying,
+    averaging or saving all the weights is a single operation on it (flat(), assign_flat(), arrays()).
+    """
+
+    def __init__(self, weights: Iterable = ()):
+        super().__init__(weights)
+        self.buffer: Optional[tf.Variable] = None
+
+    @classmethod
+    def from_arrays(cls, arrays: Sequence[np.ndarray]) -> "FlatWeights":
+        weights = cls(arrays)
+        weights.pack()
+        return weights
+
+    @property
+    def packed(self) -> bool:
+        return self.buffer is not None
+
+    def pack(self):
+        shapes = [tuple(w.shape) for w in self]
+        self.buffer = tf.Variable(tf.concat([tf.zeros([0])] + [tf.reshape(tf.cast(w, tf.float32), [-1]) for w in self],
+                                            axis=0))
+        offset = 0
+        for (ind, shape) in enumerate(shapes):
+            self[ind] = WeightView(self.buffer, offset, shape)
+            offset += self[ind].size
+
+    def flat(self) -> tf.Tensor:
+        return self.buffer.read_value()
+
+    def assign_flat(self, flat):
+        self.buffer.assign(tf.cast(flat, tf.float32))
+
+    def assign_all(self, weights: Sequence):
+        """
+        copies the given weights (matching these ones in count & shapes) into the buffer at once
+        """
+        self.assign_flat(tf.concat([tf.zeros([0])] + [tf.reshape(tf.cast(w, tf.float32), [-1]) for w in weights],
+                                   axis=0))
+
+    def arrays(self) -> List[np.ndarray]:
+        """
+        the weights as arrays, from a single read of the buffer
+        """
+        flat = self.buffer.numpy()
+        return [flat[w.offset:w.offset+w.size].reshape(tuple(w.shape)) for w in self]
+
+
+def trainable_variables(weights: List) -> List[tf.Variable]:
+    """
+    the variables the gradients of a global weights vector are taken & applied on: the buffer of packed FlatWeights,
+    or the weights themselves
+    """
+    if isinstance(weights, FlatWeights) and weights.packed:
+        return [weights.buffer] if len(weights) != 0 else []
+    return weights
@@ -112,7 +112,7 @@ class ProjectTabs(QWidget):
         try:
             page_no = {"Modeling": 0, "Training": 1, "Deployment": 2}[text]
         except KeyError:
-            dprint(f"error: <{text}> page not implemented")
+            dlog(LOG_ERROR, f"<{text}> page not implemented")
             page_no = 0
 
         self.sg_prj_page_selc.emit(page_no)
@@ -11,7 +11,8 @@ from file_handler import ProjectFileHandler
 from model_view.node import FasterNode
 from node_state import NodeState
 from project.model_component import Model
-from project.sidemenu_components import ModelIOConfigurator, IOField
+from project.sidemenu_components import ModelIOConfigurator, IOField, ProfilerView
+from node_graph.profiler import NodeProfiler, describe_fields
 
 
 class DeploymentSideMenu(QWidget):
@@ -54,12 +55,28 @@ class DeploymentSideMenu(QWidget):
 
         self.wx_io_config = io_config if not None else ModelIOConfigurator()
 
+        # keeps every intermediate the nodes saw during the prediction (released as soon as consumed otherwise)
+        self.qchk_retain = QCheckBox("Retain intermediates (debugging)")
+        self.qpte_intermediates = QPlainTextEdit()
+        self.qpte_intermediates.setReadOnly(True)
+        self.qpte_intermediates.setVisible(False)
+        self.qchk_retain.toggled.connect(self.qpte_intermediates.setVisible)
+
+        self.qchk_profile = QCheckBox("Profile nodes")
+        self.wx_profile = ProfilerView()
+        self.wx_profile.setVisible(False)
+        self.qchk_profile.toggled.connect(self.wx_profile.setVisible)
+
         lyt_left_menu = QVBoxLayout()
         lyt_left_menu.addWidget(self.wl_mdl_name, 1)
         lyt_left_menu.addWidget(qpb_predict, 1)
         lyt_left_menu.addWidget(qpb_deploy, 1)
         lyt_left_menu.addLayout(lyt_url, 1)
         lyt_left_menu.addLayout(lyt_id, 1)
+        lyt_left_menu.addWidget(self.qchk_retain, 1)
+        lyt_left_menu.addWidget(self.qpte_intermediates, 4)
+        lyt_left_menu.addWidget(self.qchk_profile, 1)
+        lyt_left_menu.addWidget(self.wx_profile, 4)
         lyt_left_menu.addWidget(QLabel("Model I/O configurator"), 1)
         lyt_left_menu.addWidget(self.wx_io_config, 14)
         # lyt_left_menu.addWidget(QLabel("Console I/O"), 1)
@@ -67,6 +84,21 @@ class DeploymentSideMenu(QWidget):
 
         self.setLayout(lyt_left_menu)
 
+    def show_intermediates(self, intermediates: Optional[dict]):
+        lines = []
+        for (nid, nd) in (intermediates or {}).items():
+            lines.append(f"<{nid}:{nd['ndtg']}>")
+            for kind in ("inp", "out"):
+                for (fld_nm, desc) in describe_fields(nd[kind]).items():
+                    lines.append(f"    {kind} {fld_nm}: {_format_description(desc)}")
+        self.qpte_intermediates.setPlainText("\n".join(lines))
+
+
+def _format_description(desc: dict) -> str:
+    if "shape" in desc:
+        return f"{tuple(desc['shape'])} {desc['dtype']} ({desc['bytes']} bytes)"
+    return desc["type"]
+
 
 class DeploymentPage(QWidget):
     def __init__(self, fhndl: ProjectFileHandler, models: List[Model], io_configs_train: List[ModelIOConfigurator], io_configs_pred: List[ModelIOConfigurator], parent=None):
@@ -134,10 +166,19 @@ class DeploymentPage(QWidget):
         dprint(nodes_inp, nodes_out)
         #  TODO: temporary validation to check the model met a specific req for basic ai/ml
         if nodes_inp == nodes_out == 1:
+            sidemenu = self.deployment_sidemenus[self.wtw_static_tabs.currentIndex()]
+            mdl_id = self.fhndl.get_mdl_id(self.models[self.wtw_static_tabs.currentIndex()].name)
+            profiler = NodeProfiler() if sidemenu.qchk_profile.isChecked() else None
             self.fhndl.predict_model(
-                self.fhndl.get_mdl_id(self.models[self.wtw_static_tabs.currentIndex()].name),
+                mdl_id,
                 inst_state=inst,
+                retain_intermediates=sidemenu.qchk_retain.isChecked(),
+                profiler=profiler,
             )
+            if sidemenu.qchk_retain.isChecked():
+                sidemenu.show_intermediates(self.fhndl.get_mdl_intermediates(mdl_id))
+            if profiler is not None:
+                sidemenu.wx_profile.show_profile(profiler)
         else:
             dprint("PREDICTING REQUIREMENTS NOT FILLED")
 
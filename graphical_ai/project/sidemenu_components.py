@@ -313,3 +313,60 @@ class ConsoleIO(QTextEdit):
 
         self.append("LOOOOOOOOOOOOOOOOOOOOOOOOOOOOOOOONGGGGGGGGGGGGGGGGGGGGGGGGGGGG TEXXXXXXXXXXXXXXXXXXXXT")
 
+
+class ProfilerView(QWidget):
+    """
+    The per-node totals of a NodeProfiler (the most time-consuming first), exportable as JSON or as a Chrome trace
+    """
+    COLUMNS = ("Node", "Calls", "Wall (ms)", "CPU (ms)", "Mean (ms)", "Output")
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+
+        self.profiler = None
+
+        self.qtw_nodes = QTableWidget(0, len(self.COLUMNS))
+        self.qtw_nodes.setHorizontalHeaderLabels(self.COLUMNS)
+        self.qtw_nodes.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.qtw_nodes.verticalHeader().setVisible(False)
+        self.qtw_nodes.horizontalHeader().setStretchLastSection(True)
+
+        self.qpb_json = QPushButton("Export JSON")
+        self.qpb_json.released.connect(lambda: self.sl_export("JSON (*.json)", "save_json"))
+        self.qpb_trace = QPushButton("Export Chrome trace")
+        self.qpb_trace.released.connect(lambda: self.sl_export("Chrome trace (*.json)", "save_chrome_trace"))
+
+        lyt_export = QHBoxLayout()
+        lyt_export.addWidget(self.qpb_json)
+        lyt_export.addWidget(self.qpb_trace)
+
+        lyt_main = QVBoxLayout()
+        lyt_main.setContentsMargins(0, 0, 0, 0)
+        lyt_main.addWidget(self.qtw_nodes)
+        lyt_main.addLayout(lyt_export)
+
+        self.setLayout(lyt_main)
+        self.show_profile(None)
+
+    def show_profile(self, profiler):
+        self.profiler = profiler
+        rows = [] if profiler is None else profiler.summary()
+
+        self.qtw_nodes.setRowCount(len(rows))
+        for (ind, row) in enumerate(rows):
+            out = ", ".join(f"{fld_nm} {tuple(desc['shape'])}" if "shape" in desc else f"{fld_nm} {desc['type']}"
+                            for (fld_nm, desc) in row["out"].items())
+            cells = (row["name"], str(row["calls"]), f"{row['wall'] * 1e3:.3f}", f"{row['cpu'] * 1e3:.3f}",
+                     f"{row['wall_mean'] * 1e3:.3f}", out)
+            for (col, text) in enumerate(cells):
+                self.qtw_nodes.setItem(ind, col, QTableWidgetItem(text))
+        self.qtw_nodes.resizeColumnsToContents()
+
+        self.qpb_json.setEnabled(len(rows) != 0)
+        self.qpb_trace.setEnabled(len(rows) != 0)
+
+    @Slot()
+    def sl_export(self, file_filter: str, save: str):
+        (fpath, _filter) = QFileDialog.getSaveFileName(caption="Export Profile", filter=file_filter)
+        if fpath != "":
+            getattr(self.profiler, save)(fpath)
@@ -3,7 +3,7 @@ from __base__ import *  # ~~~ automatically generated by __autoinject__.py ~~~
 from typing import List
 
 from PySide6.QtWidgets import *
-from PySide6.QtCore import Slot, Signal
+from PySide6.QtCore import Qt, Slot, Signal
 from PySide6.QtGui import QFont, QIntValidator, QDoubleValidator
 
 from file_handler import ProjectFileHandler
@@ -11,8 +11,12 @@ from model_view.components import AttributeSelector
 from model_view.node import FasterNode
 
 from project.model_component import Model
-from project.sidemenu_components import ModelIOConfigurator, IOField
+from project.sidemenu_components import ModelIOConfigurator, IOField, ProfilerView
 from node_graph.loss_funcs import LOSS_FUNCTIONS
+from node_graph.execution import TRAINING_ALGORITHMS
+from node_graph.optimizers import OPTIMIZERS
+from node_graph.initializers import INITIALIZERS
+from node_graph.profiler import NodeProfiler
 from node_state import NodeState
 
 
@@ -35,32 +39,108 @@ class TrainingSideMenu(QWidget):
 
         self.wx_io_config = io_config if not None else ModelIOConfigurator()
 
-        qcb_types = QComboBox()  # TODO: placeholder for now, but signifies the multiple training algo waiting to
-        #                           be implemented
-        qcb_types.addItem("Gradient Descent")
+        self.qcb_algo = QComboBox()
+        for algorithm in TRAINING_ALGORITHMS:
+            self.qcb_algo.addItem(algorithm)
 
         self.qle_iters = QLineEdit()
         self.qle_iters.setValidator(QIntValidator())
         self.qle_iters.setText("100")
 
         self.qcb_loss = QComboBox()
-        for loss_func in LOSS_FUNCTIONS:
+        for (ind, loss_func) in enumerate(LOSS_FUNCTIONS):
             self.qcb_loss.addItem(loss_func)
+            self.qcb_loss.setItemData(ind, LOSS_FUNCTIONS[loss_func].shape, Qt.ToolTipRole)
+
+        self.qcb_optimizer = QComboBox()
+        for optimizer in OPTIMIZERS:
+            self.qcb_optimizer.addItem(optimizer)
 
         self.qle_rate = QLineEdit()
         self.qle_rate.setValidator(QDoubleValidator(0.0000000001, 10.0, 10))
         self.qle_rate.setText("0.01")
 
-        lyt_form = QFormLayout()
-        lyt_form.addRow("Training Algorithm:", qcb_types)
+        # mini-batch only
+        self.qle_batch = QLineEdit()
+        self.qle_batch.setValidator(QIntValidator(1, 2**31 - 1))
+        self.qle_batch.setText("32")
+        self.qle_steps = QLineEdit()
+        self.qle_steps.setValidator(QIntValidator(1, 2**31 - 1))
+        self.qle_steps.setPlaceholderText("whole data")
+        self.qchk_shuffle = QCheckBox("Shuffle every epoch")
+        self.qchk_shuffle.setChecked(True)
+
+        # stopping criteria (each off while left empty)
+        self.qle_val_split = QLineEdit()
+        self.qle_val_split.setValidator(QDoubleValidator(0.0, 0.99, 4))
+        self.qle_val_split.setPlaceholderText("none")
+        self.qle_patience = QLineEdit()
+        self.qle_patience.setValidator(QIntValidator(1, 2**31 - 1))
+        self.qle_patience.setPlaceholderText("off")
+        self.qle_tolerance = QLineEdit()
+        self.qle_tolerance.setValidator(QDoubleValidator(0.0, 1.0, 10))
+        self.qle_tolerance.setPlaceholderText("off")
+        self.qle_grad_tol = QLineEdit()
+        self.qle_grad_tol.setValidator(QDoubleValidator(0.0, 1e10, 10))
+        self.qle_grad_tol.setPlaceholderText("off")
+        self.qle_budget = QLineEdit()
+        self.qle_budget.setValidator(QDoubleValidator(0.0, 1e10, 3))
+        self.qle_budget.setPlaceholderText("off")
+
+        self.wl_report = QLabel("")  # how the last training run ended
+        self.wl_report.setWordWrap(True)
+
+        self.qcb_init = QComboBox()
+        for initializer in INITIALIZERS:
+            self.qcb_init.addItem(initializer)
+        self.qle_seed = QLineEdit()  # for the initializer, shuffling & the validation split
+        self.qle_seed.setValidator(QIntValidator(0, 2**31 - 1))
+        self.qle_seed.setPlaceholderText("random")
+
+        self.qchk_warm = QCheckBox("Warm start from the trained weights")
+
+        self.qchk_compiled = QCheckBox("Compile training step")
+        self.qchk_jit = QCheckBox("XLA (jit compile)")
+        self.qchk_jit.setEnabled(False)  # only applies to a compiled training step
+        self.qchk_compiled.toggled.connect(self.qchk_jit.setEnabled)
+        self.qchk_flat = QCheckBox("Flat weight buffer")
+
+        self.qchk_profile = QCheckBox("Profile nodes")
+        self.wx_profile = ProfilerView()
+        self.wx_profile.setVisible(False)
+        self.qchk_profile.toggled.connect(self.wx_profile.setVisible)
+
+        self.lyt_form = lyt_form = QFormLayout()
+        lyt_form.addRow("Training Algorithm:", self.qcb_algo)
         lyt_form.addRow("Iterations:", self.qle_iters)
+        lyt_form.addRow("Batch Size:", self.qle_batch)
+        lyt_form.addRow("Steps per Epoch:", self.qle_steps)
+        lyt_form.addRow("", self.qchk_shuffle)
         lyt_form.addRow("Loss Function:", self.qcb_loss)
+        lyt_form.addRow("Optimizer:", self.qcb_optimizer)
         lyt_form.addRow("Learning Rate:", self.qle_rate)
+        lyt_form.addRow("Weight Initializer:", self.qcb_init)
+        lyt_form.addRow("Seed:", self.qle_seed)
+        lyt_form.addRow("", self.qchk_warm)
+        lyt_form.addRow("Validation Split:", self.qle_val_split)
+        lyt_form.addRow("Patience:", self.qle_patience)
+        lyt_form.addRow("Loss Tolerance:", self.qle_tolerance)
+        lyt_form.addRow("Gradient Tolerance:", self.qle_grad_tol)
+        lyt_form.addRow("Time Budget (s):", self.qle_budget)
+        lyt_form.addRow("Execution:", self.qchk_compiled)
+        lyt_form.addRow("", self.qchk_jit)
+        lyt_form.addRow("", self.qchk_flat)
+        lyt_form.addRow("", self.qchk_profile)
+        lyt_form.addRow("Last Run:", self.wl_report)
+
+        self.qcb_algo.currentTextChanged.connect(self.sl_algo_changed)
+        self.sl_algo_changed(self.qcb_algo.currentText())
 
         lyt_left_menu = QVBoxLayout()
         lyt_left_menu.addWidget(self.wl_mdl_name, 1)
         lyt_left_menu.addWidget(qpb_train, 1)
         lyt_left_menu.addLayout(lyt_form, 4)
+        lyt_left_menu.addWidget(self.wx_profile, 4)
         lyt_left_menu.addWidget(QLabel("Model I/O configurator"), 1)
         lyt_left_menu.addWidget(self.wx_io_config, 11)
         # lyt_left_menu.addWidget(QLabel("Console I/O"), 1)
@@ -68,6 +148,48 @@ class TrainingSideMenu(QWidget):
 
         self.setLayout(lyt_left_menu)
 
+    @Slot(str)
+    def sl_algo_changed(self, algorithm: str):
+        minibatch = algorithm == "Mini-batch SGD"
+        self.lyt_form.labelForField(self.qle_iters).setText("Epochs:" if minibatch else "Iterations:")
+        for wx in (self.qle_batch, self.qle_steps, self.qchk_shuffle):
+            wx.setEnabled(minibatch)
+
+    def training_options(self) -> dict:
+        """
+        the selected options passed on to the model trainer besides the iterations, loss function & learning rate
+        """
+        return {
+            "algorithm": self.qcb_algo.currentText(),
+            "batch_size": int(self.qle_batch.text() or 32),
+            "steps_per_epoch": int(self.qle_steps.text()) if self.qle_steps.text() else None,
+            "shuffle": self.qchk_shuffle.isChecked(),
+            "optimizer": self.qcb_optimizer.currentText(),
+            "initializer": self.qcb_init.currentText(),
+            "seed": int(self.qle_seed.text()) if self.qle_seed.text() else None,
+            "warm_start": self.qchk_warm.isChecked(),
+            "validation_split": float(self.qle_val_split.text() or 0),
+            "patience": int(self.qle_patience.text()) if self.qle_patience.text() else None,
+            "tolerance": float(self.qle_tolerance.text()) if self.qle_tolerance.text() else None,
+            "grad_tolerance": float(self.qle_grad_tol.text()) if self.qle_grad_tol.text() else None,
+            "time_budget": float(self.qle_budget.text()) if self.qle_budget.text() else None,
+            "compiled": self.qchk_compiled.isChecked(),
+            "jit_compile": self.qchk_jit.isChecked(),
+            "flat_weights": self.qchk_flat.isChecked(),
+            "profiler": NodeProfiler() if self.qchk_profile.isChecked() else None,
+        }
+
+    def show_report(self, report: dict):
+        text = f"stopped by {report['stopped by']} after {report['iterations']} iterations in " \
+               f"{report['seconds']:.2f}s"
+        if report["loss"] is not None:
+            text += f", loss {report['loss']:.6g}"
+        if report["validation loss"] is not None:
+            text += f" (validation {report['validation loss']:.6g})"
+        if report["warm started"]:
+            text += ", warm started"
+        self.wl_report.setText(text)
+
 
 class TrainingPage(QWidget):
     """
@@ -159,12 +281,17 @@ class TrainingPage(QWidget):
         dprint(nodes_inp, nodes_out)
         #  TODO: temporary validation to check the model met a specific req for basic ai/ml
         if nodes_inp == nodes_out == 1:
-            self.fhndl.train_model(
+            options = self.training_sidemenus[self.wtw_static_tabs.currentIndex()].training_options()
+            report = self.fhndl.train_model(
                 self.fhndl.get_mdl_id(self.models[self.wtw_static_tabs.currentIndex()].name),
                 iters=int(self.training_sidemenus[self.wtw_static_tabs.currentIndex()].qle_iters.text()),
                 loss_name=self.training_sidemenus[self.wtw_static_tabs.currentIndex()].qcb_loss.currentText(),
                 rate=float(self.training_sidemenus[self.wtw_static_tabs.currentIndex()].qle_rate.text()),
-                inst_state=inst)
+                inst_state=inst,
+                **options)
+            self.training_sidemenus[self.wtw_static_tabs.currentIndex()].show_report(report)
+            if options["profiler"] is not None:
+                self.training_sidemenus[self.wtw_static_tabs.currentIndex()].wx_profile.show_profile(options["profiler"])
         else:
             dprint("TRAINING REQUIREMENTS NOT FILLED")
 
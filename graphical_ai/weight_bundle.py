@@ -0,0 +1,159 @@
+from __base__ import *  # ~~~ automatically generated by __autoinject__.py ~~~
+
+from typing import List
+
+import glob
+import hashlib
+import json
+import math
+import os
+import tempfile
+
+import numpy as np
+import tensorflow as tf
+
+from errors import ProjectFileAppError
+
+# a model's weights as one aligned, uncompressed *.npy bundle & a manifest of its arrays, in place of the *.w.npz file
+#
+#   <name>.w.json, the manifest: {"format": 1, "bundle": <the bundle's file name>, "arrays": [{"dtype", "shape",
+#       "offset"}, ...]}, the arrays in the weights' order, offset in bytes from the start of the bundle's data
+#   <name>.w.<digest>.npy, the bundle: a flat uint8 array of every weight array's bytes, each starting on a 64-byte
+#       boundary (where the data of a *.npy file starts too), named after the digest of its content
+#
+# Loaded, the bundle is memory-mapped and the weights are tensors over the mapped arrays (see as_tensors()): the
+# processes loading a model share its weights through the OS' page cache instead of each holding a copy.
+#
+# Saving writes a new bundle next to the current one and then replaces the manifest, each through a temporary file
+# moved into place, so a reader finds either the previous weights or the new ones. The bundles superseded are deleted
+# afterwards (while a process still has one mapped, only its directory entry goes--or it's left for the next save on
+# systems that can't delete a file in use).
+
+WEIGHT_BUNDLE_FORMAT = 1
+_ALIGN = 64  # (TensorFlow only wraps buffers aligned this way)
+
+
+def manifest_path(dpath: str, name: str) -> str:
+    return os.path.join(dpath, f"{name}.w.json")
+
+
+def exists(dpath: str, name: str) -> bool:
+    return os.path.isfile(manifest_path(dpath, name))
+
+
+def save(dpath: str, name: str, arrays: List[np.ndarray]):
+    """
+    writes the arrays as the model's weight bundle & manifest, replacing the previous ones
+    """
+    arrays = [np.asarray(arr, order="C") for arr in arrays]  # (np.ascontiguousarray would make 0-d arrays 1-d)
+    entries = []
+    size = 0
+    for arr in arrays:
+        entries.append({"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": size})
+        size += -(-arr.nbytes // _ALIGN) * _ALIGN
+    data = np.zeros(max(size, _ALIGN), dtype=np.uint8)  # (a *.npy of no data can't be mapped)
+    for (arr, entry) in zip(arrays, entries):
+        data[entry["offset"]:entry["offset"] + arr.nbytes] = arr.reshape(-1).view(np.uint8)
+
+    digest = hashlib.blake2b(json.dumps(entries).encode("ASCII"), digest_size=8)
+    digest.update(data)
+    bundle = f"{name}.w.{digest.hexdigest()}.npy"
+    if not os.path.isfile(os.path.join(dpath, bundle)):  # (the same weights are already there otherwise)
+        write_atomic(os.path.join(dpath, bundle), lambda fo: np.save(fo, data))
+    manifest = {"format": WEIGHT_BUNDLE_FORMAT, "bundle": bundle, "arrays": entries}
+    write_atomic(manifest_path(dpath, name), lambda fo: fo.write(json.dumps(manifest, indent=1).encode("UTF-8")))
+
+    for superseded in glob.glob(os.path.join(glob.escape(dpath), f"{glob.escape(name)}.w.*.npy")):
+        if os.path.basename(superseded) != bundle and _is_bundle_name(os.path.basename(superseded), name):
+            try:
+                os.remove(superseded)
+            except OSError as e:
+                dlog(LOG_WARNING, f"model {name}: superseded weight bundle not removed yet: {e}")
+
+
+def load(dpath: str, name: str) -> List[np.ndarray]:
+    """
+    the model's weight arrays, memory-mapped (copy-on-write: see as_tensors())
+
+    Raises ProjectFileAppError(FILE_WEIGHTS_INVALID) if the manifest or the bundle is missing or malformed.
+    """
+    try:
+        with open(manifest_path(dpath, name), "r") as fo:
+            manifest = json.load(fo)
+        if manifest["format"] != WEIGHT_BUNDLE_FORMAT or not _is_bundle_name(manifest["bundle"], name):
+            raise ValueError(f"unsupported manifest (format {manifest['format']}, bundle {manifest['bundle']})")
+        data = np.load(os.path.join(dpath, manifest["bundle"]), mmap_mode="c")
+        if data.dtype != np.uint8 or data.ndim != 1:
+            raise ValueError(f"bundle of {data.dtype} {data.shape}")
+
+        arrays = []
+        for entry in manifest["arrays"]:
+            (dtype, shape, offset) = (np.dtype(entry["dtype"]), tuple(entry["shape"]), entry["offset"])
+            nbytes = dtype.itemsize * math.prod(shape)
+            if offset % _ALIGN != 0 or offset + nbytes > data.size:
+                raise ValueError(f"array of {nbytes} bytes at offset {offset} out of the bundle")
+            arrays.append(data[offset:offset + nbytes].view(dtype).reshape(shape))
+        return arrays
+    except (OSError, KeyError, TypeError, ValueError) as e:  # (json.JSONDecodeError is a ValueError)
+        raise ProjectFileAppError(msg=f"model {name}: malformed weight bundle: {e!r}",
+                                  code=ProjectFileAppError.FILE_WEIGHTS_INVALID)
+
+
+def as_tensors(arrays: List[np.ndarray]) -> List[tf.Tensor]:
+    """
+    read-only tensors over the arrays' own memory, no copy made (imported through DLPack, the only way TensorFlow
+    takes a numpy buffer without copying it). Tensors can't be written into, so the copy-on-write pages of the mapped
+    bundle are never copied and stay shared with every other process mapping it. An array that can't be wrapped (not
+    aligned, or of a dtype DLPack doesn't carry) is copied into its tensor instead.
+
+    Read-only maps (mmap_mode="r") aren't used as they can't be exported through DLPack at all.
+    """
+    tensors = []
+    for arr in arrays:
+        if arr.ctypes.data % _ALIGN == 0:
+            try:
+                tensors.append(tf.experimental.dlpack.from_dlpack(arr.__dlpack__()))
+                continue
+            except (BufferError, TypeError, tf.errors.InvalidArgumentError):
+                pass
+        tensors.append(tf.constant(arr))
+    return tensors
+
+
+def remove(dpath: str, name: str):
+    """
+    removes the model's weight manifest & bundles (when its weights are saved as *.w.npz instead)
+    """
+    for fpath in glob.glob(os.path.join(glob.escape(dpath), f"{glob.escape(name)}.w.*")):
+        fname = os.path.basename(fpath)
+        if fname == f"{name}.w.json" or _is_bundle_name(fname, name):
+            try:
+                os.remove(fpath)
+            except OSError as e:
+                dlog(LOG_WARNING, f"model {name}: weight bundle not removed: {e}")
+
+
+def _is_bundle_name(fname: str, name: str) -> bool:
+    digest = fname[len(name) + 3:-4]
+    return (fname.startswith(f"{name}.w.") and fname.endswith(".npy") and len(digest) == 16
+            and all(c in "0123456789abcdef" for c in digest))
+
+
+def write_atomic(fpath: str, write):
+    """
+    writes the file through a temporary one in the same directory, moved over it once complete
+    """
+    (fd, tmp_fpath) = tempfile.mkstemp(dir=os.path.dirname(fpath) or ".", prefix=".tmp-",
+                                       suffix=os.path.basename(fpath))
+    try:
+        with os.fdopen(fd, "wb") as fo:
+            write(fo)
+            fo.flush()
+            os.fsync(fo.fileno())
+        os.replace(tmp_fpath, fpath)
+    except BaseException:
+        try:
+            os.remove(tmp_fpath)
+        except OSError:
+            pass
+        raise
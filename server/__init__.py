@@ -5,11 +5,18 @@ import uuid
 import copy
 
 from graphical_ai.file_handler import ModelFileHandler
+from server.batching import MicroBatcher
 
 
 app = Flask(__name__)
 CORS(app)
 
+# opt-in micro-batching of /predict_model: concurrent requests for the same model arriving within the window (or until
+# the max batch size is reached) are run as a single batched execution of the model
+app.config.setdefault("MICRO_BATCHING", False)
+app.config.setdefault("MICRO_BATCH_WINDOW", 0.005)  # seconds
+app.config.setdefault("MICRO_BATCH_MAX_SIZE", 32)
+
 GLOBAL_INC = 0
 
 models = {}
@@ -18,6 +25,9 @@ models = {}
 # - model name "name"
 # - required inputs & outputs "req-inp" and "req-out
 # - returned inputs & outputs "ret-inp" and "ret-out"
+# and the hidden keys used internally (prefixed with "%%"):
+# - the loaded model file handler "%%model"
+# - the model's micro-batcher "%%batcher" (only created once micro-batching is used)
 
 
 # creates a new model with a new model id assigned to it
@@ -49,12 +59,13 @@ def load_model(model_id):
         abort(404)
 
     # prevents showing the hidden keys used internally
-    model_cls = models[model_id]["%%model"]
-    del models[model_id]["%%model"]
+    hidden = {k: v for (k, v) in models[model_id].items() if k.startswith("%%")}
+    for k in hidden:
+        del models[model_id][k]
 
     mdl_dict = copy.deepcopy(models[model_id])
 
-    models[model_id]["%%model"] = model_cls
+    models[model_id].update(hidden)
 
     return mdl_dict
 
@@ -70,16 +81,66 @@ def predict_model(model_id):
     req = request.get_json()
     print("predict_model retrieved json:", req)
 
-    output = models[model_id]["%%model"].predict_model({
+    inst_state = {
         "inp": {attr_name : tuple(req["inp"][attr_name]) for attr_name in req["inp"]},
         "out": {attr_name : tuple(req["out"][attr_name]) for attr_name in req["out"]},
         "predicting?": True,
-    })
+    }
+
+    if app.config["MICRO_BATCHING"]:
+        output = model_batcher(model_id).submit(inst_state)
+    else:
+        output = models[model_id]["%%model"].predict_model(inst_state)
 
     print("out", output)
     return output
 
 
+# same as predict_model, but for many requests at once which are all served by a single execution of the model
+# the req'd json should contain a "requests" list, each with the same format predict_model expects
+# the returning data contains an "outputs" list with each request's output information, in the same order
+@app.route("/predict_model_batch/<model_id>", methods=["POST"])
+def predict_model_batch(model_id):
+    if model_id not in models:
+        abort(404)
+
+    req = request.get_json()
+    print("predict_model_batch retrieved json:", len(req["requests"]), "requests")
+
+    outputs = models[model_id]["%%model"].predict_model_batch([{
+        "inp": {attr_name : tuple(sub_req["inp"][attr_name]) for attr_name in sub_req["inp"]},
+        "out": {attr_name : tuple(sub_req["out"][attr_name]) for attr_name in sub_req["out"]},
+        "predicting?": True,
+    } for sub_req in req["requests"]])
+
+    print("outputs", outputs)
+    return {"outputs": outputs}
+
+
+# returns the micro-batching statistics of the model (empty if it has not been micro-batched yet)
+@app.route("/batching_stats/<model_id>", methods=["GET"])
+def batching_stats(model_id):
+    if model_id not in models:
+        abort(404)
+
+    if "%%batcher" not in models[model_id]:
+        return {}
+    return models[model_id]["%%batcher"].stats()
+
+
+def model_batcher(model_id) -> MicroBatcher:
+    batcher = models[model_id].get("%%batcher")
+    if batcher is None:
+        # setdefault so concurrent first requests still end up sharing one batcher
+        batcher = models[model_id].setdefault("%%batcher", MicroBatcher(
+            models[model_id]["%%model"].predict_model_batch,
+            models[model_id]["%%model"].predict_model,
+            window=app.config["MICRO_BATCH_WINDOW"],
+            max_size=app.config["MICRO_BATCH_MAX_SIZE"],
+        ))
+    return batcher
+
+
 # model key: f4338b9c-d045-415e-9f14-04d3983832d9
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class _Item:
+    def __init__(self, inst_state: dict):
+        self.inst_state = inst_state
+        self.result: Optional[dict] = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+        self.submitted = time.perf_counter()
+
+
+class _Batch:
+    def __init__(self):
+        self.items: List[_Item] = []
+        self.full = threading.Event()  # wakes the leader up before the window ends
+
+
+class MicroBatcher:
+    """
+    Collects the concurrent predict requests of a single model and runs them as one batched execution.
+
+    The first request arriving while no batch is open becomes the batch's leader: it waits up to <window> seconds
+    (or until <max_size> requests joined) and then runs the whole batch through <run_batch>, while the other requests
+    just wait for their own slice of the results. So no request waits more than <window> on top of the execution.
+
+    If the batch fails, every request of it is run again on its own through <run_single>, so a bad request only fails
+    itself rather than everything it was batched with.
+    """
+
+    def __init__(self, run_batch: Callable[[List[dict]], List[dict]], run_single: Callable[[dict], dict],
+                 window: float, max_size: int):
+        self.run_batch = run_batch
+        self.run_single = run_single
+        self.window = window
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._open: Optional[_Batch] = None
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "batches": 0,
+            "full-batches": 0,  # batches closed by reaching max_size rather than by the window
+            "max-batch-size": 0,
+            "failed-batches": 0,  # (their requests were run one by one instead)
+            "fallback-requests": 0,  # requests run on their own after their batch failed
+            "failed-requests": 0,  # requests failing on their own too
+            "total-wait": 0.0,  # seconds between a request arriving and its batch starting to run
+            "total-exec": 0.0,  # seconds spent running batches
+        }
+
+    def submit(self, inst_state: dict) -> dict:
+        item = _Item(inst_state)
+
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _Batch()
+            batch.items.append(item)
+            if len(batch.items) >= self.max_size:
+                self._open = None  # the next request starts a new batch
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+            self._run(batch)
+
+        item.done.wait()
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _run(self, batch: _Batch):
+        start = time.perf_counter()
+        batch_error = None
+        try:
+            results = self.run_batch([item.inst_state for item in batch.items])
+            for (item, result) in zip(batch.items, results):
+                item.result = result
+        except BaseException as e:
+            batch_error = e
+        failed = batch_error is not None
+        if failed and len(batch.items) == 1:
+            batch.items[0].error = batch_error
+        elif failed:
+            # (outside of the handler, so the requests' own errors aren't chained to the batch's)
+            for item in batch.items:
+                try:
+                    item.result = self.run_single(item.inst_state)
+                except BaseException as e:
+                    item.error = e
+        end = time.perf_counter()
+
+        with self._stats_lock:
+            self._stats["requests"] += len(batch.items)
+            self._stats["batches"] += 1
+            self._stats["full-batches"] += batch.full.is_set()
+            self._stats["max-batch-size"] = max(self._stats["max-batch-size"], len(batch.items))
+            self._stats["failed-batches"] += failed
+            self._stats["fallback-requests"] += len(batch.items) if failed and len(batch.items) > 1 else 0
+            self._stats["failed-requests"] += sum(item.error is not None for item in batch.items)
+            self._stats["total-wait"] += sum(start - item.submitted for item in batch.items)
+            self._stats["total-exec"] += end - start
+
+        for item in batch.items:
+            item.done.set()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            st = dict(self._stats)
+        batches = max(st["batches"], 1)
+        requests = max(st["requests"], 1)
+        return {
+            "window-ms": self.window * 1e3,
+            "max-size": self.max_size,
+            "requests": st["requests"],
+            "batches": st["batches"],
+            "full-batches": st["full-batches"],
+            "failed-batches": st["failed-batches"],
+            "fallback-requests": st["fallback-requests"],
+            "failed-requests": st["failed-requests"],
+            "max-batch-size": st["max-batch-size"],
+            "mean-batch-size": st["requests"] / batches,
+            "mean-wait-ms": st["total-wait"] / requests * 1e3,
+            "mean-exec-ms": st["total-exec"] / batches * 1e3,
+        }